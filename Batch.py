@@ -0,0 +1,111 @@
+import contextlib
+import glob
+import io
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from Output import OutputWriter
+from Input import InputFeed
+
+
+# Outcome of one script in a batch.
+OK = "ok"  # Ran to the end without any error
+FAILED = "error"  # A parsing, resolution or runtime error was reported
+TIMEOUT = "timeout"  # Stopped after running longer than the time limit
+CRASHED = "crash"  # The worker process running it died
+
+
+class ScriptTimeout(BaseException):
+    """
+    Raised inside a worker when a script runs out of time. It is not an Exception, so the
+    interpreter's own error handling lets it through to run_script.
+    """
+
+
+def expand_paths(patterns: list[str]) -> list[str]:
+    """
+    The scripts named on the command line, in order: a directory stands for the files directly
+    inside it and a glob pattern for the files it matches, both sorted by name. Other names are
+    kept as they are, so a missing file is reported when it is run.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            names = sorted(name for name in os.listdir(pattern) if not name.startswith("."))
+            paths.extend(path for path in (os.path.join(pattern, name) for name in names) if os.path.isfile(path))
+        elif glob.has_magic(pattern):
+            paths.extend(path for path in sorted(glob.glob(pattern)) if os.path.isfile(path))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def _raise_timeout(signum, frame):
+    raise ScriptTimeout
+
+
+def run_script(path: str, options: dict, input_text: str, input_end: str, timeout: float) -> tuple:
+    """
+    Runs one script in a worker with its output captured. Returns (status, output, seconds).
+    input() reads the lines of input_text: a worker never reads the terminal.
+    """
+    from main import run_file  # Deferred: main imports this module
+
+    captured = io.StringIO()
+    status = CRASHED
+    start = time.perf_counter()
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with contextlib.redirect_stdout(captured):
+            succeeded = run_file(path, output=OutputWriter(), input_feed=InputFeed.from_text(input_text, input_end),
+                                 **options)
+        status = OK if succeeded else FAILED
+    except ScriptTimeout:
+        status = TIMEOUT
+        captured.write(f"Timed out after {timeout:g}s.\n")
+    except BaseException as e:
+        captured.write(f"Worker error: {e!r}\n")
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return status, captured.getvalue(), time.perf_counter() - start
+
+
+def run_batch(paths: list[str], jobs: int = None, timeout: float = None, options: dict = None,
+              input_text: str = "", input_end: str = "error") -> bool:
+    """
+    Runs the scripts on a pool of worker processes, which import the interpreter once and
+    then take one script after another. Each script's output is printed as a whole, in the
+    order of paths, as soon as it and the scripts before it have finished; a table of
+    statuses and run times follows. options are passed on to run_file. Returns True if
+    every script succeeded.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    options = options or {}
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=min(jobs, max(len(paths), 1))) as pool:
+        futures = [pool.submit(run_script, path, options, input_text, input_end, timeout) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                status, output, seconds = future.result()
+            except BrokenProcessPool:
+                status, output, seconds = CRASHED, f"Worker process died while running '{path}'.\n", 0.0
+            sys.stdout.write(output)
+            sys.stdout.flush()
+            results.append((path, status, seconds))
+
+    counts = {}
+    for _, status, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    summary = ", ".join(f"{counts[status]} {status}" for status in (OK, FAILED, TIMEOUT, CRASHED) if status in counts)
+    print(f"--- Batch of {len(paths)} scripts (jobs: {jobs}) in {time.perf_counter() - start:.2f}s: {summary or 'nothing to run'} ---")
+    for path, status, seconds in results:
+        print(f"{status:<8}{seconds:>9.3f}s  {path}")
+    return all(status == OK for _, status, _ in results)
@@ -0,0 +1,86 @@
+import sys
+from time import perf_counter
+
+
+UNLIMITED = sys.maxsize  # A counter that never runs out in practice
+
+CHECK_INTERVAL = 4096  # Steps between two looks at the clock
+
+# Python frames to allow for each MyPi call, so that max_depth calls fit in Python's recursion limit.
+# The tree and closure engines nest a few frames per call plus about one per statement or expression
+# around the call site; the VM needs none.
+PYTHON_FRAMES_PER_CALL = 50
+PYTHON_BASE_FRAMES = 1000  # Python's default recursion limit, for the frames below the first call
+
+
+class Budget:
+    """
+    Limits on what one run may use, for running untrusted programs:
+    - max_steps: loop iterations plus function calls,
+    - max_seconds: wall-clock time since the run started,
+    - max_depth: nested function calls (tail calls do not nest),
+    - max_elements: list elements and string characters created, in total.
+    The engines count down the *_left attributes directly and call the methods below
+    only when a counter goes negative, so counting costs one subtraction and one
+    comparison; the clock is read every CHECK_INTERVAL steps. Running out raises a
+    RuntimeError, which the interpreter reports like any other runtime error.
+    """
+
+    def __init__(self, max_steps: int = None, max_seconds: float = None, max_depth: int = None,
+                 max_elements: int = None):
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        self.max_elements = max_elements
+        self.deadline = None
+        self.steps_taken = 0  # Steps accounted for at checkpoints
+        self.interval = self.next_interval()  # Steps allowed between two checkpoints
+        self.steps_left = self.interval
+        self.depth_left = max_depth if max_depth is not None else UNLIMITED
+        self.elements_left = max_elements if max_elements is not None else UNLIMITED
+
+    @property
+    def limited(self) -> bool:
+        return (self.max_steps is not None or self.max_seconds is not None
+                or self.max_depth is not None or self.max_elements is not None)
+
+    def next_interval(self) -> int:
+        if self.max_steps is not None:
+            return min(CHECK_INTERVAL, self.max_steps - self.steps_taken)
+        return CHECK_INTERVAL if self.max_seconds is not None else UNLIMITED
+
+    def start(self):
+        """Called as a program (or, when streaming, each top-level statement) starts running."""
+        if self.deadline is None and self.max_seconds is not None:
+            self.deadline = perf_counter() + self.max_seconds
+        if self.max_depth is not None:
+            # Otherwise Python's own limit (1000 frames by default) would stop deep programs first.
+            # Calls between Python functions do not grow the C stack (Python 3.11+), so this is safe.
+            needed = PYTHON_BASE_FRAMES + self.max_depth * PYTHON_FRAMES_PER_CALL
+            if sys.getrecursionlimit() < needed:
+                sys.setrecursionlimit(needed)
+        # No call is active between statements; a runtime error may have left calls uncounted.
+        self.depth_left = self.max_depth if self.max_depth is not None else UNLIMITED
+
+    def checkpoint(self):
+        """Runs when steps_left goes negative: enforces the step and time limits for the step being taken."""
+        self.steps_taken += self.interval
+        if self.max_steps is not None and self.steps_taken >= self.max_steps:
+            raise RuntimeError(f"Step limit of {self.max_steps} exceeded.")
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise RuntimeError(f"Time limit of {self.max_seconds:g}s exceeded.")
+        self.interval = self.next_interval()
+        self.steps_left = self.interval - 1  # The step being taken is one of them
+
+    def too_deep(self):
+        """Runs when depth_left goes negative."""
+        raise RuntimeError(f"Call depth limit of {self.max_depth} exceeded.")
+
+    def allocate(self, count: int):
+        self.elements_left -= count
+        if self.elements_left < 0:
+            self.out_of_elements()
+
+    def out_of_elements(self):
+        """Runs when elements_left goes negative."""
+        raise RuntimeError(f"Allocation limit of {self.max_elements} elements exceeded.")
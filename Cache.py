@@ -0,0 +1,161 @@
+import hashlib
+import marshal
+import os
+import sys
+
+from Nodes import (
+    Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
+    Block, If, While, InputExpr,
+    ListLiteral, Index, Call, Function, Return,
+    Expr, Stmt
+)
+from Token import Token, TokenType
+from Lexer import Lexer
+from Parser import Parser
+
+
+# Node classes in encoding order: a node is stored as (index in this tuple, *slot values).
+NODE_CLASSES = (
+    Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
+    Block, If, While, InputExpr, ListLiteral, Index, Call, Function, Return,
+)
+TOKEN_TAG = -1  # A token is stored as (TOKEN_TAG, type name, lexeme, literal, line)
+
+MAGIC = b"MIPIC1\n"
+CACHE_SUFFIX = ".mipic"
+
+_version = None
+
+
+def interpreter_version() -> bytes:
+    """
+    Identifies the front end that produced a cached AST: a hash of the lexer, parser,
+    AST, token and cache modules plus the Python version (marshal data is version specific).
+    Editing any of them invalidates every cache entry without a manual version bump.
+    """
+    global _version
+    if _version is None:
+        digest = hashlib.sha256(f"{sys.version_info[0]}.{sys.version_info[1]}".encode())
+        for cls in (Token, Expr, Lexer, Parser, ParseCache):
+            with open(sys.modules[cls.__module__].__file__, 'rb') as file:
+                digest.update(file.read())
+        _version = digest.digest()
+    return _version
+
+
+def default_cache_dir() -> str:
+    """Per-user directory for cached programs: $XDG_CACHE_HOME/mipi, or ~/.cache/mipi."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mipi")
+
+
+def cache_key(source: str) -> bytes:
+    """The key of a cache entry: the source hash combined with the interpreter version."""
+    return hashlib.sha256(interpreter_version() + source.encode('utf-8')).digest()
+
+
+def encode(value):
+    """Turns an AST (or any part of it) into nested tuples/lists of marshal-able values."""
+    if isinstance(value, Token):
+        return (TOKEN_TAG, value.type.name, value.lexeme, value.literal, value.line)
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, (Stmt, Expr)):
+        cls = type(value)
+        return (NODE_CLASSES.index(cls),) + tuple(encode(getattr(value, name)) for name in cls.__slots__)
+    return value  # Literal values: float, str, bool or None
+
+
+def decode(value):
+    """Rebuilds the AST produced by encode()."""
+    if isinstance(value, tuple):
+        tag = value[0]
+        if tag == TOKEN_TAG:
+            return Token(TokenType[value[1]], value[2], value[3], value[4])
+        cls = NODE_CLASSES[tag]
+        node = cls.__new__(cls)
+        for name, field in zip(cls.__slots__, value[1:]):
+            setattr(node, name, decode(field))
+        return node
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+class ParseCache:
+    """
+    On-disk cache of Parser.parse() results. Each source file gets one '<name>-<path hash>.mipic'
+    entry holding a compact marshal encoding of its AST, tagged with cache_key(), so an entry is
+    only used for the exact same source text and front end. Only programs that parsed
+    without errors are stored. Any unreadable or stale entry is simply treated as a miss.
+    Entries live in one directory for all source files, so the folders holding the
+    programs are left as they are.
+    """
+
+    def __init__(self, cache_dir: str = None, report: bool = False):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.report = report  # Print hits and misses to stderr
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, source_path: str) -> str:
+        # Files with the same name in different folders get different entries.
+        path_hash = hashlib.sha256(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(source_path)}-{path_hash}{CACHE_SUFFIX}")
+
+    def load(self, source_path: str, source: str):
+        """Returns the cached statements for this source text, or None on a miss."""
+        path = self.path_for(source_path)
+        statements = None
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            header = MAGIC + cache_key(source)
+            if data.startswith(header):
+                statements = decode(marshal.loads(data[len(header):]))
+        except (OSError, ValueError, EOFError, TypeError, IndexError, KeyError, RecursionError):
+            statements = None  # Missing or corrupt entry
+
+        if statements is None:
+            self.misses += 1
+            self.log(f"miss {path}")
+        else:
+            self.hits += 1
+            self.log(f"hit {path}")
+        return statements
+
+    def store(self, source_path: str, source: str, statements: list[Stmt]):
+        """Writes the statements for this source text. Failures only cost the caching."""
+        path = self.path_for(source_path)
+        try:
+            data = MAGIC + cache_key(source) + marshal.dumps(encode(statements))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'wb') as file:
+                file.write(data)
+            os.replace(temporary_path, path)  # Readers never see a partially written entry
+        except (OSError, ValueError, RecursionError):
+            # Unwritable directory, or an AST nested too deeply to encode
+            self.log(f"not stored {path}")
+
+    def clear(self) -> int:
+        """Deletes every entry in the cache directory. Returns how many were removed."""
+        directory = self.cache_dir
+        removed = 0
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return 0
+        for name in names:
+            if name.endswith(CACHE_SUFFIX):
+                try:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+                except OSError:
+                    pass
+        self.log(f"cleared {removed} entries from {directory}")
+        return removed
+
+    def log(self, message: str):
+        if self.report:
+            print(f"[cache] {message}", file=sys.stderr)
@@ -0,0 +1,71 @@
+import argparse
+import json
+import socket
+import sys
+
+from Input import END_POLICIES
+
+
+DEFAULT_HOST = "127.0.0.1"  # Servers listen on the local machine only by default
+
+
+def connect(socket_path: str = None, host: str = DEFAULT_HOST, port: int = None) -> socket.socket:
+    if socket_path is not None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socket_path)
+        return connection
+    return socket.create_connection((host, port))
+
+
+def run_remote(request: dict, connection: socket.socket, out=None) -> dict:
+    """
+    Sends a request to a MyPi server (see Server.py for the protocol) and writes the program's
+    output to out (default: sys.stdout) as it arrives. Returns the final status frame.
+    """
+    out = out if out is not None else sys.stdout
+    connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    with connection.makefile('rb') as frames:
+        for line in frames:
+            frame = json.loads(line)
+            if "output" in frame:
+                out.write(frame["output"])
+                out.flush()
+            else:
+                return frame
+    return {"status": "error", "message": "The server closed the connection"}
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run a MyPi program on a MyPi server.")
+    arg_parser.add_argument("source_file_path", help="Path to the MyPi source file")
+    address = arg_parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", default=None, metavar="PATH", help="Unix socket of the server")
+    address.add_argument("--port", type=int, default=None, help="TCP port of the server")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address for --port (default: {DEFAULT_HOST})")
+    arg_parser.add_argument("--engine", default="tree", help="Execution engine (default: tree)")
+    arg_parser.add_argument("--optimize", action="store_true", help="Run the optimization pass first")
+    arg_parser.add_argument("--input", default=None, metavar="FILE",
+                            help="Lines for input() ('-': all of stdin); without it input() has nothing to read")
+    arg_parser.add_argument("--input-end", choices=END_POLICIES, default="error",
+                            help="What input() does once the input is exhausted (default: error)")
+    args = arg_parser.parse_args()
+
+    try:
+        with open(args.source_file_path, 'r') as file:
+            source = file.read()
+        input_text = None
+        if args.input == "-":
+            input_text = sys.stdin.read()
+        elif args.input is not None:
+            with open(args.input, 'r') as file:
+                input_text = file.read()
+        with connect(args.socket, args.host, args.port) as connection:
+            status = run_remote({"source": source, "input": input_text, "input_end": args.input_end,
+                                 "engine": args.engine, "optimize": args.optimize}, connection)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if "message" in status:
+        print(status["message"], file=sys.stderr)
+    sys.exit(0 if status["status"] == "ok" else 1)
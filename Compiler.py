@@ -0,0 +1,937 @@
+from Nodes import (
+    Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
+    Block, If, While, InputExpr,
+    ListLiteral, Index, Call, Function, Return,
+    Expr, Stmt
+)
+from Token import TokenType, MAX_EXACT_INT
+from Values import ListValue, StringBuilder, extend_string
+from Interpreter import (
+    Interpreter, LoxCallable, LoxFunction, Frame, UNDEFINED, RETURNING, TAIL_CALL, LIST_BUILTINS, as_index,
+    read_with_fallback, assign_with_fallback
+)
+
+
+NUMBER_TYPES = (int, float)
+
+
+def _line_of(node) -> object:
+    """Line reported for an operand in error messages, exactly as the tree-walker computes it."""
+    return node.name.line if hasattr(node, 'name') else node.line if hasattr(node, 'line') else '?'
+
+
+def _line_attr(node) -> object:
+    return node.line if hasattr(node, 'line') else '?'
+
+
+def _may_return(stmt: Stmt) -> bool:
+    """Whether running the statement can reach a return statement of the enclosing function."""
+    if isinstance(stmt, Return):
+        return True
+    if isinstance(stmt, Block):
+        return any(_may_return(statement) for statement in stmt.statements)
+    if isinstance(stmt, If):
+        return _may_return(stmt.then_branch) or (stmt.else_branch is not None and _may_return(stmt.else_branch))
+    if isinstance(stmt, While):
+        return _may_return(stmt.body)
+    return False  # A nested function's returns end that function, not this one
+
+
+def _finish_call(interpreter, signal) -> object:
+    """Runs the pending tail calls of a compiled body that finished with signal, and returns the call's result."""
+    while signal is TAIL_CALL:
+        function, arguments = interpreter.tail_call
+        declaration = function.declaration
+        frame = Frame(function.closure, declaration.frame_size)
+        frame.slots[:len(arguments)] = arguments
+        signal = declaration.compiled_body(frame)
+    if signal is RETURNING:
+        return interpreter.return_value
+    return None
+
+
+# A user-defined function whose body has been compiled to a closure.
+class CompiledFunction(LoxFunction):
+    def call(self, interpreter, arguments: list) -> object:
+        environment = Frame(self.closure, self.declaration.frame_size)
+        environment.slots[:len(arguments)] = arguments
+        signal = self.declaration.compiled_body(environment)
+        if signal is None:
+            return None
+        return _finish_call(interpreter, signal)
+
+
+class Compiler:
+    """
+    Compiles each AST node once into a specialized Python closure.
+    Every compiled node is a function taking the current environment (a Frame, or the
+    global Environment at the top level), so running a node costs one indirect call:
+    no isinstance ladder and no operator comparisons at run time.
+    Compiled statements return None, or the RETURNING / TAIL_CALL signal of a return
+    statement; only statements that can contain a return check for it.
+    Semantics and error messages match Interpreter.execute/evaluate.
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.stmt_compilers = {
+            ExpressionStmt: self.compile_expression_stmt,
+            PrintStmt: self.compile_print,
+            Var: self.compile_var,
+            Block: self.compile_block,
+            If: self.compile_if,
+            While: self.compile_while,
+            Function: self.compile_function,
+            Return: self.compile_return,
+        }
+        self.expr_compilers = {
+            Binary: self.compile_binary,
+            Unary: self.compile_unary,
+            Literal: self.compile_literal,
+            Grouping: self.compile_grouping,
+            Variable: self.compile_variable,
+            Assign: self.compile_assign,
+            InputExpr: self.compile_input,
+            ListLiteral: self.compile_list_literal,
+            Index: self.compile_index,
+            Call: self.compile_call,
+        }
+
+    # --- Statements ---
+
+    def compile_stmt(self, stmt: Stmt):
+        return self.stmt_compilers[type(stmt)](stmt)
+
+    def compile_expression_stmt(self, stmt: ExpressionStmt):
+        expression = self.compile_expr(stmt.expression)
+
+        def expression_stmt(env):
+            expression(env)
+        return expression_stmt
+
+    def compile_print(self, stmt: PrintStmt):
+        expression = self.compile_expr(stmt.expression)
+        stringify = self.interpreter.stringify
+        write_line = self.interpreter.output.write_line
+
+        def print_stmt(env):
+            write_line(stringify(expression(env)))
+        return print_stmt
+
+    def compile_var(self, stmt: Var):
+        initializer = self.compile_expr(stmt.initializer) if stmt.initializer else None
+        slot = stmt.slot
+
+        if slot is None:
+            define = self.interpreter.globals.define
+            name = stmt.name.lexeme
+
+            def var_global(env):
+                define(name, initializer(env) if initializer else None)
+            return var_global
+
+        if initializer is None:
+            def var_local_nil(env):
+                env.slots[slot] = None
+            return var_local_nil
+
+        def var_local(env):
+            env.slots[slot] = initializer(env)
+        return var_local
+
+    def compile_block(self, stmt: Block):
+        statements = self.compile_statements(stmt.statements)
+        size = stmt.frame_size
+
+        if not size:
+            # The block declares nothing, so it runs in the enclosing frame.
+            if _may_return(stmt):
+                def returning_frameless_block(env):
+                    for statement in statements:
+                        signal = statement(env)
+                        if signal is not None:
+                            return signal
+                return returning_frameless_block
+
+            def frameless_block(env):
+                for statement in statements:
+                    statement(env)
+            return frameless_block
+
+        if stmt.reuses_frame:
+            return self.compile_reused_frame_block(stmt, statements)
+
+        if _may_return(stmt):
+            def returning_block(env):
+                frame = Frame(env, size)
+                for statement in statements:
+                    signal = statement(frame)
+                    if signal is not None:
+                        return signal
+            return returning_block
+
+        def block(env):
+            frame = Frame(env, size)
+            for statement in statements:
+                statement(frame)
+        return block
+
+    def compile_reused_frame_block(self, stmt: Block, statements: tuple):
+        """compile_block for a block that keeps its frame for the next run in the same enclosing frame (see block_frame)."""
+        if stmt.frame_slot is not None:
+            return self.compile_kept_frame_block(stmt, statements)
+        size, local_count = stmt.frame_size, stmt.local_count
+        frame = None  # A block in a top-level loop keeps its frame in the compiled code, for the run
+
+        if _may_return(stmt):
+            def returning_reused_frame_block(env):
+                nonlocal frame
+                if frame is None:
+                    frame = Frame(env, size)
+                else:
+                    frame.slots[:local_count] = [UNDEFINED] * local_count
+                for statement in statements:
+                    signal = statement(frame)
+                    if signal is not None:
+                        return signal
+            return returning_reused_frame_block
+
+        def reused_frame_block(env):
+            nonlocal frame
+            if frame is None:
+                frame = Frame(env, size)
+            else:
+                frame.slots[:local_count] = [UNDEFINED] * local_count
+            for statement in statements:
+                statement(frame)
+        return reused_frame_block
+
+    def compile_kept_frame_block(self, stmt: Block, statements: tuple):
+        """compile_reused_frame_block for a block whose enclosing frame keeps its frame."""
+        size, local_count, slot = stmt.frame_size, stmt.local_count, stmt.frame_slot
+
+        if _may_return(stmt):
+            def returning_kept_frame_block(env):
+                frame = env.slots[slot]
+                if frame is UNDEFINED:
+                    frame = env.slots[slot] = Frame(env, size)
+                else:
+                    frame.slots[:local_count] = [UNDEFINED] * local_count
+                for statement in statements:
+                    signal = statement(frame)
+                    if signal is not None:
+                        return signal
+            return returning_kept_frame_block
+
+        def kept_frame_block(env):
+            frame = env.slots[slot]
+            if frame is UNDEFINED:
+                frame = env.slots[slot] = Frame(env, size)
+            else:
+                frame.slots[:local_count] = [UNDEFINED] * local_count
+            for statement in statements:
+                statement(frame)
+        return kept_frame_block
+
+    def compile_statements(self, statements: list[Stmt]) -> tuple:
+        return tuple(self.compile_stmt(statement) for statement in statements)
+
+    def compile_if(self, stmt: If):
+        condition = self.compile_expr(stmt.condition)
+        then_branch = self.compile_stmt(stmt.then_branch)
+        else_branch = self.compile_stmt(stmt.else_branch) if stmt.else_branch else None
+        is_truthy = self.interpreter._is_truthy
+
+        if else_branch is None:
+            def if_then(env):
+                value = condition(env)
+                if value is True or (value is not False and is_truthy(value)):
+                    return then_branch(env)
+            return if_then
+
+        def if_then_else(env):
+            value = condition(env)
+            if value is True or (value is not False and is_truthy(value)):
+                return then_branch(env)
+            return else_branch(env)
+        return if_then_else
+
+    def compile_while(self, stmt: While):
+        condition = self.compile_expr(stmt.condition)
+        body = self.compile_stmt(stmt.body)
+        is_truthy = self.interpreter._is_truthy
+        if self.interpreter.budget.limited:
+            return self.compile_budgeted_while(stmt, condition, body)
+
+        if _may_return(stmt.body):
+            def returning_while_loop(env):
+                while True:
+                    value = condition(env)
+                    if not (value is True or (value is not False and is_truthy(value))):
+                        break
+                    signal = body(env)
+                    if signal is not None:
+                        return signal
+            return returning_while_loop
+
+        def while_loop(env):
+            while True:
+                value = condition(env)
+                if not (value is True or (value is not False and is_truthy(value))):
+                    break
+                body(env)
+        return while_loop
+
+    def compile_budgeted_while(self, stmt: While, condition, body):
+        """compile_while for a run with a Budget: every completed iteration is a step."""
+        is_truthy = self.interpreter._is_truthy
+        budget = self.interpreter.budget
+
+        if _may_return(stmt.body):
+            def returning_while_loop(env):
+                while True:
+                    value = condition(env)
+                    if not (value is True or (value is not False and is_truthy(value))):
+                        break
+                    signal = body(env)
+                    if signal is not None:
+                        return signal
+                    budget.steps_left -= 1
+                    if budget.steps_left < 0:
+                        budget.checkpoint()
+            return returning_while_loop
+
+        def while_loop(env):
+            while True:
+                value = condition(env)
+                if not (value is True or (value is not False and is_truthy(value))):
+                    break
+                body(env)
+                budget.steps_left -= 1
+                if budget.steps_left < 0:
+                    budget.checkpoint()
+        return while_loop
+
+    def compile_function(self, stmt: Function):
+        stmt.compiled_body = self.compile_function_body(stmt)
+        slot = stmt.slot
+
+        if slot is None:
+            define = self.interpreter.globals.define
+            name = stmt.name.lexeme
+
+            def function_global(env):
+                define(name, CompiledFunction(stmt, env))
+            return function_global
+
+        def function_local(env):
+            env.slots[slot] = CompiledFunction(stmt, env)
+        return function_local
+
+    def compile_function_body(self, stmt: Function):
+        # The body runs directly in the call's frame, which also holds the parameters.
+        statements = self.compile_statements(stmt.body.statements)
+        if self.interpreter.budget.limited:
+            return self.compile_budgeted_function_body(stmt, statements)
+
+        if any(_may_return(statement) for statement in stmt.body.statements):
+            def returning_function_body(env):
+                for statement in statements:
+                    signal = statement(env)
+                    if signal is not None:
+                        return signal
+            return returning_function_body
+
+        def function_body(env):
+            for statement in statements:
+                statement(env)
+        return function_body
+
+    def compile_budgeted_function_body(self, stmt: Function, statements: list):
+        """
+        compile_function_body for a run with a Budget. Every call, tail calls included, runs
+        the body once, so each run is a step and the body is one level of call depth.
+        """
+        budget = self.interpreter.budget
+
+        if any(_may_return(statement) for statement in stmt.body.statements):
+            def returning_function_body(env):
+                budget.steps_left -= 1
+                if budget.steps_left < 0:
+                    budget.checkpoint()
+                budget.depth_left -= 1
+                if budget.depth_left < 0:
+                    budget.too_deep()
+                for statement in statements:
+                    signal = statement(env)
+                    if signal is not None:
+                        budget.depth_left += 1
+                        return signal
+                budget.depth_left += 1
+            return returning_function_body
+
+        def function_body(env):
+            budget.steps_left -= 1
+            if budget.steps_left < 0:
+                budget.checkpoint()
+            budget.depth_left -= 1
+            if budget.depth_left < 0:
+                budget.too_deep()
+            for statement in statements:
+                statement(env)
+            budget.depth_left += 1
+        return function_body
+
+    def compile_return(self, stmt: Return):
+        interpreter = self.interpreter
+
+        if stmt.tail_call:
+            prepare_call = self.compile_prepare_call(stmt.value)
+
+            def tail_call(env):
+                callee, arguments = prepare_call(env)
+                if type(callee) is CompiledFunction:
+                    # The caller runs it once this call's frame is gone (see _finish_call).
+                    interpreter.tail_call = (callee, arguments)
+                    return TAIL_CALL
+                interpreter.return_value = callee.call(interpreter, arguments)
+                return RETURNING
+            return tail_call
+
+        value_fn = self.compile_expr(stmt.value) if stmt.value else None
+
+        def return_stmt(env):
+            interpreter.return_value = value_fn(env) if value_fn else None
+            return RETURNING
+        return return_stmt
+
+    # --- Expressions ---
+
+    def compile_expr(self, expr: Expr):
+        compile_node = self.expr_compilers.get(type(expr))
+        if compile_node is None:
+            message = f"Unknown expression type: {type(expr).__name__}"
+
+            def unknown(env):
+                raise RuntimeError(message)
+            return unknown
+        return compile_node(expr)
+
+    def compile_literal(self, expr: Literal):
+        value = expr.value
+
+        def literal(env):
+            return value
+        return literal
+
+    def compile_grouping(self, expr: Grouping):
+        return self.compile_expr(expr.expression)
+
+    def compile_variable(self, expr: Variable):
+        read = self.compile_variable_read(expr)
+        if not expr.materialize:
+            return read
+
+        def materialized_variable(env):
+            value = read(env)
+            if type(value) is StringBuilder:
+                return value.value()  # A string being built is only joined when it is read
+            return value
+        return materialized_variable
+
+    def compile_variable_read(self, expr: Variable):
+        """Compiles a read of the value stored in a variable's slot (a StringBuilder is not joined)."""
+        name = expr.name.lexeme
+        message = f"Undefined variable '{name}' on line {expr.name.line}."
+        depth, slot = expr.depth, expr.slot
+
+        if depth is None:
+            values = self.interpreter.globals.values
+
+            def global_variable(env):
+                if name in values:
+                    return values[name]
+                raise RuntimeError(message)
+            return global_variable
+
+        if expr.fallback is not None:
+            globals_env = self.interpreter.globals
+
+            def variable_or_fallback(env):
+                return read_with_fallback(env, expr, globals_env)
+            return variable_or_fallback
+
+        if depth == 0:
+            def local_variable(env):
+                value = env.slots[slot]
+                if value is UNDEFINED:
+                    raise RuntimeError(message)
+                return value
+            return local_variable
+
+        if depth == 1:
+            def enclosing_variable(env):
+                value = env.enclosing.slots[slot]
+                if value is UNDEFINED:
+                    raise RuntimeError(message)
+                return value
+            return enclosing_variable
+
+        def outer_variable(env):
+            for _ in range(depth):
+                env = env.enclosing
+            value = env.slots[slot]
+            if value is UNDEFINED:
+                raise RuntimeError(message)
+            return value
+        return outer_variable
+
+    def compile_assign(self, expr: Assign):
+        value_fn = self.compile_build_string(expr) if expr.appended else self.compile_expr(expr.value)
+        target = expr.target_expr
+
+        if isinstance(target, Variable):
+            return self.compile_assign_variable(target, value_fn)
+        if isinstance(target, Index):
+            return self.compile_assign_index(target, value_fn)
+
+        message = f"Invalid assignment target on line {_line_attr(target)}."
+
+        def invalid_assign(env):
+            value_fn(env)
+            raise RuntimeError(message)
+        return invalid_assign
+
+    def compile_build_string(self, expr: Assign):
+        """Compiles the value of a `v = v + a + b;` statement, which extends v in place while it holds a string."""
+        left_fn = self.compile_variable_read(expr.appended[0].left)
+        steps = tuple((self.compile_expr(step.right), step.operator) for step in expr.appended)
+        right_fns = tuple(right_fn for right_fn, _ in steps)
+        interpreter = self.interpreter
+        stringify = interpreter.stringify
+        budget = interpreter.budget
+
+        def build_string(env):
+            left = left_fn(env)
+            if type(left) is StringBuilder or type(left) is str:
+                length = left.length if type(left) is StringBuilder else 0
+                text = "".join([stringify(right_fn(env)) for right_fn in right_fns])
+                budget.elements_left -= len(text)
+                if budget.elements_left < 0:
+                    budget.out_of_elements()
+                return extend_string(left, length, text)
+            for right_fn, operator in steps:
+                right = right_fn(env)
+                if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                    left = left + right  # Accumulating numbers is the common non-string case
+                    if not -MAX_EXACT_INT <= left <= MAX_EXACT_INT:
+                        left = float(left)
+                else:
+                    left = interpreter.add(left, right, operator)
+            return left
+        return build_string
+
+    def compile_assign_variable(self, target: Variable, value_fn):
+        name = target.name.lexeme
+        message = f"Undefined variable '{name}' on line {target.name.line}."
+        depth, slot = target.depth, target.slot
+
+        if depth is None:
+            values = self.interpreter.globals.values
+
+            def assign_global(env):
+                value = value_fn(env)
+                if name not in values:
+                    raise RuntimeError(message)
+                values[name] = value
+                return value
+            return assign_global
+
+        if target.fallback is not None:
+            globals_env = self.interpreter.globals
+
+            def assign_local_or_fallback(env):
+                value = value_fn(env)
+                assign_with_fallback(env, target, globals_env, value)
+                return value
+            return assign_local_or_fallback
+
+        def assign_local(env):
+            value = value_fn(env)
+            frame = env
+            for _ in range(depth):
+                frame = frame.enclosing
+            if frame.slots[slot] is UNDEFINED:
+                raise RuntimeError(message)
+            frame.slots[slot] = value
+            return value
+        return assign_local
+
+    def compile_assign_index(self, target: Index, value_fn):
+        obj_fn = self.compile_expr(target.obj)
+        index_fn = self.compile_expr(target.index_expr)
+        not_list = f"Cannot assign to non-list type via index on line {_line_of(target.obj)}."
+        not_integer = f"List index must be an integer on line {_line_attr(target.index_expr)}."
+        index_line = _line_attr(target.index_expr)
+
+        def assign_index(env):
+            value = value_fn(env)
+            list_obj = obj_fn(env)
+            index_val = index_fn(env)
+
+            if not isinstance(list_obj, ListValue):
+                raise RuntimeError(not_list)
+            if type(index_val) is not int:
+                index_val = as_index(index_val)
+                if index_val is None:
+                    raise RuntimeError(not_integer)
+            if not (0 <= index_val < len(list_obj.items)):
+                raise RuntimeError(f"List index out of bounds: {index_val} on line {index_line}.")
+
+            items = list_obj.items
+            if type(list_obj) is ListValue and (type(items) is list or type(value) is int):
+                items[index_val] = value  # Fits the storage as it is
+            else:
+                list_obj.store(index_val, value)
+            return value
+        return assign_index
+
+    def compile_input(self, expr: InputExpr):
+        prompt_fn = self.compile_expr(expr.prompt) if expr.prompt else None
+        message = f"Input prompt must be a string on line {_line_attr(expr.prompt)}." if expr.prompt else None
+        read_input = self.interpreter.read_input
+
+        def input_expr(env):
+            prompt_str = ""
+            if prompt_fn:
+                evaluated_prompt = prompt_fn(env)
+                if not isinstance(evaluated_prompt, str):
+                    raise RuntimeError(message)
+                prompt_str = evaluated_prompt
+            return read_input(prompt_str)
+        return input_expr
+
+    def compile_list_literal(self, expr: ListLiteral):
+        budget = self.interpreter.budget
+        size = len(expr.elements)
+
+        if expr.constant is not None:
+            constant = expr.constant
+
+            def constant_list(env):
+                budget.elements_left -= size
+                if budget.elements_left < 0:
+                    budget.out_of_elements()
+                return ListValue(constant)
+            return constant_list
+
+        elements = tuple(self.compile_expr(element) for element in expr.elements)
+
+        def list_literal(env):
+            budget.elements_left -= size
+            if budget.elements_left < 0:
+                budget.out_of_elements()
+            return ListValue([element(env) for element in elements])
+        return list_literal
+
+    def compile_index(self, expr: Index):
+        obj_fn = self.compile_expr(expr.obj)
+        index_fn = self.compile_expr(expr.index_expr)
+        not_indexable = f"Only lists and strings can be indexed on line {_line_of(expr.obj)}."
+        not_integer = f"Index must be an integer on line {_line_attr(expr.index_expr)}."
+        index_line = _line_attr(expr.index_expr)
+
+        def index(env):
+            obj = obj_fn(env)
+            index_val = index_fn(env)
+
+            if isinstance(obj, ListValue):
+                obj = obj.items
+            elif not isinstance(obj, str):
+                raise RuntimeError(not_indexable)
+            if type(index_val) is not int:
+                index_val = as_index(index_val)
+                if index_val is None:
+                    raise RuntimeError(not_integer)
+            if not (0 <= index_val < len(obj)):
+                raise RuntimeError(f"Index out of bounds: {index_val} on line {index_line}.")
+
+            return obj[index_val]
+        return index
+
+    def compile_call(self, expr: Call):
+        callee_fn = self.compile_expr(expr.callee)
+        argument_fns = tuple(self.compile_expr(argument) for argument in expr.arguments)
+        argument_count = len(argument_fns)
+        line = _line_of(expr.callee)
+        not_callable = f"Not a callable type on line {line}."
+        interpreter = self.interpreter
+        checked_callee = None  # The callable last called here, already checked: the call site's inline cache
+
+        def call(env, callee=UNDEFINED):
+            # callee is passed in only by call_list_builtin, which has evaluated it already.
+            nonlocal checked_callee
+            if callee is UNDEFINED:
+                callee = callee_fn(env)
+            arguments = [argument(env) for argument in argument_fns]
+
+            if type(callee) is CompiledFunction:
+                declaration = callee.declaration
+                if argument_count == len(declaration.params):
+                    # Inline CompiledFunction.call: bind the arguments and run the body.
+                    frame = Frame(callee.closure, declaration.frame_size)
+                    frame.slots[:argument_count] = arguments
+                    signal = declaration.compiled_body(frame)
+                    if signal is None:
+                        return None
+                    return _finish_call(interpreter, signal)
+
+            if callee is not checked_callee:
+                if not isinstance(callee, LoxCallable):
+                    raise RuntimeError(not_callable)
+                if argument_count != callee.arity():
+                    raise RuntimeError(
+                        f"Expected {callee.arity()} arguments but got {argument_count} on line {line}.")
+                checked_callee = callee
+
+            return callee.call(interpreter, arguments)
+
+        if not (argument_count == 2 and isinstance(expr.callee, Variable)
+                and expr.callee.name.type in (TokenType.LIST_APPEND, TokenType.LIST_REMOVE_AT)):
+            return call
+        first_fn, second_fn = argument_fns
+
+        def call_list_builtin(env):
+            callee = callee_fn(env)
+            builtin = LIST_BUILTINS.get(type(callee))
+            if builtin is None:
+                return call(env, callee)  # The program has assigned something else to the name
+            return builtin(interpreter, first_fn(env), second_fn(env))
+        return call_list_builtin
+
+    def compile_prepare_call(self, expr: Call):
+        """Compiles the checked evaluation of a call's callee and arguments, for tail calls."""
+        callee_fn = self.compile_expr(expr.callee)
+        argument_fns = tuple(self.compile_expr(argument) for argument in expr.arguments)
+        argument_count = len(argument_fns)
+        line = _line_of(expr.callee)
+        not_callable = f"Not a callable type on line {line}."
+        checked_callee = None
+
+        def prepare_call(env):
+            nonlocal checked_callee
+            callee = callee_fn(env)
+            arguments = [argument(env) for argument in argument_fns]
+            if callee is not checked_callee:
+                if not isinstance(callee, LoxCallable):
+                    raise RuntimeError(not_callable)
+                if argument_count != callee.arity():
+                    raise RuntimeError(
+                        f"Expected {callee.arity()} arguments but got {argument_count} on line {line}.")
+                checked_callee = callee
+            return callee, arguments
+        return prepare_call
+
+    def compile_unary(self, expr: Unary):
+        right_fn = self.compile_expr(expr.right)
+        operator = expr.operator
+
+        if operator.type == TokenType.MINUS:
+            message = f"Operand of '{operator.lexeme}' must be a number on line {operator.line}."
+
+            def negate(env):
+                right = right_fn(env)
+                if isinstance(right, NUMBER_TYPES):
+                    return -right
+                raise RuntimeError(message)
+            return negate
+
+        if operator.type == TokenType.BANG:
+            is_truthy = self.interpreter._is_truthy
+
+            def logical_not(env):
+                return not is_truthy(right_fn(env))
+            return logical_not
+
+        def unknown_unary(env):
+            right_fn(env)
+            return None
+        return unknown_unary
+
+    def compile_binary(self, expr: Binary):
+        left_fn = self.compile_expr(expr.left)
+        right_fn = self.compile_expr(expr.right)
+        operator = expr.operator
+        operator_type = operator.type
+        interpreter = self.interpreter
+
+        if operator_type == TokenType.PLUS:
+            stringify = interpreter.stringify
+            budget = interpreter.budget
+            message = f"Operands of '+' must be two numbers, two strings or two lists on line {operator.line}."
+
+            def add(env):
+                left = left_fn(env)
+                right = right_fn(env)
+                if isinstance(left, str) or isinstance(right, str):
+                    text = stringify(left) + stringify(right)
+                    budget.elements_left -= len(text)
+                    if budget.elements_left < 0:
+                        budget.out_of_elements()
+                    return text
+                elif isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                    result = left + right
+                    return result if -MAX_EXACT_INT <= result <= MAX_EXACT_INT else float(result)
+                elif isinstance(left, ListValue) and isinstance(right, ListValue):
+                    budget.allocate(len(right))
+                    return left.concat(right)
+                raise RuntimeError(message)
+            return add
+
+        arithmetic = self.ARITHMETIC.get(operator_type)
+        if arithmetic is not None:
+            return arithmetic(left_fn, right_fn,
+                              f"Operands of '{operator.lexeme}' must be numbers on line {operator.line}.",
+                              f"Division by zero on line {operator.line}.")
+
+        if operator_type == TokenType.EQUAL_EQUAL:
+            is_equal = interpreter._is_equal
+
+            def equal(env):
+                return is_equal(left_fn(env), right_fn(env))
+            return equal
+
+        if operator_type == TokenType.BANG_EQUAL:
+            is_equal = interpreter._is_equal
+
+            def not_equal(env):
+                return not is_equal(left_fn(env), right_fn(env))
+            return not_equal
+
+        if operator_type == TokenType.AND:
+            # Both operands are always evaluated, as in the tree-walker.
+            def logical_and(env):
+                left = left_fn(env)
+                right = right_fn(env)
+                return left and right
+            return logical_and
+
+        if operator_type == TokenType.OR:
+            is_truthy = interpreter._is_truthy
+
+            def logical_or(env):
+                left = left_fn(env)
+                right = right_fn(env)
+                return left if is_truthy(left) else right
+            return logical_or
+
+        def unknown_binary(env):
+            left_fn(env)
+            right_fn(env)
+            return None
+        return unknown_binary
+
+    # Numeric operators share the same shape; each factory returns a closure specialized to one operator.
+
+    @staticmethod
+    def _subtract(left_fn, right_fn, message, zero_message):
+        def subtract(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                result = left - right
+                return result if -MAX_EXACT_INT <= result <= MAX_EXACT_INT else float(result)
+            raise RuntimeError(message)
+        return subtract
+
+    @staticmethod
+    def _multiply(left_fn, right_fn, message, zero_message):
+        def multiply(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                result = left * right
+                return result if -MAX_EXACT_INT <= result <= MAX_EXACT_INT else float(result)
+            raise RuntimeError(message)
+        return multiply
+
+    @staticmethod
+    def _divide(left_fn, right_fn, message, zero_message):
+        def divide(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                if right == 0:
+                    raise RuntimeError(zero_message)
+                return left / right
+            raise RuntimeError(message)
+        return divide
+
+    @staticmethod
+    def _greater(left_fn, right_fn, message, zero_message):
+        def greater(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                return left > right
+            raise RuntimeError(message)
+        return greater
+
+    @staticmethod
+    def _greater_equal(left_fn, right_fn, message, zero_message):
+        def greater_equal(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                return left >= right
+            raise RuntimeError(message)
+        return greater_equal
+
+    @staticmethod
+    def _less(left_fn, right_fn, message, zero_message):
+        def less(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                return left < right
+            raise RuntimeError(message)
+        return less
+
+    @staticmethod
+    def _less_equal(left_fn, right_fn, message, zero_message):
+        def less_equal(env):
+            left = left_fn(env)
+            right = right_fn(env)
+            if isinstance(left, NUMBER_TYPES) and isinstance(right, NUMBER_TYPES):
+                return left <= right
+            raise RuntimeError(message)
+        return less_equal
+
+    ARITHMETIC = {
+        TokenType.MINUS: _subtract,
+        TokenType.STAR: _multiply,
+        TokenType.SLASH: _divide,
+        TokenType.GREATER: _greater,
+        TokenType.GREATER_EQUAL: _greater_equal,
+        TokenType.LESS: _less,
+        TokenType.LESS_EQUAL: _less_equal,
+    }
+
+
+class CompiledInterpreter(Interpreter):
+    """Interpreter that compiles the program to closures once and then runs them."""
+
+    def interpret(self, statements: list[Stmt]) -> bool:
+        compiled = Compiler(self).compile_statements(statements)
+        try:
+            self.budget.start()
+            for statement in compiled:
+                try:
+                    statement(self.globals)
+                except RuntimeError as e:
+                    self.output.write_line(f"Runtime error: {e}")
+                    # For basic error handling, we stop on the first runtime error.
+                    return False
+            return True
+        finally:
+            self.output.flush()
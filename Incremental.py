@@ -0,0 +1,215 @@
+import re
+
+from Nodes import If, Stmt, Expr
+from Token import Token
+from Lexer import FastLexer
+from Parser import Parser
+
+
+# Whitespace and comments between two tokens (the Lexer skips str.isspace() characters and // comments).
+TRIVIA_PATTERN = re.compile(r"(?:\s+|//[^\n]*)*")
+
+
+# Represents the source text of a top-level declaration, and what it parses to.
+# Segments partition the whole program: each starts where the previous one ended and ends
+# right after its last token, except the last one, which also holds any trailing trivia.
+# A segment knows only its own size, so an edit leaves the segments after it untouched.
+class Segment:
+    __slots__ = ('length', 'newlines', 'line', 'statements')
+
+    def __init__(self, length: int, newlines: int, line: int, statements: list[Stmt]):
+        self.length = length  # Characters in the segment
+        self.newlines = newlines  # Line breaks in the segment
+        self.line = line  # Line the segment started on when its statements' line numbers were last set
+        self.statements = statements
+
+
+def shift_lines(node, delta: int, seen: set):
+    """Moves every token and statement line in an AST by delta lines. seen holds the tokens already moved."""
+    if isinstance(node, Token):
+        if id(node) not in seen:
+            seen.add(id(node))
+            node.line += delta
+    elif isinstance(node, list):
+        for item in node:
+            shift_lines(item, delta, seen)
+    elif isinstance(node, (Stmt, Expr)):
+        for name in type(node).__slots__:
+            value = getattr(node, name, None)
+            if name == 'line':
+                if value is not None:
+                    node.line = value + delta
+            elif isinstance(value, (Token, list, Stmt, Expr)):
+                shift_lines(value, delta, seen)
+
+
+def common_length(old: str, new: str, limit: int, part) -> int:
+    """The largest n <= limit for which part(old, n) == part(new, n), found by comparing slices, not characters."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if part(old, middle) == part(new, middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalParser:
+    """
+    Front end for programs that are edited and re-run repeatedly, as in an editor. It keeps the
+    previous version's text split into Segments, one per top-level declaration. When a new
+    version comes in, only the segments touched by the edited range are lexed and parsed
+    again, together with as many following segments as it takes for that text to parse on its
+    own (when an edit opens a brace, say). Every other segment keeps its statements as they
+    are. If the edit added or removed lines, the line numbers of the statements after it are
+    moved when statements() next hands them out, once for any number of edits in between.
+
+    The statements returned are reused by later versions, so they must not be rewritten (by the
+    Optimizer) in place. Resolving and running them is fine. A version with parsing errors is
+    parsed in full by parse_all(), which reports the errors, and so is the version after it.
+    """
+
+    def __init__(self):
+        self.source = None
+        self.segments = []
+        self.had_error = False
+        self.reparsed_chars = 0  # Characters lexed and parsed by the last update, for diagnostics
+
+    def parse(self, source: str) -> list[Stmt]:
+        """The statements of this version of the program."""
+        if self.source is None or self.had_error:
+            return self.parse_all(source)
+        old = self.source
+        if source == old:
+            self.reparsed_chars = 0
+            return self.statements()
+
+        # The edited range: everything between the common prefix and the common suffix.
+        limit = min(len(old), len(source))
+        prefix = common_length(old, source, limit, lambda text, n: text[:n])
+        suffix = common_length(old, source, limit - prefix, lambda text, n: text[len(text) - n:])
+        return self.update(source, prefix, len(old) - suffix)
+
+    def edit(self, start: int, end: int, text: str) -> list[Stmt]:
+        """The statements after replacing source[start:end] with text, for callers that know the edit."""
+        if self.source is None or self.had_error:
+            return self.parse_all(self.source[:start] + text + self.source[end:])
+        return self.update(self.source[:start] + text + self.source[end:], start, end)
+
+    def statements(self) -> list[Stmt]:
+        """The statements of the current version, with the line numbers it gives them."""
+        statements = []
+        line = 1
+        seen = set()
+        for segment in self.segments:
+            if segment.line != line:
+                shift_lines(segment.statements, line - segment.line, seen)
+                segment.line = line
+            statements.extend(segment.statements)
+            line += segment.newlines
+        return statements
+
+    def parse_all(self, source: str) -> list[Stmt]:
+        """Parses the whole program from scratch, reporting any parsing errors. Lexing errors are raised."""
+        self.source = source
+        self.reparsed_chars = len(source)
+        self.segments = []
+        self.had_error = True  # Until it has parsed: the next version is parsed in full too
+        tokens = FastLexer(source).scan_tokens()
+        parser = Parser(tokens)
+        statements = []
+        ends = []  # Token index just past each declaration
+        while not parser.is_at_end():
+            try:
+                statements.append(parser.declaration())
+                ends.append(parser.current)
+            except RuntimeError as e:
+                print(f"Parsing error: {e}")  # Reported and skipped as Parser.parse() does
+                parser.had_error = True
+                parser.synchronize()
+        self.had_error = parser.had_error
+        if self.had_error:
+            return statements
+        self.segments = self.split(source, 0, len(source), 1, tokens, ends, statements)
+        return statements
+
+    def locate(self, offset: int) -> tuple:
+        """(index, start offset, start line) of the segment holding the character at offset (the last one for the end of the text)."""
+        segments = self.segments
+        start, line = 0, 1
+        for index in range(len(segments) - 1):
+            segment = segments[index]
+            if offset < start + segment.length:
+                return index, start, line
+            start += segment.length
+            line += segment.newlines
+        return len(segments) - 1, start, line
+
+    def update(self, source: str, edit_start: int, edit_end: int) -> list[Stmt]:
+        """Reparses the segments overlapping old offsets edit_start..edit_end of the previous version."""
+        segments = self.segments
+        delta = len(source) - len(self.source)
+
+        first, start, line = self.locate(edit_start)
+        last = max(first, self.locate(edit_end - 1)[0]) if edit_end > edit_start else first
+        end = start + sum(segment.length for segment in segments[first:last + 1]) + delta
+        if first > 0 and any(isinstance(statement, If) for statement in segments[first - 1].statements[-1:]):
+            first -= 1  # The edit may add an 'else' to the if statement just before it
+            start -= segments[first].length
+            line -= segments[first].newlines
+
+        while True:
+            reparsed = self.parse_region(source, start, end, line)
+            if reparsed is not None:
+                break
+            if last == len(segments) - 1:
+                return self.parse_all(source)  # Reports the errors
+            last += 1  # Let the following declaration close what the edit opened
+            end += segments[last].length
+
+        self.segments = segments[:first] + reparsed + segments[last + 1:]
+        self.source = source
+        self.reparsed_chars = end - start
+        return self.statements()
+
+    def parse_region(self, source: str, start: int, end: int, line: int):
+        """
+        Segments for source[start:end], starting on the given line, or None if that text is not
+        a complete sequence of declarations (or fails to lex).
+        """
+        text = source[start:end]
+        lexer = FastLexer(text)
+        lexer.line = line
+        try:
+            tokens = lexer.scan_tokens()
+            parser = Parser(tokens)
+            statements = []
+            ends = []
+            while not parser.is_at_end():
+                statements.append(parser.declaration())
+                ends.append(parser.current)
+        except RuntimeError:
+            return None
+        return self.split(source, start, end, line, tokens, ends, statements)
+
+    @staticmethod
+    def split(source: str, start: int, end: int, line: int, tokens: list[Token], ends: list[int],
+              statements: list[Stmt]) -> list[Segment]:
+        """One Segment per declaration of source[start:end], given the token index each declaration ends at."""
+        if not statements:
+            return [Segment(end - start, source.count('\n', start, end), line, [])]
+        segments = []
+        offset = segment_start = start
+        token_index = 0
+        for index, (statement, token_end) in enumerate(zip(statements, ends)):
+            while token_index < token_end:
+                offset = TRIVIA_PATTERN.match(source, offset).end() + len(tokens[token_index].lexeme)
+                token_index += 1
+            if index == len(statements) - 1:
+                offset = end  # Trailing trivia belongs to the last declaration
+            newlines = source.count('\n', segment_start, offset)
+            segments.append(Segment(offset - segment_start, newlines, line, [statement]))
+            line += newlines
+            segment_start = offset
+        return segments
@@ -0,0 +1,54 @@
+import sys
+
+
+# What input() does once every line of an InputFeed has been read.
+END_POLICIES = (
+    "error",  # Stop the program with a runtime error, as input() does when stdin is closed
+    "nil",  # input() returns nil
+    "empty",  # input() returns an empty string
+)
+
+
+class InputFeed:
+    """
+    Lines that input() reads instead of waiting for the terminal, for replaying recorded
+    sessions in batch runs. The whole input is read up front and split into lines, so each
+    input() is a list lookup, and position tells how many lines the program has consumed.
+    Prompts are written to the program's output, exactly as input() writes them when
+    stdin is redirected, so a replayed run prints the same transcript as `main.py < file`.
+    """
+
+    def __init__(self, lines: list[str], on_end: str = "error"):
+        if on_end not in END_POLICIES:
+            raise ValueError(f"Unknown end-of-input policy '{on_end}'.")
+        self.lines = lines
+        self.position = 0  # Index of the next line to read
+        self.on_end = on_end
+
+    @classmethod
+    def from_text(cls, text: str, on_end: str = "error") -> 'InputFeed':
+        return cls(text.splitlines(), on_end)
+
+    @classmethod
+    def from_file(cls, path: str, on_end: str = "error") -> 'InputFeed':
+        with open(path, 'r') as file:
+            return cls.from_text(file.read(), on_end)
+
+    @classmethod
+    def from_stdin(cls, on_end: str = "error") -> 'InputFeed':
+        """Reads all of stdin now, in one go."""
+        return cls.from_text(sys.stdin.read(), on_end)
+
+    def read_line(self, prompt: str, output) -> object:
+        """The next line, without its line ending. Raises EOFError at the end under the 'error' policy."""
+        if prompt:
+            output.write(prompt)
+        if self.position < len(self.lines):
+            line = self.lines[self.position]
+            self.position += 1
+            return line
+        if self.on_end == "nil":
+            return None
+        if self.on_end == "empty":
+            return ""
+        raise EOFError
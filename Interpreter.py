@@ -1,14 +1,18 @@
-from ast import (
+from Nodes import (
     Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
     Block, If, While, InputExpr,
-    ListLiteral, Index, Call, Function,
+    ListLiteral, Index, Call, Function, Return,
     Expr, Stmt
 )
-from Token import TokenType, Token
+from Token import TokenType, Token, MAX_EXACT_INT
+from Values import ListValue, StringBuilder, extend_string
+from Output import OutputWriter
+from Input import InputFeed
+from Budget import Budget
 
 
-# Represents a runtime environment (scope) for variables.
-# This allows for nested scopes.
+# Represents the global runtime environment (scope), keyed by variable name.
+# Local scopes use the array-backed Frame below.
 class Environment:
     def __init__(self, enclosing=None):
         """
@@ -18,14 +22,21 @@ class Environment:
         """
         self.values = {}
         self.enclosing = enclosing  # Reference to the parent environment
+        self.builtins = set()  # Names still bound to a built-in function
 
     def define(self, name: str, value: object):
         """Declares a new variable in the current environment."""
-        if name in self.values:
+        if name in self.values and name not in self.builtins:
             raise RuntimeError(
                 f"Variable '{name}' already defined in this scope.")  # Prevent re-definition in same scope
+        self.builtins.discard(name)  # A program's own declaration replaces a built-in of the same name
         self.values[name] = value
 
+    def define_builtin(self, name: str, value: object):
+        """Defines a built-in function, which a declaration of the same name may replace."""
+        self.values[name] = value
+        self.builtins.add(name)
+
     def get(self, name_token: Token):
         """Retrieves a variable's value, searching in enclosing environments if not found locally."""
         if name_token.lexeme in self.values:
@@ -49,6 +60,121 @@ class Environment:
         raise RuntimeError(f"Undefined variable '{name_token.lexeme}' on line {name_token.line}.")
 
 
+# Marks a local slot whose declaration has not been executed yet.
+UNDEFINED = object()
+
+
+# Represents a local scope (block or function call) with array-backed storage.
+# The Resolver gives every local variable a (depth, slot) pair ahead of time, so
+# reads and writes index straight into the right frame instead of probing a dict
+# at every level of the enclosing chain. Globals stay in a dict-based Environment.
+class Frame:
+    def __init__(self, enclosing, size: int):
+        """
+        Initializes a new frame.
+        Args:
+            enclosing (Frame or Environment): The parent scope, for lexical scoping.
+            size (int): Number of locals declared directly in this scope.
+        """
+        self.slots = [UNDEFINED] * size
+        self.enclosing = enclosing
+
+    def get_at(self, depth: int, slot: int, name_token: Token):
+        """Reads the local stored in `slot` of the frame `depth` hops up the chain."""
+        frame = self
+        for _ in range(depth):
+            frame = frame.enclosing
+        value = frame.slots[slot]
+        if value is UNDEFINED:
+            raise RuntimeError(f"Undefined variable '{name_token.lexeme}' on line {name_token.line}.")
+        return value
+
+    def assign_at(self, depth: int, slot: int, name_token: Token, value: object):
+        """Assigns to the local stored in `slot` of the frame `depth` hops up the chain."""
+        frame = self
+        for _ in range(depth):
+            frame = frame.enclosing
+        if frame.slots[slot] is UNDEFINED:
+            raise RuntimeError(f"Undefined variable '{name_token.lexeme}' on line {name_token.line}.")
+        frame.slots[slot] = value
+
+
+def declared_binding(env, expr: Variable):
+    """
+    The frame and slot holding a local with a fallback (see Variable.fallback), or (None, fallback)
+    for a global: the first binding along expr's fallbacks whose declaration has run.
+    """
+    while expr.depth is not None:
+        frame = env
+        for _ in range(expr.depth):
+            frame = frame.enclosing
+        if frame.slots[expr.slot] is not UNDEFINED or expr.fallback is None:
+            return frame, expr
+        expr = expr.fallback
+    return None, expr
+
+
+def read_with_fallback(env, expr: Variable, globals_env):
+    """Reads a local that has a fallback, from the first of its bindings that is defined."""
+    frame, binding = declared_binding(env, expr)
+    if frame is None:
+        return globals_env.get(binding.name)
+    value = frame.slots[binding.slot]
+    if value is UNDEFINED:
+        raise RuntimeError(f"Undefined variable '{binding.name.lexeme}' on line {binding.name.line}.")
+    return value
+
+
+def assign_with_fallback(env, expr: Variable, globals_env, value: object):
+    """Assigns to a local that has a fallback, in the first of its bindings that is defined."""
+    frame, binding = declared_binding(env, expr)
+    if frame is None:
+        globals_env.assign(binding.name, value)
+    elif frame.slots[binding.slot] is UNDEFINED:
+        raise RuntimeError(f"Undefined variable '{binding.name.lexeme}' on line {binding.name.line}.")
+    else:
+        frame.slots[binding.slot] = value
+
+
+def block_frame(block: Block, enclosing, top_level_frames: dict) -> Frame:
+    """
+    The frame for a run of a block the Resolver marked reuses_frame, with every local undefined.
+    The enclosing frame keeps it in slot block.frame_slot, so each activation of that frame (each
+    call of the function around the loop, say) has its own, which goes when the activation does.
+    A block whose enclosing scope is the top level keeps its frame in top_level_frames instead.
+    """
+    slot = block.frame_slot
+    if slot is None:
+        frame = top_level_frames.get(block)
+        if frame is None:
+            frame = top_level_frames[block] = Frame(enclosing, block.frame_size)
+            return frame
+    else:
+        frame = enclosing.slots[slot]
+        if frame is UNDEFINED:
+            frame = enclosing.slots[slot] = Frame(enclosing, block.frame_size)
+            return frame
+    # Nothing is left over from the last run; the frames kept for blocks in this one stay.
+    local_count = block.local_count
+    frame.slots[:local_count] = [UNDEFINED] * local_count
+    return frame
+
+
+# Signals returned by Interpreter.execute() once a return statement has run, so the enclosing
+# statements stop and the function call finishes without unwinding through an exception.
+RETURNING = object()  # interpreter.return_value holds the returned value
+TAIL_CALL = object()  # interpreter.tail_call holds the (function, arguments) to run in place of the current call
+
+
+def as_index(value):
+    """Returns value as a list/string index if it is an integral number, otherwise None."""
+    if type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    return None  # Non-numbers, fractional numbers and booleans
+
+
 # Represents a callable function in the MyPi language (user-defined or built-in).
 class LoxCallable:
     def call(self, interpreter, arguments: list) -> object:
@@ -65,45 +191,75 @@ class LoxFunction(LoxCallable):
         self.closure = closure  # The environment where the function was declared (for closures)
 
     def call(self, interpreter, arguments: list) -> object:
-        # Create a new environment for the function call, linked to its declaration environment (closure)
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            # Define parameters as local variables in the function's environment
-            param_name = self.declaration.params[i].lexeme
-            arg_value = arguments[i]
-            environment.define(param_name, arg_value)
+        budget = interpreter.budget
+        budget.depth_left -= 1
+        if budget.depth_left < 0:
+            budget.too_deep()
+        signal = self.invoke(interpreter, arguments)
+        # Tail calls run here, one after the other, instead of nesting Python calls.
+        while signal is TAIL_CALL:
+            function, arguments = interpreter.tail_call
+            signal = function.invoke(interpreter, arguments)
+        budget.depth_left += 1
+
+        if signal is RETURNING:
+            return interpreter.return_value
+        return None  # Functions without a return statement return nil
+
+    def invoke(self, interpreter, arguments: list) -> object:
+        """Runs the body once and returns the execute() signal it finished with."""
+        budget = interpreter.budget
+        budget.steps_left -= 1
+        if budget.steps_left < 0:
+            budget.checkpoint()
+        # Create a new frame for the function call, linked to its declaration environment (closure)
+        environment = Frame(self.closure, self.declaration.frame_size)
+        # Parameters occupy the first slots of the function's frame: bind them all in one go
+        environment.slots[:len(arguments)] = arguments
 
         # Execute the function body within the new environment
         # Use execute_block to handle environment switching correctly
-        interpreter.execute_block(self.declaration.body.statements, environment)
-
-        # Functions implicitly return nil for now (PLANNED: to add return keyword)
-        return None
+        return interpreter.execute_block(self.declaration.body.statements, environment)
 
     def arity(self) -> int:
         return len(self.declaration.params)  # Number of parameters
 
 
+def list_remove_at(interpreter, list_obj: object, index: object):
+    """list_remove_at(list_obj, index), which the engines call directly when a call site names it."""
+    if not isinstance(list_obj, ListValue):
+        raise RuntimeError("First argument to 'list_remove_at' must be a list.")
+    index = as_index(index)
+    if index is None:
+        raise RuntimeError("Second argument to 'list_remove_at' must be an integer index.")
+
+    if not (0 <= index < len(list_obj)):
+        raise RuntimeError(f"Index out of bounds: {index} for list of size {len(list_obj)}.")
+
+    list_obj.pop(index)  # Modify list in place
+    return None  # Return nil
+
+
+def list_append(interpreter, list_obj: object, value: object):
+    """list_append(list_obj, value), which the engines call directly when a call site names it."""
+    if not isinstance(list_obj, ListValue):
+        raise RuntimeError("First argument to 'list_append' must be a list.")
+
+    budget = interpreter.budget
+    budget.elements_left -= 1
+    if budget.elements_left < 0:
+        budget.out_of_elements()
+    list_obj.append(value)  # Modify list in place
+    return None  # Return nil
+
+
 # Built-in function for list element removal.
 class BuiltInListRemoveAt(LoxCallable):
     def arity(self) -> int:
         return 2
 
     def call(self, interpreter, arguments: list) -> object:
-        list_obj = arguments[0]
-        index = arguments[1]
-
-        if not isinstance(list_obj, list):
-            raise RuntimeError("First argument to 'list_remove_at' must be a list.")
-        if not isinstance(index, (int, float)) or not index.is_integer():
-            raise RuntimeError("Second argument to 'list_remove_at' must be an integer index.")
-
-        index = int(index)
-        if not (0 <= index < len(list_obj)):
-            raise RuntimeError(f"Index out of bounds: {index} for list of size {len(list_obj)}.")
-
-        list_obj.pop(index)  # Modify list in place
-        return None  # Return nil
+        return list_remove_at(interpreter, arguments[0], arguments[1])
 
 
 # Built-in function for list append.
@@ -112,76 +268,338 @@ class BuiltInListAppend(LoxCallable):
         return 2
 
     def call(self, interpreter, arguments: list) -> object:
-        list_obj = arguments[0]
+        return list_append(interpreter, arguments[0], arguments[1])
+
+
+# The two-argument built-ins with a direct fast path, by type.
+LIST_BUILTINS = {BuiltInListAppend: list_append, BuiltInListRemoveAt: list_remove_at}
+
+
+ORDINALS = ("First", "Second", "Third")
+
+
+# Base of the bulk list built-ins (len, slice, sort, ...). Each one does its whole job with a
+# single native operation on the list's storage instead of an interpreted loop.
+class BuiltInListFunction(LoxCallable):
+    name = ""  # Name the built-in is registered under, for error messages
+    params = 1
+
+    def arity(self) -> int:
+        return self.params
+
+    def expect_list(self, arguments: list, position: int = 0) -> ListValue:
+        value = arguments[position]
+        if not isinstance(value, ListValue):
+            raise RuntimeError(f"{ORDINALS[position]} argument to '{self.name}' must be a list.")
+        return value
+
+    def expect_sequence(self, arguments: list) -> object:
+        value = arguments[0]
+        if not isinstance(value, (ListValue, str)):
+            raise RuntimeError(f"First argument to '{self.name}' must be a list or a string.")
+        return value
+
+    def expect_index(self, arguments: list, position: int) -> int:
+        index = as_index(arguments[position])
+        if index is None:
+            raise RuntimeError(f"{ORDINALS[position]} argument to '{self.name}' must be an integer index.")
+        return index
+
+    def expect_numbers(self, list_obj: ListValue):
+        if not set(map(type, list_obj.items)) <= {int, float}:
+            raise RuntimeError(f"List passed to '{self.name}' must contain only numbers.")
+
+    def expect_ordered(self, list_obj: ListValue):
+        """Checks that the elements can be ordered: all numbers or all strings."""
+        types = set(map(type, list_obj.items))
+        if not (types <= {int, float} or types == {str}):
+            raise RuntimeError(f"List passed to '{self.name}' must contain only numbers or only strings.")
+
+    def expect_not_empty(self, list_obj: ListValue):
+        if len(list_obj.items) == 0:
+            raise RuntimeError(f"List passed to '{self.name}' must not be empty.")
+
+    def search(self, interpreter, arguments: list) -> int:
+        """Position of the second argument in the first (a list or a string), or -1."""
+        sequence = self.expect_sequence(arguments)
         value = arguments[1]
+        if isinstance(sequence, str):
+            if not isinstance(value, str):
+                raise RuntimeError(f"Second argument to '{self.name}' must be a string when searching a string.")
+            return sequence.find(value)
+        return sequence.index_of(value, interpreter._is_equal)
+
+
+# len(list_or_string): number of elements or characters.
+class BuiltInLen(BuiltInListFunction):
+    name = "len"
+
+    def call(self, interpreter, arguments: list) -> object:
+        return len(self.expect_sequence(arguments))
+
+
+# slice(list_or_string, start, end): new list (or string) holding the elements from start up to, not including, end.
+class BuiltInSlice(BuiltInListFunction):
+    name = "slice"
+    params = 3
+
+    def call(self, interpreter, arguments: list) -> object:
+        sequence = self.expect_sequence(arguments)
+        start = self.expect_index(arguments, 1)
+        end = self.expect_index(arguments, 2)
+        size = len(sequence)
+        if not (0 <= start <= end <= size):
+            raise RuntimeError(f"Slice bounds out of range: {start} to {end} for size {size}.")
+        interpreter.budget.allocate(end - start)
+        if isinstance(sequence, str):
+            return sequence[start:end]
+        return ListValue.with_storage(sequence.items[start:end])
+
+
+# extend(list, other): appends every element of other to list, in place.
+class BuiltInExtend(BuiltInListFunction):
+    name = "extend"
+    params = 2
+
+    def call(self, interpreter, arguments: list) -> object:
+        other = self.expect_list(arguments, 1)
+        interpreter.budget.allocate(len(other))
+        self.expect_list(arguments).extend(other)
+        return None
+
+
+# insert(list, index, value): inserts value before position index (index == len(list) appends).
+class BuiltInInsert(BuiltInListFunction):
+    name = "insert"
+    params = 3
+
+    def call(self, interpreter, arguments: list) -> object:
+        list_obj = self.expect_list(arguments)
+        index = self.expect_index(arguments, 1)
+        if not (0 <= index <= len(list_obj.items)):
+            raise RuntimeError(f"Index out of bounds: {index} for list of size {len(list_obj.items)}.")
+        interpreter.budget.allocate(1)
+        list_obj.insert(index, arguments[2])
+        return None
+
+
+# index_of(list_or_string, value): position of the first element equal to value (or of the substring), or -1.
+class BuiltInIndexOf(BuiltInListFunction):
+    name = "index_of"
+    params = 2
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.search(interpreter, arguments)
+
+
+# contains(list_or_string, value): whether index_of() would find value.
+class BuiltInContains(BuiltInListFunction):
+    name = "contains"
+    params = 2
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.search(interpreter, arguments) != -1
+
 
-        if not isinstance(list_obj, list):
-            raise RuntimeError("First argument to 'list_append' must be a list.")
+# sort(list): sorts the list in ascending order, in place.
+class BuiltInSort(BuiltInListFunction):
+    name = "sort"
 
-        list_obj.append(value)  # Modify list in place
-        return None  # Return nil
+    def call(self, interpreter, arguments: list) -> object:
+        list_obj = self.expect_list(arguments)
+        self.expect_ordered(list_obj)
+        list_obj.sort()
+        return None
+
+
+# reverse(list): reverses the order of the elements, in place.
+class BuiltInReverse(BuiltInListFunction):
+    name = "reverse"
+
+    def call(self, interpreter, arguments: list) -> object:
+        self.expect_list(arguments).reverse()
+        return None
+
+
+# sum(list): sum of a list of numbers (0 for an empty list).
+class BuiltInSum(BuiltInListFunction):
+    name = "sum"
+
+    def call(self, interpreter, arguments: list) -> object:
+        list_obj = self.expect_list(arguments)
+        self.expect_numbers(list_obj)
+        total = sum(list_obj.items)
+        return total if -MAX_EXACT_INT <= total <= MAX_EXACT_INT else float(total)
+
+
+# min(list): smallest element of a non-empty list of numbers or of strings.
+class BuiltInMin(BuiltInListFunction):
+    name = "min"
+
+    def call(self, interpreter, arguments: list) -> object:
+        list_obj = self.expect_list(arguments)
+        self.expect_ordered(list_obj)
+        self.expect_not_empty(list_obj)
+        return min(list_obj.items)
+
+
+# max(list): largest element of a non-empty list of numbers or of strings.
+class BuiltInMax(BuiltInListFunction):
+    name = "max"
+
+    def call(self, interpreter, arguments: list) -> object:
+        list_obj = self.expect_list(arguments)
+        self.expect_ordered(list_obj)
+        self.expect_not_empty(list_obj)
+        return max(list_obj.items)
+
+
+# fill(list, value): sets every element of the list to value, in place.
+class BuiltInFill(BuiltInListFunction):
+    name = "fill"
+    params = 2
+
+    def call(self, interpreter, arguments: list) -> object:
+        self.expect_list(arguments).fill(arguments[1])
+        return None
 
 
 class Interpreter:
-    def __init__(self):
+    # Callable created for each function declaration (the profiler substitutes its own).
+    function_type = LoxFunction
+
+    def __init__(self, output=None, input_feed: InputFeed = None, budget: Budget = None):
+        # Where print statements and runtime errors go: an OutputWriter, or any stream
+        # object with write() to wrap in one (None: a buffered writer on sys.stdout).
+        self.output = output if isinstance(output, OutputWriter) else OutputWriter(output)
+        # Lines for input() to read instead of stdin (None: read the terminal).
+        self.input_feed = input_feed
+        # Limits on steps, time, call depth and allocation (by default none).
+        self.budget = budget if budget is not None else Budget()
         # The top-most global environment.
         self.globals = Environment()
         # The current environment.
         self.environment = self.globals
+        # Frames of the blocks in top-level loops that reuse their frame (see block_frame).
+        self.block_frames = {}
+        # The callable each Call node called last, already checked to accept its arguments: the
+        # call sites' inline caches. They belong to this run, not to the AST, which may be reused.
+        self.checked_callees = {}
+        # Set by a return statement together with the RETURNING / TAIL_CALL signal.
+        self.return_value = None
+        self.tail_call = None
 
         # Define built-in functions
-        self.globals.define("list_remove_at", BuiltInListRemoveAt())
-        self.globals.define("list_append", BuiltInListAppend())
-
-    def interpret(self, statements: list[Stmt]):
-        for statement in statements:
-            try:
-                self.execute(statement)
-            except RuntimeError as e:
-                print(f"Runtime error: {e}")
-                # For basic error handling, we stop on the first runtime error.
-                break
+        self.globals.define_builtin("list_remove_at", BuiltInListRemoveAt())
+        self.globals.define_builtin("list_append", BuiltInListAppend())
+        for builtin in (BuiltInLen(), BuiltInSlice(), BuiltInExtend(), BuiltInInsert(),
+                        BuiltInIndexOf(), BuiltInContains(), BuiltInSort(), BuiltInReverse(),
+                        BuiltInSum(), BuiltInMin(), BuiltInMax(), BuiltInFill()):
+            self.globals.define_builtin(builtin.name, builtin)
+
+    def interpret(self, statements: list[Stmt]) -> bool:
+        """Executes the statements. Returns False if a runtime error stopped the program."""
+        try:
+            self.budget.start()
+            for statement in statements:
+                try:
+                    self.execute(statement)
+                except RuntimeError as e:
+                    self.output.write_line(f"Runtime error: {e}")
+                    # For basic error handling, we stop on the first runtime error.
+                    return False
+            return True
+        finally:
+            self.output.flush()  # Everything printed is out before control returns
+
+    def read_input(self, prompt: str) -> object:
+        """The value of input(prompt): the next line of the input feed, or else a line read from stdin."""
+        try:
+            if self.input_feed is not None:
+                line = self.input_feed.read_line(prompt, self.output)
+            else:
+                self.output.flush()  # Earlier output comes before the prompt
+                line = input(prompt)
+        except EOFError:
+            raise RuntimeError("No more input for input() to read.")
+        if line is not None:
+            self.budget.allocate(len(line))
+        return line
 
     def execute(self, stmt: Stmt):
-        """Executes a statement."""
+        """Executes a statement. Returns None, or RETURNING / TAIL_CALL once a return statement has run."""
         if isinstance(stmt, ExpressionStmt):
             self.evaluate(stmt.expression)
         elif isinstance(stmt, PrintStmt):
             value = self.evaluate(stmt.expression)
-            print(self.stringify(value))
+            self.output.write_line(self.stringify(value))
         elif isinstance(stmt, Var):
             value = None
             if stmt.initializer:
                 value = self.evaluate(stmt.initializer)
-            self.environment.define(stmt.name.lexeme, value)  # Define in current environment
+            if stmt.slot is None:
+                self.globals.define(stmt.name.lexeme, value)  # Top-level declaration
+            else:
+                self.environment.slots[stmt.slot] = value  # Local declaration in the current frame
 
         # Execute a block
         elif isinstance(stmt, Block):
-            # Pass the block's statements and create a new environment for it.
-            self.execute_block(stmt.statements, Environment(self.environment))
+            if not stmt.frame_size:
+                # The block declares nothing, so it runs in the current environment.
+                for statement in stmt.statements:
+                    signal = self.execute(statement)
+                    if signal is not None:
+                        return signal
+            elif stmt.reuses_frame:
+                return self.execute_block(stmt.statements, block_frame(stmt, self.environment, self.block_frames))
+            else:
+                # Pass the block's statements and create a new frame for it.
+                return self.execute_block(stmt.statements, Frame(self.environment, stmt.frame_size))
 
         # Execute an if statement
         elif isinstance(stmt, If):
             # Evaluate condition and check its truthiness
             if self._is_truthy(self.evaluate(stmt.condition)):
-                self.execute(stmt.then_branch)
+                return self.execute(stmt.then_branch)
             elif stmt.else_branch:  # Only execute else if it exists
-                self.execute(stmt.else_branch)
+                return self.execute(stmt.else_branch)
 
         # Execute a while loop
         elif isinstance(stmt, While):
             # Loop while condition is true
+            budget = self.budget
             while self._is_truthy(self.evaluate(stmt.condition)):
-                self.execute(stmt.body)
+                signal = self.execute(stmt.body)
+                if signal is not None:
+                    return signal
+                budget.steps_left -= 1  # One step per completed iteration
+                if budget.steps_left < 0:
+                    budget.checkpoint()
 
         # Execute a function declaration
         elif isinstance(stmt, Function):
             # Wrap the AST function declaration in a LoxFunction callable object
             # Pass the current environment as the function's closure
-            function = LoxFunction(stmt, self.environment)
-            self.environment.define(stmt.name.lexeme, function)  # Define the function in the current scope
-
-    def execute_block(self, statements: list[Stmt], environment: Environment):
+            function = self.function_type(stmt, self.environment)
+            if stmt.slot is None:
+                self.globals.define(stmt.name.lexeme, function)
+            else:
+                self.environment.slots[stmt.slot] = function  # Define the function in the current scope
+
+        # Execute a return statement
+        elif isinstance(stmt, Return):
+            if stmt.tail_call:
+                callee, arguments = self.prepare_call(stmt.value)
+                if isinstance(callee, LoxFunction):
+                    # Let the caller's LoxFunction.call run it after this call's frame is gone.
+                    self.tail_call = (callee, arguments)
+                    return TAIL_CALL
+                self.return_value = callee.call(self, arguments)
+            else:
+                self.return_value = self.evaluate(stmt.value) if stmt.value else None
+            return RETURNING
+
+    def execute_block(self, statements: list[Stmt], environment: Frame):
         """
         Executes a list of statements within a new, temporary environment (scope).
         This method is critical for managing lexical scope (e.g., for blocks or functions).
@@ -190,7 +608,9 @@ class Interpreter:
         try:
             self.environment = environment  # Switch to the new environment for the block
             for statement in statements:
-                self.execute(statement)
+                signal = self.execute(statement)
+                if signal is not None:
+                    return signal  # A return statement ends the block early
         finally:
             # Restore the previous environment when exiting the block,
             # regardless of whether an error occurred.
@@ -203,26 +623,15 @@ class Interpreter:
             right = self.evaluate(expr.right)
 
             if expr.operator.type == TokenType.PLUS:
-                # RELAXED RULE: If one operand is a string, convert the other to string.
-                if isinstance(left, str) or isinstance(right, str):
-                    return self.stringify(left) + self.stringify(right)
-                # Handle number addition
-                elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left + right
-                # Handle list concatenation
-                elif isinstance(left, list) and isinstance(right, list):
-                    return left + right  # Python list concatenation
-                else:
-                    # This fallback should ideally not be hit
-                    # but kept for robustness if types are truly incompatible.
-                    raise RuntimeError(
-                        f"Operands of '+' must be two numbers, two strings or two lists on line {expr.operator.line}.")
+                return self.add(left, right, expr.operator)
             elif expr.operator.type == TokenType.MINUS:
                 self._check_number_operands(expr.operator, left, right)
-                return left - right
+                result = left - right
+                return result if -MAX_EXACT_INT <= result <= MAX_EXACT_INT else float(result)
             elif expr.operator.type == TokenType.STAR:
                 self._check_number_operands(expr.operator, left, right)
-                return left * right
+                result = left * right
+                return result if -MAX_EXACT_INT <= result <= MAX_EXACT_INT else float(result)
             elif expr.operator.type == TokenType.SLASH:
                 self._check_number_operands(expr.operator, left, right)
                 if right == 0:
@@ -270,35 +679,46 @@ class Interpreter:
             return self.evaluate(expr.expression)
 
         elif isinstance(expr, Variable):
-            return self.environment.get(expr.name)  # Get from current environment
+            value = self.read_variable(expr)
+            if expr.materialize and type(value) is StringBuilder:
+                return value.value()  # A string being built is only joined when it is read
+            return value
 
         elif isinstance(expr, Assign):
             # Assignment now handles Variable or Index targets
             # Evaluate the right-hand side value
-            value = self.evaluate(expr.value)
+            if expr.appended:
+                value = self.build_string(expr)
+            else:
+                value = self.evaluate(expr.value)
 
             # If the target is a Variable, simply assign to the environment
             if isinstance(expr.target_expr, Variable):
-                self.environment.assign(expr.target_expr.name, value)
+                target = expr.target_expr
+                if target.depth is None:
+                    self.globals.assign(target.name, value)
+                elif target.fallback is not None:
+                    assign_with_fallback(self.environment, target, self.globals, value)
+                else:
+                    self.environment.assign_at(target.depth, target.slot, target.name, value)
             # If the target is an Index (e.g., myList[0] = value)
             elif isinstance(expr.target_expr, Index):
                 list_obj = self.evaluate(expr.target_expr.obj)
                 index_val = self.evaluate(expr.target_expr.index_expr)
 
-                if not isinstance(list_obj, list):
+                if not isinstance(list_obj, ListValue):
                     raise RuntimeError(
                         f"Cannot assign to non-list type via index on line {expr.target_expr.obj.name.line if hasattr(expr.target_expr.obj, 'name') else expr.target_expr.obj.line if hasattr(expr.target_expr.obj, 'line') else '?'}.")
-                if not isinstance(index_val, (int, float)) or not index_val.is_integer():
+                index_val = as_index(index_val)
+                if index_val is None:
                     raise RuntimeError(
                         f"List index must be an integer on line {expr.target_expr.index_expr.line if hasattr(expr.target_expr.index_expr, 'line') else '?'}.")
 
-                index_val = int(index_val)  # Convert to int
-
-                if not (0 <= index_val < len(list_obj)):
+                if not (0 <= index_val < len(list_obj.items)):
                     raise RuntimeError(
                         f"List index out of bounds: {index_val} on line {expr.target_expr.index_expr.line if hasattr(expr.target_expr.index_expr, 'line') else '?'}.")
 
-                list_obj[index_val] = value  # Perform in-place assignment
+                list_obj.store(index_val, value)  # Perform in-place assignment
             else:  # This 'else' belongs to the Assignment target type check
                 raise RuntimeError(
                     f"Invalid assignment target on line {expr.target_expr.line if hasattr(expr.target_expr, 'line') else '?'}.")
@@ -313,25 +733,30 @@ class Interpreter:
                     raise RuntimeError(
                         f"Input prompt must be a string on line {expr.prompt.line if hasattr(expr.prompt, 'line') else '?'}.")
                 prompt_str = evaluated_prompt
-            return input(prompt_str)
+            return self.read_input(prompt_str)
 
         elif isinstance(expr, ListLiteral):
+            if expr.constant is not None:
+                self.budget.allocate(len(expr.constant))
+                return ListValue(expr.constant)  # Elements were precomputed by the Optimizer
             elements = [self.evaluate(el) for el in expr.elements]
-            return elements  # Python list used for MyPi list
+            self.budget.allocate(len(elements))
+            return ListValue(elements)
 
         elif isinstance(expr, Index):
             obj = self.evaluate(expr.obj)
             index_val = self.evaluate(expr.index_expr)
 
-            if not isinstance(obj, (list, str)):  # Allow indexing on lists and strings
+            if isinstance(obj, ListValue):
+                obj = obj.items  # Index the storage directly
+            elif not isinstance(obj, str):  # Allow indexing on lists and strings
                 raise RuntimeError(
                     f"Only lists and strings can be indexed on line {expr.obj.name.line if hasattr(expr.obj, 'name') else expr.obj.line if hasattr(expr.obj, 'line') else '?'}.")
-            if not isinstance(index_val, (int, float)) or not index_val.is_integer():
+            index_val = as_index(index_val)
+            if index_val is None:
                 raise RuntimeError(
                     f"Index must be an integer on line {expr.index_expr.line if hasattr(expr.index_expr, 'line') else '?'}.")
 
-            index_val = int(index_val)  # Convert float index to int
-
             if not (0 <= index_val < len(obj)):
                 raise RuntimeError(
                     f"Index out of bounds: {index_val} on line {expr.index_expr.line if hasattr(expr.index_expr, 'line') else '?'}.")
@@ -339,23 +764,94 @@ class Interpreter:
             return obj[index_val]
 
         elif isinstance(expr, Call):
-            callee = self.evaluate(expr.callee)  # Evaluate the expression that produces the callable object
+            callee = self.evaluate_callee(expr.callee)
+            if type(callee) in LIST_BUILTINS and len(expr.arguments) == 2:
+                # list_append/list_remove_at: no argument list, and the arity is known to match
+                return LIST_BUILTINS[type(callee)](self, self.evaluate(expr.arguments[0]),
+                                                   self.evaluate(expr.arguments[1]))
+            arguments = [self.evaluate(arg) for arg in expr.arguments]
+            if callee is not self.checked_callees.get(expr):
+                self.check_call(expr, callee, arguments)
+            return callee.call(self, arguments)  # Execute the callable
 
-            arguments = [self.evaluate(arg) for arg in expr.arguments]  # Evaluate all arguments
+        else:
+            raise RuntimeError(f"Unknown expression type: {type(expr).__name__}")
 
-            if not isinstance(callee, LoxCallable):
-                raise RuntimeError(
-                    f"Not a callable type on line {expr.callee.name.line if hasattr(expr.callee, 'name') else expr.callee.line if hasattr(expr.callee, 'line') else '?'}.")
+    def read_variable(self, expr: Variable) -> object:
+        """The value in a variable's slot, as stored (a StringBuilder is not joined)."""
+        if expr.depth is None:
+            return self.globals.get(expr.name)
+        if expr.fallback is not None:
+            return read_with_fallback(self.environment, expr, self.globals)
+        return self.environment.get_at(expr.depth, expr.slot, expr.name)  # Resolved local
+
+    def build_string(self, expr: Assign) -> object:
+        """Evaluates the value of a `v = v + a + b;` statement, extending v in place while it holds a string."""
+        left = self.read_variable(expr.appended[0].left)
+        if type(left) is StringBuilder or type(left) is str:
+            length = left.length if type(left) is StringBuilder else 0
+            # Once the left operand is a string, each '+' stringifies its right operand and appends it.
+            text = "".join([self.stringify(self.evaluate(step.right)) for step in expr.appended])
+            self.budget.allocate(len(text))
+            return extend_string(left, length, text)
+        for step in expr.appended:
+            left = self.add(left, self.evaluate(step.right), step.operator)
+        return left
+
+    def add(self, left: object, right: object, operator: Token) -> object:
+        """The '+' operator on two evaluated operands."""
+        # RELAXED RULE: If one operand is a string, convert the other to string.
+        if isinstance(left, str) or isinstance(right, str):
+            text = self.stringify(left) + self.stringify(right)
+            self.budget.allocate(len(text))
+            return text
+        # Handle number addition
+        elif isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            result = left + right
+            return result if -MAX_EXACT_INT <= result <= MAX_EXACT_INT else float(result)
+        # Handle list concatenation
+        elif isinstance(left, ListValue) and isinstance(right, ListValue):
+            self.budget.allocate(len(right))
+            return left.concat(right)
+        else:
+            # This fallback should ideally not be hit
+            # but kept for robustness if types are truly incompatible.
+            raise RuntimeError(
+                f"Operands of '+' must be two numbers, two strings or two lists on line {operator.line}.")
 
-            # Check arity (number of arguments)
-            if len(arguments) != callee.arity():
-                raise RuntimeError(
-                    f"Expected {callee.arity()} arguments but got {len(arguments)} on line {expr.callee.name.line if hasattr(expr.callee, 'name') else expr.callee.line if hasattr(expr.callee, 'line') else '?'}.")
+    def prepare_call(self, expr: Call) -> tuple:
+        """Evaluates the callee and arguments of a call and checks them. Returns (callee, arguments)."""
+        callee = self.evaluate_callee(expr.callee)  # Evaluate the expression that produces the callable object
 
-            return callee.call(self, arguments)  # Execute the callable
+        arguments = [self.evaluate(arg) for arg in expr.arguments]  # Evaluate all arguments
 
-        else:
-            raise RuntimeError(f"Unknown expression type: {type(expr).__name__}")
+        if callee is not self.checked_callees.get(expr):
+            self.check_call(expr, callee, arguments)
+        return callee, arguments
+
+    def evaluate_callee(self, callee_expr: Expr) -> object:
+        """Evaluates a call's callee. A global name, the usual case, costs a single dict lookup."""
+        if type(callee_expr) is Variable and callee_expr.depth is None:
+            callee = self.globals.values.get(callee_expr.name.lexeme, UNDEFINED)
+            if callee is not UNDEFINED:
+                return callee
+        return self.evaluate(callee_expr)  # Locals, other expressions, and undefined names (reported)
+
+    def check_call(self, expr: Call, callee: object, arguments: list):
+        """
+        Checks that callee can be called with the arguments and, if so, remembers it for the Call
+        node: the next time the call site evaluates to the same callable, the checks are skipped.
+        """
+        if not isinstance(callee, LoxCallable):
+            raise RuntimeError(
+                f"Not a callable type on line {expr.callee.name.line if hasattr(expr.callee, 'name') else expr.callee.line if hasattr(expr.callee, 'line') else '?'}.")
+
+        # Check arity (number of arguments)
+        if len(arguments) != callee.arity():
+            raise RuntimeError(
+                f"Expected {callee.arity()} arguments but got {len(arguments)} on line {expr.callee.name.line if hasattr(expr.callee, 'name') else expr.callee.line if hasattr(expr.callee, 'line') else '?'}.")
+
+        self.checked_callees[expr] = callee
 
     def _is_truthy(self, obj: object) -> bool:
         """Determines the 'truthiness' of a value for if/while conditions."""
@@ -363,20 +859,21 @@ class Interpreter:
         if isinstance(obj, bool): return obj
         if isinstance(obj, (int, float)): return obj != 0
         if isinstance(obj, str): return len(obj) > 0
-        if isinstance(obj, list): return len(obj) > 0
+        if isinstance(obj, ListValue): return len(obj) > 0
         return False
 
     def stringify(self, value: object) -> str:
         """Converts a Python value to its string representation for printing."""
         if value is None: return "nil"
         if isinstance(value, bool): return str(value).lower()
+        if isinstance(value, int): return str(value)
         if isinstance(value, float):
             if value.is_integer():
                 return str(int(value))
             return str(value)
         if isinstance(value, str):
             return value
-        if isinstance(value, list):
+        if isinstance(value, ListValue):
             elements_str = [self.stringify(elem) for elem in value]
             return "[" + ", ".join(elements_str) + "]"
         if isinstance(value, LoxCallable):
@@ -384,9 +881,9 @@ class Interpreter:
         return str(value)
 
     def _is_equal(self, a: object, b: object) -> bool:
-        """Strict equality check."""
+        """Strict equality check. Integers and floats are both numbers, so 1 == 1.0."""
         if type(a) != type(b):
-            return False
+            return type(a) in (int, float) and type(b) in (int, float) and a == b
         if a is None and b is None: return True
         if a is None: return False
         return a == b
@@ -1,4 +1,15 @@
-from Token import Token, TokenType
+import re
+import sys
+
+from Token import Token, TokenType, MAX_EXACT_INT
+
+
+def number_literal(text: str):
+    """Value of a number literal: an int for digits only, a float if it has a fractional part."""
+    if '.' in text:
+        return float(text)
+    value = int(text)
+    return value if value <= MAX_EXACT_INT else float(value)
 
 
 class Lexer:
@@ -22,6 +33,7 @@ class Lexer:
             "while": TokenType.WHILE,
             "fun": TokenType.FUN,
             "input": TokenType.INPUT, # Keep input as a keyword, as it's a special AST node
+            "return": TokenType.RETURN,
             # REMOVED: list_remove_at and list_append from keywords.
             # Handled within the identifier() method's specific checks.
         }
@@ -142,14 +154,15 @@ class Lexer:
             while self.peek().isdigit():
                 self.advance()
 
-        value = float(self.source[self.start:self.current])
-        self.add_token(TokenType.NUMBER, value)
+        self.add_token(TokenType.NUMBER, number_literal(self.source[self.start:self.current]))
 
     def identifier(self):
         while self.peek().isalnum() or self.peek() == '_':
             self.advance()
 
-        text = self.source[self.start:self.current]
+        # Identifiers are interned so every occurrence of a name shares one string and
+        # environment lookups can compare keys by identity.
+        text = sys.intern(self.source[self.start:self.current])
         type = self.keywords.get(text)
         if type is None:
             if text == "list_remove_at":
@@ -159,7 +172,7 @@ class Lexer:
             else:
                 type = TokenType.IDENTIFIER
 
-        self.add_token(type)
+        self.tokens.append(Token(type, text, None, self.line))
 
     def match_char(self, expected: str) -> bool:
         if self.is_at_end() or self.source[self.current] != expected:
@@ -189,3 +202,212 @@ class Lexer:
         lexeme = self.source[self.start:self.current]
         self.tokens.append(Token(type, lexeme, literal, self.line))
 
+
+# Single-character tokens and the one/two-character operators recognized by the master regex.
+OPERATORS = {
+    '(': TokenType.LEFT_PAREN, ')': TokenType.RIGHT_PAREN,
+    '{': TokenType.LEFT_BRACE, '}': TokenType.RIGHT_BRACE,
+    '[': TokenType.LEFT_BRACKET, ']': TokenType.RIGHT_BRACKET,
+    ',': TokenType.COMMA, '-': TokenType.MINUS, '+': TokenType.PLUS,
+    '*': TokenType.STAR, ';': TokenType.SEMICOLON, '/': TokenType.SLASH,
+    '!': TokenType.BANG, '!=': TokenType.BANG_EQUAL,
+    '=': TokenType.EQUAL, '==': TokenType.EQUAL_EQUAL,
+    '>': TokenType.GREATER, '>=': TokenType.GREATER_EQUAL,
+    '<': TokenType.LESS, '<=': TokenType.LESS_EQUAL,
+}
+
+ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\', 'r': '\r', '0': '\x00'}
+
+# One compiled alternation covering every ASCII token. Anything it cannot match exactly
+# (non-ASCII characters, invalid escapes, unterminated strings) is handed to the classic scanner.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>[ \t\n\r\x0b\x0c\x1c-\x1f]+)
+  | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<operator>[!=<>]=?|[(){}\[\],\-+*;]|/(?!/))
+  | (?P<number>[0-9]+(?:\.[0-9]+)?)
+  | (?P<string>"(?:[^"\\]|\\[nt"\\r0])*")
+  | (?P<comment>//[^\n]*)
+""", re.VERBOSE)
+
+ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+
+
+def _decode_escape(match) -> str:
+    return ESCAPES[match.group(1)]
+
+
+class FastLexer(Lexer):
+    """
+    High-throughput lexer producing exactly the same Token stream (and line numbers) as Lexer.
+    Each token is recognized by one match of a compiled master regex with named groups, and
+    string escapes are decoded in a single re.sub pass. Inputs the regex does not cover exactly
+    fall back to the classic scan_token() for that one token, so errors are reported identically.
+    """
+
+    def scan_tokens(self) -> list[Token]:
+        source = self.source
+        end = len(source)
+        tokens = self.tokens
+        keywords = self.keywords
+        match = TOKEN_PATTERN.match
+        intern = sys.intern
+        position = self.current
+        line = self.line
+
+        while position < end:
+            m = match(source, position)
+            kind = m.lastgroup if m else None
+            if kind is None or (kind in ('identifier', 'number') and m.end() < end
+                                and (source[m.end()] >= '\x80' or (kind == 'number' and source[m.end()] == '.'))):
+                # Not covered by the regex, or possibly the ASCII prefix of a longer Unicode
+                # identifier/number (str.isdigit() accepts more than [0-9]): scan this token the classic way.
+                self.start = self.current = position
+                self.line = line
+                self.scan_token()
+                position = self.current
+                line = self.line
+                continue
+
+            text = m.group()
+            position = m.end()
+            if kind == 'space':
+                if '\n' in text:
+                    line += text.count('\n')
+            elif kind == 'identifier':
+                text = intern(text)
+                type = keywords.get(text)
+                if type is None:
+                    if text == "list_remove_at":
+                        type = TokenType.LIST_REMOVE_AT
+                    elif text == "list_append":
+                        type = TokenType.LIST_APPEND
+                    else:
+                        type = TokenType.IDENTIFIER
+                tokens.append(Token(type, text, None, line))
+            elif kind == 'operator':
+                tokens.append(Token(OPERATORS[text], text, None, line))
+            elif kind == 'number':
+                tokens.append(Token(TokenType.NUMBER, text, number_literal(text), line))
+            elif kind == 'string':
+                raw = text[1:-1]
+                if '\n' in raw:
+                    line += raw.count('\n')
+                value = ESCAPE_PATTERN.sub(_decode_escape, raw) if '\\' in raw else raw
+                tokens.append(Token(TokenType.STRING, text, value, line))
+            # comments are skipped
+
+        self.start = self.current = position
+        self.line = line
+        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        return self.tokens
+
+
+# The same token grammar over raw bytes, for StreamingLexer. Comments also stop at a bare '\r',
+# which text-mode reading would have turned into a newline.
+BYTES_TOKEN_PATTERN = re.compile(rb"""
+    (?P<space>[ \t\n\r\x0b\x0c\x1c-\x1f]+)
+  | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<operator>[!=<>]=?|[(){}\[\],\-+*;]|/(?!/))
+  | (?P<number>[0-9]+(?:\.[0-9]+)?)
+  | (?P<string>"(?:[^"\\]|\\[nt"\\r0])*")
+  | (?P<comment>//[^\r\n]*)
+""", re.VERBOSE)
+
+
+def _count_lines(text: bytes) -> int:
+    """Counts line breaks the way text-mode reading does ('\n', '\r\n' and a bare '\r')."""
+    lines = text.count(b'\n')
+    if b'\r' in text:
+        lines += text.count(b'\r') - text.count(b'\r\n')
+    return lines
+
+
+class StreamingLexer(Lexer):
+    """
+    Lexer for the streaming front end. It scans a UTF-8 buffer (typically an mmap of the
+    source file) and yields tokens one at a time, so neither the decoded source text nor
+    the full token list is ever held in memory. Tokens and line numbers are the same as
+    Lexer's for the text-mode reading of the file; anything the bytes regex does not cover
+    exactly is decoded a line at a time and scanned by the classic scan_token().
+    """
+
+    def __init__(self, buffer):
+        super().__init__("")
+        self.buffer = buffer
+
+    def scan_tokens(self) -> list[Token]:
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
+
+    def iter_tokens(self):
+        buffer = self.buffer
+        end = len(buffer)
+        keywords = self.keywords
+        match = BYTES_TOKEN_PATTERN.match
+        intern = sys.intern
+        position = 0
+        line = self.line
+
+        while position < end:
+            m = match(buffer, position)
+            kind = m.lastgroup if m else None
+            if kind is None or (kind in ('identifier', 'number') and m.end() < end
+                                and (buffer[m.end()] >= 0x80 or (kind == 'number' and buffer[m.end()] == 0x2E))):
+                token, position = self.scan_fallback(position, line)
+                if token is not None:
+                    yield token
+                continue
+
+            text = buffer[m.start():m.end()]
+            position = m.end()
+            if kind == 'space':
+                line += _count_lines(text)
+            elif kind == 'identifier':
+                text = intern(text.decode('ascii'))
+                type = keywords.get(text)
+                if type is None:
+                    if text == "list_remove_at":
+                        type = TokenType.LIST_REMOVE_AT
+                    elif text == "list_append":
+                        type = TokenType.LIST_APPEND
+                    else:
+                        type = TokenType.IDENTIFIER
+                yield Token(type, text, None, line)
+            elif kind == 'operator':
+                text = text.decode('ascii')
+                yield Token(OPERATORS[text], text, None, line)
+            elif kind == 'number':
+                text = text.decode('ascii')
+                yield Token(TokenType.NUMBER, text, number_literal(text), line)
+            elif kind == 'string':
+                line += _count_lines(text)
+                text = text.decode('utf-8')
+                if '\r' in text:
+                    text = text.replace('\r\n', '\n').replace('\r', '\n')
+                raw = text[1:-1]
+                value = ESCAPE_PATTERN.sub(_decode_escape, raw) if '\\' in raw else raw
+                yield Token(TokenType.STRING, text, value, line)
+            # comments are skipped
+
+        self.line = line
+        yield Token(TokenType.EOF, "", None, line)
+
+    def scan_fallback(self, position: int, line: int):
+        """
+        Scans one token at position with the classic Lexer and returns (token or None, next position).
+        Only the current line is decoded, except for a string literal the bytes regex rejected,
+        which is always an error whose line number may depend on the rest of the file.
+        """
+        buffer = self.buffer
+        if buffer[position] == 0x22:  # '"'
+            stop = len(buffer)
+        else:
+            stop = buffer.find(b'\n', position)
+            stop = len(buffer) if stop == -1 else stop + 1
+        window = buffer[position:stop].decode('utf-8')
+
+        lexer = Lexer(window)
+        lexer.line = line
+        lexer.scan_token()  # Raises the same errors as the classic lexer
+        consumed = len(window[:lexer.current].encode('utf-8'))
+        return (lexer.tokens[0] if lexer.tokens else None), position + consumed
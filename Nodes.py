@@ -0,0 +1,177 @@
+# Base class for all expressions
+class Expr:
+    __slots__ = ()
+
+# Base class for all statements
+class Stmt:
+    __slots__ = ()
+
+# Represents a binary expression (e.g., a + b, x == y)
+class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right')
+
+    def __init__(self, left: Expr, operator, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+# Represents a unary expression (e.g., -a, !b)
+class Unary(Expr):
+    __slots__ = ('operator', 'right')
+
+    def __init__(self, operator, right: Expr):
+        self.operator = operator
+        self.right = right
+
+# Represents a literal value (e.g., number, true, false, string)
+class Literal(Expr):
+    __slots__ = ('value',)
+
+    def __init__(self, value: object):
+        self.value = value
+
+# Represents a grouped expression (e.g., (a + b))
+class Grouping(Expr):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression: Expr):
+        self.expression = expression
+
+# Represents a variable reference (e.g., x)
+class Variable(Expr):
+    __slots__ = ('name', 'depth', 'slot', 'fallback', 'materialize')
+
+    def __init__(self, name): # 'name' here will be a Token (IDENTIFIER)
+        self.name = name
+        # Filled in by the Resolver: frames to hop and the slot in that frame.
+        # depth stays None for globals, which are still looked up by name.
+        self.depth = None
+        self.slot = None
+        # Set by the Resolver when a function body names a local declared after the function: the
+        # binding (a Variable) to use instead while the local's slot is still undefined.
+        self.fallback = None
+        # Set by the Resolver when the variable may hold a StringBuilder, which reads turn into a str.
+        self.materialize = False
+
+# Represents an assignment expression (e.g., x = 10 + y or myList[0] = 5)
+class Assign(Expr):
+    __slots__ = ('target_expr', 'value', 'appended')
+
+    def __init__(self, target_expr: Expr, value: Expr): # target_expr can be Variable or Index
+        self.target_expr = target_expr
+        self.value = value
+        # Set by the Resolver on `v = v + a + b;` statements: the '+' Binary nodes from the innermost
+        # (v + a) outwards. While v holds a string it is extended in place with their right operands.
+        self.appended = None
+
+# Represents a variable declaration statement (e.g., var x; or var y = 5;)
+class Var(Stmt):
+    __slots__ = ('name', 'initializer', 'slot', 'line')
+
+    def __init__(self, name, initializer: Expr = None): # 'name' is a Token (IDENTIFIER)
+        self.name = name
+        self.initializer = initializer # Optional initial value
+        self.slot = None # Filled in by the Resolver (None for globals)
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents a print statement (e.g., print 1 + 2;)
+class PrintStmt(Stmt):
+    __slots__ = ('expression', 'line')
+
+    def __init__(self, expression: Expr):
+        self.expression = expression
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents an expression treated as a statement (e.g., x = 5;)
+class ExpressionStmt(Stmt):
+    __slots__ = ('expression', 'line')
+
+    def __init__(self, expression: Expr):
+        self.expression = expression
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents a block of statements enclosed in curly braces { ... }
+class Block(Stmt):
+    __slots__ = ('statements', 'frame_size', 'local_count', 'reuses_frame', 'frame_slot', 'line')
+
+    def __init__(self, statements: list[Stmt]):
+        self.statements = statements
+        self.frame_size = 0 # Slots of the block's frame; 0: runs in the enclosing scope (set by the Resolver)
+        self.local_count = 0 # Locals declared directly in this block; the frame's other slots keep reused frames (set by the Resolver)
+        self.reuses_frame = False # Whether each run in the same enclosing frame may use the same frame (set by the Resolver)
+        self.frame_slot = None # Slot of the enclosing frame that keeps the reused frame; None at the top level (set by the Resolver)
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents an if-then-else statement
+class If(Stmt):
+    __slots__ = ('condition', 'then_branch', 'else_branch', 'line')
+
+    def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt = None):
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch # Optional else branch
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents a while loop statement
+class While(Stmt):
+    __slots__ = ('condition', 'body', 'line')
+
+    def __init__(self, condition: Expr, body: Stmt):
+        self.condition = condition
+        self.body = body
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents the input() function call expression
+class InputExpr(Expr):
+    __slots__ = ('prompt',)
+
+    def __init__(self, prompt: Expr = None): # The prompt itself can be an expression (e.g., string literal), optional
+        self.prompt = prompt
+
+# New: Represents a list literal (e.g., [1, "two", true])
+class ListLiteral(Expr):
+    __slots__ = ('elements', 'constant')
+
+    def __init__(self, elements: list[Expr]):
+        self.elements = elements
+        self.constant = None # Tuple of element values when every element is a literal (set by the Optimizer)
+
+# New: Represents an index access expression (e.g., myList[0])
+class Index(Expr):
+    __slots__ = ('obj', 'index_expr')
+
+    def __init__(self, obj: Expr, index_expr: Expr): # obj is the list/string, index_expr is the index
+        self.obj = obj
+        self.index_expr = index_expr
+
+# New: Represents a function declaration
+class Function(Stmt):
+    __slots__ = ('name', 'params', 'body', 'slot', 'frame_size', 'compiled_body', 'chunk', 'line')
+
+    def __init__(self, name, params: list, body: Block): # name is Token, params are Tokens
+        self.name = name
+        self.params = params
+        self.body = body
+        self.slot = None # Slot of the function name in the declaring scope (None for globals)
+        self.frame_size = 0 # Parameters plus locals declared directly in the body (set by the Resolver)
+        self.compiled_body = None # Closure for the body (set by the Compiler, closure engine only)
+        self.chunk = None # Bytecode for the body (set by the BytecodeCompiler, vm engine only)
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# Represents a return statement inside a function (e.g., return x + 1;)
+class Return(Stmt):
+    __slots__ = ('keyword', 'value', 'tail_call', 'line')
+
+    def __init__(self, keyword, value: Expr = None): # keyword is the 'return' Token, used for error reporting
+        self.keyword = keyword
+        self.value = value # Optional; the function returns nil without it
+        self.tail_call = False # True when the returned value is a call (set by the Resolver)
+        self.line = None # Line of the statement's first token (set by the Parser)
+
+# New: Represents a function call expression
+class Call(Expr):
+    __slots__ = ('callee', 'arguments')
+
+    def __init__(self, callee: Expr, arguments: list[Expr]): # callee is the expression that produces the callable (e.g., Variable for function name)
+        self.callee = callee
+        self.arguments = arguments
@@ -0,0 +1,148 @@
+from Nodes import (
+    Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
+    Block, If, While, InputExpr,
+    ListLiteral, Index, Call, Function, Return,
+    Expr, Stmt
+)
+from Token import TokenType
+from Interpreter import Interpreter
+
+
+class Optimizer:
+    """
+    Optional pass over the Parser.parse() output, run before the Resolver.
+    - Folds Binary/Unary/Grouping nodes whose operands are literals.
+    - Prunes If/While branches whose condition is a constant.
+    - Flattens nested Grouping nodes.
+    - Precomputes the element values of list literals made only of literals, so
+      evaluating them is a single copy (every evaluation still builds a new list).
+    Folding evaluates the operation with the tree-walker itself; anything that raises a
+    runtime error (division by zero, type mismatches) is left in place to fail at run time.
+    """
+
+    def __init__(self):
+        # Used only to evaluate constant sub-expressions with the exact runtime semantics.
+        self.interpreter = Interpreter()
+
+    def optimize(self, statements: list[Stmt]) -> list[Stmt]:
+        return self.optimize_statements(statements)
+
+    def optimize_statements(self, statements: list[Stmt]) -> list[Stmt]:
+        optimized = []
+        for statement in statements:
+            statement = self.optimize_stmt(statement)
+            if statement is not None:  # Pruned statements are dropped
+                optimized.append(statement)
+        return optimized
+
+    def optimize_stmt(self, stmt: Stmt):
+        if isinstance(stmt, (ExpressionStmt, PrintStmt)):
+            stmt.expression = self.optimize_expr(stmt.expression)
+        elif isinstance(stmt, Var):
+            if stmt.initializer:
+                stmt.initializer = self.optimize_expr(stmt.initializer)
+        elif isinstance(stmt, Block):
+            stmt.statements = self.optimize_statements(stmt.statements)
+        elif isinstance(stmt, If):
+            stmt.condition = self.optimize_expr(stmt.condition)
+            if isinstance(stmt.condition, Literal):
+                # Only the branch that can run is kept
+                if self.interpreter._is_truthy(stmt.condition.value):
+                    return self.optimize_stmt(stmt.then_branch)
+                if stmt.else_branch:
+                    return self.optimize_stmt(stmt.else_branch)
+                return None
+            stmt.then_branch = self.optimize_branch(stmt.then_branch)
+            if stmt.else_branch:
+                stmt.else_branch = self.optimize_stmt(stmt.else_branch)
+        elif isinstance(stmt, While):
+            stmt.condition = self.optimize_expr(stmt.condition)
+            if isinstance(stmt.condition, Literal) and not self.interpreter._is_truthy(stmt.condition.value):
+                return None  # The body can never run
+            stmt.body = self.optimize_branch(stmt.body)
+        elif isinstance(stmt, Function):
+            stmt.body.statements = self.optimize_statements(stmt.body.statements)
+        elif isinstance(stmt, Return):
+            if stmt.value:
+                stmt.value = self.optimize_expr(stmt.value)
+        return stmt
+
+    def optimize_branch(self, stmt: Stmt) -> Stmt:
+        """Optimizes the body of an if/while, which must stay a statement even if it was pruned."""
+        optimized = self.optimize_stmt(stmt)
+        return optimized if optimized is not None else Block([])
+
+    def optimize_expr(self, expr: Expr) -> Expr:
+        if isinstance(expr, Binary):
+            expr.left = self.optimize_expr(expr.left)
+            expr.right = self.optimize_expr(expr.right)
+            if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+                return self.fold(expr)
+            return self.reassociate_concatenation(expr)
+
+        if isinstance(expr, Unary):
+            expr.right = self.optimize_expr(expr.right)
+            if isinstance(expr.right, Literal):
+                return self.fold(expr)
+            return expr
+
+        if isinstance(expr, Grouping):
+            inner = self.optimize_expr(expr.expression)
+            if isinstance(inner, Literal):
+                return inner
+            while isinstance(inner, Grouping):  # ((x)) -> (x)
+                inner = inner.expression
+            expr.expression = inner
+            return expr
+
+        if isinstance(expr, Assign):
+            expr.value = self.optimize_expr(expr.value)
+            if isinstance(expr.target_expr, Index):
+                self.optimize_index_parts(expr.target_expr)
+            return expr
+
+        if isinstance(expr, Index):
+            self.optimize_index_parts(expr)
+            return expr
+
+        if isinstance(expr, InputExpr):
+            if expr.prompt:
+                expr.prompt = self.optimize_expr(expr.prompt)
+            return expr
+
+        if isinstance(expr, ListLiteral):
+            expr.elements = [self.optimize_expr(element) for element in expr.elements]
+            if all(isinstance(element, Literal) for element in expr.elements):
+                expr.constant = tuple(element.value for element in expr.elements)
+            return expr
+
+        if isinstance(expr, Call):
+            expr.callee = self.optimize_expr(expr.callee)
+            expr.arguments = [self.optimize_expr(argument) for argument in expr.arguments]
+            return expr
+
+        return expr  # Literal, Variable
+
+    def optimize_index_parts(self, expr: Index):
+        expr.obj = self.optimize_expr(expr.obj)
+        expr.index_expr = self.optimize_expr(expr.index_expr)
+
+    def fold(self, expr: Expr) -> Expr:
+        """Replaces a constant expression by its value, unless evaluating it is a runtime error."""
+        try:
+            return Literal(self.interpreter.evaluate(expr))
+        except RuntimeError:
+            return expr
+
+    def reassociate_concatenation(self, expr: Binary) -> Expr:
+        """
+        Rewrites (x + "a") + 1 as x + "a1". Adding a string never fails and stringifies
+        the other operand, so the result is the same for every value of x.
+        """
+        left = expr.left
+        if (expr.operator.type == TokenType.PLUS and isinstance(expr.right, Literal)
+                and isinstance(left, Binary) and left.operator.type == TokenType.PLUS
+                and isinstance(left.right, Literal) and isinstance(left.right.value, str)):
+            left.right = self.fold(Binary(left.right, expr.operator, expr.right))
+            return left
+        return expr
@@ -0,0 +1,45 @@
+import sys
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024  # Characters collected before they are written out
+
+
+class OutputWriter:
+    """
+    Destination of everything a MyPi program prints. Lines are collected and written to the
+    stream in one call once buffer_size characters are pending, and whenever flush() is
+    called: before input() reads from the terminal, after a runtime error and when a run ends.
+    With buffer_size 0 every line is written and flushed as soon as it is printed.
+    The stream is any object with write() (and optionally flush()); None means sys.stdout,
+    looked up at each write so that redirecting sys.stdout keeps working.
+    """
+
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.pending = []  # Lines not written yet, each ending with "\n"
+        self.pending_size = 0
+
+    def write_line(self, text: str):
+        self.pending.append(text + "\n")
+        self.pending_size += len(text) + 1
+        if self.pending_size >= self.buffer_size:
+            self.flush()
+
+    def write(self, text: str):
+        """Writes text without a line ending (an input() prompt)."""
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.pending:
+            text = "".join(self.pending)
+            self.pending.clear()
+            self.pending_size = 0
+            stream.write(text)
+        flush = getattr(stream, 'flush', None)
+        if flush is not None:
+            flush()
@@ -1,17 +1,33 @@
 from Token import Token, TokenType
-from ast import (
+from Nodes import (
     Binary, Unary, Literal, Grouping,
     Variable, Assign, Var, PrintStmt, ExpressionStmt,
     Block, If, While, InputExpr,
-    ListLiteral, Index, Call, Function,
+    ListLiteral, Index, Call, Function, Return,
     Expr, Stmt
 )
 
 
+# How tightly each binary operator binds its operands, from `or` (loosest) to `*` and `/`.
+# All binary operators are left-associative. Tokens that are not binary operators bind at 0.
+BINARY_POWERS = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.BANG_EQUAL: 3, TokenType.EQUAL_EQUAL: 3,
+    TokenType.GREATER: 4, TokenType.GREATER_EQUAL: 4, TokenType.LESS: 4, TokenType.LESS_EQUAL: 4,
+    TokenType.PLUS: 5, TokenType.MINUS: 5,
+    TokenType.STAR: 6, TokenType.SLASH: 6,
+}
+
+# Prefix operators, which bind more tightly than any binary operator.
+UNARY_OPERATORS = frozenset((TokenType.BANG, TokenType.MINUS))
+
+
 class Parser:
     def __init__(self, tokens: list[Token]):
         self.tokens = tokens
         self.current = 0
+        self.had_error = False
 
     def parse(self) -> list[Stmt]:
         statements = []
@@ -20,16 +36,21 @@ class Parser:
                 statements.append(self.declaration())
             except RuntimeError as e:
                 print(f"Parsing error: {e}")
+                self.had_error = True
                 self.synchronize()
         return statements
 
     def declaration(self) -> Stmt:
+        line = self.peek().line
         if self.match(TokenType.FUN):
-            return self.fun_declaration()
-        if self.match(TokenType.VAR):
-            return self.var_declaration()
+            declaration = self.fun_declaration()
+        elif self.match(TokenType.VAR):
+            declaration = self.var_declaration()
+        else:
+            return self.statement()
 
-        return self.statement()
+        declaration.line = line
+        return declaration
 
     def fun_declaration(self) -> Function:
         name = self.consume(TokenType.IDENTIFIER, "Expect function name.")
@@ -50,22 +71,37 @@ class Parser:
         return Function(name, params, body)
 
     def statement(self) -> Stmt:
+        line = self.peek().line
         if self.match(TokenType.PRINT):
-            return self.print_statement()
-        if self.match(TokenType.IF):
-            return self.if_statement()
-        if self.match(TokenType.WHILE):
-            return self.while_statement()
-        if self.match(TokenType.LEFT_BRACE):  # For standalone blocks { ... }
-            return Block(self.block())
+            statement = self.print_statement()
+        elif self.match(TokenType.IF):
+            statement = self.if_statement()
+        elif self.match(TokenType.WHILE):
+            statement = self.while_statement()
+        elif self.match(TokenType.RETURN):
+            statement = self.return_statement()
+        elif self.match(TokenType.LEFT_BRACE):  # For standalone blocks { ... }
+            statement = Block(self.block())
+        else:
+            statement = self.expression_statement()
 
-        return self.expression_statement()
+        statement.line = line  # Reported by the profiler
+        return statement
 
     def print_statement(self) -> PrintStmt:
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
         return PrintStmt(value)
 
+    def return_statement(self) -> Return:
+        keyword = self.previous()
+        value = None
+        if not self.check(TokenType.SEMICOLON):
+            value = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
+        return Return(keyword, value)
+
     def var_declaration(self) -> Var:
         name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
 
@@ -112,89 +148,75 @@ class Parser:
         return While(condition, body)
 
     def expression(self) -> Expr:
-        return self.assignment()
-
-    def assignment(self) -> Expr:
-        expr = self.or_expr()
-
-        if self.match(TokenType.EQUAL):
-            equals_token = self.previous()
-            value = self.assignment()
-
-            if isinstance(expr, Variable):
-                return Assign(expr, value)
-            elif isinstance(expr, Index):
-                return Assign(expr, value)
-
-            raise self.error(equals_token, "Invalid assignment target.")
-
-        return expr
-
-    def or_expr(self) -> Expr:
-        expr = self.and_expr()
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.and_expr()
-            expr = Binary(expr, operator, right)
+        """
+        assignment -> binary ( "=" assignment )?. A chain `a = b = c` is collected in a loop and
+        its (right-associative) Assign nodes are built from the right, so a long chain cannot
+        exhaust Python's recursion limit.
+        """
+        expr = self.binary(1)
+        if self.peek().type != TokenType.EQUAL:
+            return expr
+
+        targets = []
+        while self.match(TokenType.EQUAL):
+            targets.append((expr, self.previous()))
+            expr = self.binary(1)
+        for target, equals_token in reversed(targets):
+            if not isinstance(target, (Variable, Index)):
+                raise self.error(equals_token, "Invalid assignment target.")
+            expr = Assign(target, expr)
         return expr
 
-    def and_expr(self) -> Expr:
-        expr = self.equality()
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def equality(self) -> Expr:
-        expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def comparison(self) -> Expr:
-        expr = self.term()
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def term(self) -> Expr:
-        expr = self.factor()
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def factor(self) -> Expr:
-        expr = self.unary()
-        while self.match(TokenType.STAR, TokenType.SLASH):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        return expr
-
-    def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        return self.call_expression()
-
-    def call_expression(self) -> Expr:
-        expr = self.primary()
+    def binary(self, min_power: int) -> Expr:
+        """
+        Precedence climbing: parses operands joined by operators whose BINARY_POWERS entry is at
+        least min_power. A right operand only takes operators binding more tightly than its own,
+        so the recursion is never deeper than the number of precedence levels, however long
+        the expression is.
+        """
+        expr = self.operand()
+        powers = BINARY_POWERS
+        while True:
+            power = powers.get(self.peek().type, 0)
+            if power < min_power:
+                return expr
+            operator = self.advance()
+            expr = Binary(expr, operator, self.binary(power + 1))
+
+    def operand(self) -> Expr:
+        """
+        unary -> ( "!" | "-" )* primary ( "(" arguments? ")" | "[" expression "]" )*. The primary is
+        parsed by its entry in PRIMARY_PARSERS; prefix operators are collected in a loop and
+        wrapped around the result last, since calls and indexing bind more tightly.
+        """
+        token = self.peek()
+        prefix_operators = None
+        while token.type in UNARY_OPERATORS:
+            if prefix_operators is None:
+                prefix_operators = []
+            prefix_operators.append(self.advance())
+            token = self.peek()
+
+        parse_primary = self.PRIMARY_PARSERS.get(token.type)
+        if parse_primary is None:
+            raise self.error(token, "Expect expression.")
+        self.advance()
+        expr = parse_primary(self, token)
 
         while True:
-            if self.match(TokenType.LEFT_PAREN):
+            type = self.peek().type
+            if type == TokenType.LEFT_PAREN:
+                self.advance()
                 expr = self.finish_call(expr)
-            elif self.match(TokenType.LEFT_BRACKET):
+            elif type == TokenType.LEFT_BRACKET:
+                self.advance()
                 expr = self.finish_index(expr)
             else:
                 break
+
+        if prefix_operators is not None:
+            for operator in reversed(prefix_operators):
+                expr = Unary(operator, expr)
         return expr
 
     def finish_call(self, callee: Expr) -> Expr:
@@ -229,55 +251,53 @@ class Parser:
         self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
         return Index(obj, index_expr)
 
-    def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        if self.match(TokenType.NIL):
-            return Literal(None)
-        if self.match(TokenType.NUMBER):
-            return Literal(self.previous().literal)
-        if self.match(TokenType.STRING):
-            return Literal(self.previous().literal)
-
-        # Handle specific built-in keywords as primary elements
-        if self.match(TokenType.INPUT):  # input is a special keyword
-            # Parser expects `input` as a special keyword that leads to InputExpr,
-            # so it needs to be handled here.
-            self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'input'.")
-            prompt_expr = None
-            if not self.check(TokenType.RIGHT_PAREN):
-                prompt_expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after input prompt.")
-            return InputExpr(prompt_expr)
-
-        # Handle list_append and list_remove_at if they were tokenized as their specific types
-        # This will create a Variable node that gets passed to call_expression and then finish_call
-        if self.match(TokenType.LIST_APPEND):
-            return Variable(self.previous())  # Treat built-in call name as a variable for now
-        if self.match(TokenType.LIST_REMOVE_AT):
-            return Variable(self.previous())  # Treat built-in call name as a variable for now
-
-        if self.match(TokenType.IDENTIFIER):  # Any other identifier (regular variable name or user-defined func name)
-            return Variable(self.previous())
-
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-
-        if self.match(TokenType.LEFT_BRACKET):
-            elements = []
-            if not self.check(TokenType.RIGHT_BRACKET):
-                elements.append(self.expression())
-                while self.match(TokenType.COMMA):
-                    elements.append(self.expression())
+    # Primary expressions, each parsed by PRIMARY_PARSERS[type of its first token] once that token is consumed.
+
+    def literal(self, token: Token) -> Literal:
+        return Literal(token.literal)
 
-            self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after list literal.")
-            return ListLiteral(elements)
+    def variable(self, token: Token) -> Variable:
+        # Identifiers, and list_append/list_remove_at: the built-in's name is treated as a variable
+        # and the call that follows becomes a Call node in finish_call.
+        return Variable(token)
 
-        raise self.error(self.peek(), "Expect expression.")
+    def input_expression(self, token: Token) -> InputExpr:
+        # 'input' is a keyword: it must be followed by its call, which becomes an InputExpr.
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'input'.")
+        prompt_expr = None
+        if not self.check(TokenType.RIGHT_PAREN):
+            prompt_expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after input prompt.")
+        return InputExpr(prompt_expr)
+
+    def grouping(self, token: Token) -> Grouping:
+        expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
+
+    def list_literal(self, token: Token) -> ListLiteral:
+        elements = []
+        if not self.check(TokenType.RIGHT_BRACKET):
+            elements.append(self.expression())
+            while self.match(TokenType.COMMA):
+                elements.append(self.expression())
+
+        self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after list literal.")
+        return ListLiteral(elements)
+
+    PRIMARY_PARSERS = {
+        TokenType.FALSE: lambda self, token: Literal(False),
+        TokenType.TRUE: lambda self, token: Literal(True),
+        TokenType.NIL: lambda self, token: Literal(None),
+        TokenType.NUMBER: literal,
+        TokenType.STRING: literal,
+        TokenType.INPUT: input_expression,
+        TokenType.LIST_APPEND: variable,
+        TokenType.LIST_REMOVE_AT: variable,
+        TokenType.IDENTIFIER: variable,
+        TokenType.LEFT_PAREN: grouping,
+        TokenType.LEFT_BRACKET: list_literal,
+    }
 
     def match(self, *types: TokenType) -> bool:
         for type in types:
@@ -326,3 +346,54 @@ class Parser:
                 return
             self.advance()
 
+
+class StreamParser(Parser):
+    """
+    Parser for the streaming front end. Instead of indexing a complete token list it pulls
+    tokens from an iterator into a one-token lookahead window (the grammar never needs more
+    than the current and the previous token), and statements() yields each top-level
+    statement as soon as it is parsed.
+    """
+
+    def __init__(self, tokens):
+        self.token_stream = iter(tokens)
+        self.lexer_error = None
+        self.had_error = False
+        self.previous_token = None
+        self.current_token = self.next_token()
+
+    def statements(self):
+        """Yields top-level statements one at a time, reporting and skipping the ones that fail to parse."""
+        while not self.is_at_end():
+            try:
+                statement = self.declaration()
+            except RuntimeError as e:
+                if self.lexer_error is not None:
+                    raise  # The token stream is gone: a lexer error ends the program
+                print(f"Parsing error: {e}")
+                self.had_error = True
+                self.synchronize()
+                continue
+            yield statement
+
+    def parse(self) -> list[Stmt]:
+        return list(self.statements())
+
+    def next_token(self) -> Token:
+        try:
+            return next(self.token_stream)
+        except RuntimeError as e:
+            self.lexer_error = e
+            raise
+
+    def advance(self) -> Token:
+        if not self.is_at_end():
+            self.previous_token = self.current_token
+            self.current_token = self.next_token()
+        return self.previous_token
+
+    def peek(self) -> Token:
+        return self.current_token
+
+    def previous(self) -> Token:
+        return self.previous_token
@@ -0,0 +1,119 @@
+from time import perf_counter
+
+from Nodes import Stmt, Block
+from Interpreter import Interpreter, LoxFunction
+
+
+MAIN = "<main>"  # Root of every collapsed stack: code running outside any function
+
+
+class Timings:
+    """
+    Call count, inclusive and exclusive time per key, for properly nested enter()/exit() pairs.
+    Inclusive time only counts the outermost activation of a key, so recursion is not counted twice.
+    """
+
+    def __init__(self):
+        self.stats = {}  # key -> [calls, inclusive seconds, exclusive seconds]
+        self.stack = []  # [key, start time, time spent in nested entries] per open entry
+        self.active = {}  # key -> number of open entries for it
+
+    def enter(self, key):
+        self.active[key] = self.active.get(key, 0) + 1
+        self.stack.append([key, perf_counter(), 0.0])
+
+    def exit(self) -> float:
+        """Closes the innermost entry and returns its exclusive time."""
+        key, start, nested = self.stack.pop()
+        elapsed = perf_counter() - start
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = [0, 0.0, 0.0]
+        stats[0] += 1
+        self.active[key] -= 1
+        if self.active[key] == 0:
+            stats[1] += elapsed
+        stats[2] += elapsed - nested
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        return elapsed - nested
+
+
+class Profiler:
+    """Collects per-line and per-function timings plus collapsed call stacks for flamegraphs."""
+
+    def __init__(self):
+        self.lines = Timings()  # Keyed by the line of each executed statement
+        self.functions = Timings()  # Keyed by "name:line" of each MiPi function, plus MAIN
+        self.collapsed = {}  # "<main>;f;g" -> exclusive seconds spent with that call stack
+
+    def enter_function(self, key: str):
+        self.functions.enter(key)
+
+    def exit_function(self):
+        path = ";".join(entry[0] for entry in self.functions.stack)
+        self.collapsed[path] = self.collapsed.get(path, 0.0) + self.functions.exit()
+
+    def report(self, source_lines: list[str], limit: int = 20) -> str:
+        """Formats the function and line tables, sorted by exclusive time."""
+        out = ["--- Profile: functions (by exclusive time) ---",
+               f"{'function':<32}{'calls':>10}{'incl ms':>12}{'excl ms':>12}"]
+        for key, (calls, inclusive, exclusive) in sorted(self.functions.stats.items(), key=lambda item: -item[1][2]):
+            out.append(f"{key:<32}{calls:>10}{inclusive * 1000:>12.2f}{exclusive * 1000:>12.2f}")
+
+        out.append(f"--- Profile: lines (top {limit} by exclusive time) ---")
+        out.append(f"{'line':>6}{'calls':>10}{'incl ms':>12}{'excl ms':>12}  source")
+        ranked = sorted(self.lines.stats.items(), key=lambda item: -item[1][2])[:limit]
+        for line, (calls, inclusive, exclusive) in ranked:
+            text = source_lines[line - 1].strip() if line and 0 < line <= len(source_lines) else ""
+            out.append(f"{line if line else '?':>6}{calls:>10}{inclusive * 1000:>12.2f}{exclusive * 1000:>12.2f}  {text[:60]}")
+        return "\n".join(out)
+
+    def write_collapsed(self, path: str):
+        """Writes 'frame;frame;frame microseconds' lines, the input format of flamegraph.pl and speedscope."""
+        with open(path, 'w') as file:
+            for stack, seconds in sorted(self.collapsed.items()):
+                microseconds = round(seconds * 1_000_000)
+                if microseconds > 0:
+                    file.write(f"{stack} {microseconds}\n")
+
+
+# A user-defined function whose calls are timed by the interpreter's profiler.
+# A tail call is timed as a separate call of its own function, made once the caller has finished.
+class ProfiledFunction(LoxFunction):
+    def invoke(self, interpreter, arguments: list) -> object:
+        interpreter.profiler.enter_function(f"{self.declaration.name.lexeme}:{self.declaration.name.line}")
+        try:
+            return super().invoke(interpreter, arguments)
+        finally:
+            interpreter.profiler.exit_function()
+
+
+class ProfilingInterpreter(Interpreter):
+    """
+    Tree-walking interpreter that times every statement and every function call.
+    The hooks live only in this subclass, so the plain interpreter pays nothing for them.
+    """
+    function_type = ProfiledFunction
+
+    def __init__(self, output=None, input_feed=None, budget=None):
+        super().__init__(output, input_feed, budget)
+        self.profiler = Profiler()
+
+    def interpret(self, statements: list[Stmt]) -> bool:
+        self.profiler.enter_function(MAIN)
+        try:
+            return super().interpret(statements)
+        finally:
+            self.profiler.exit_function()
+
+    def execute(self, stmt: Stmt):
+        if isinstance(stmt, Block):
+            # Only a container: its time belongs to the statements around and inside it
+            return super().execute(stmt)
+        lines = self.profiler.lines
+        lines.enter(stmt.line)
+        try:
+            return super().execute(stmt)
+        finally:
+            lines.exit()
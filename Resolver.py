@@ -0,0 +1,304 @@
+from Nodes import (
+    Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
+    Block, If, While, InputExpr,
+    ListLiteral, Index, Call, Function, Return,
+    Expr, Stmt
+)
+from Token import Token, TokenType
+
+
+class Resolver:
+    """
+    Static pass that runs between Parser.parse() and Interpreter.interpret().
+    It gives every local variable a slot in its scope's Frame and annotates each
+    Variable with the (depth, slot) pair the interpreter indexes directly at runtime.
+    Undefined names and redefinitions in the same scope are reported before the
+    program starts running.
+    """
+
+    def __init__(self, interpreter):
+        # Stack of local scopes, each mapping a variable name to its slot index.
+        # An empty stack means we are at the top level (globals).
+        self.scopes = []
+        # Function declarations waiting to be resolved, one list per open scope (index 0 is the top level),
+        # each with the defined_slots of the point where it was declared. Bodies are resolved when their
+        # declaring scope closes, so they can see every name declared in that scope - just like the
+        # dynamic lookup they replace.
+        self.pending_functions = []
+        # For each open scope, how many of its slots are sure to be defined wherever the code being
+        # resolved runs (None: all of them). Only a function body sees fewer: it may be called before
+        # the declarations that follow the function have run, and until one has, its name still means
+        # whatever it meant outside that scope (see Variable.fallback).
+        self.defined_slots = []
+        # Names predefined by the interpreter (built-ins) plus every top-level declaration.
+        self.global_names = set(interpreter.globals.values)
+        # Globals declared so far while walking the program, for redefinition checks.
+        # Built-ins may be replaced by a declaration of the same name.
+        self.declared_globals = set(interpreter.globals.values) - interpreter.globals.builtins
+        # Whether a name that is not local must be a known global. Off in streaming mode,
+        # where later top-level declarations have not been parsed yet.
+        self.check_globals = True
+        # Number of function bodies being resolved, to reject 'return' outside of functions.
+        self.function_depth = 0
+        # While loops around the statement being resolved, within the innermost function body.
+        self.loop_depth = 0
+        # Function declarations seen so far: a block that declares none can reuse its frame.
+        self.functions_declared = 0
+        # For each open scope, the blocks that reuse their frame and keep it in this scope's frame.
+        self.kept_frames = []
+        # Every Variable read, by name, while resolving a whole program (None in streaming mode),
+        # and the names extended by `v = v + x;` statements: reads of those may see a StringBuilder.
+        self.variable_reads = None
+        self.built_names = set()
+        self.errors = []
+
+    @property
+    def had_error(self) -> bool:
+        return len(self.errors) > 0
+
+    def resolve(self, statements: list[Stmt]) -> bool:
+        """Resolves a whole program. Prints any errors and returns True if there were none."""
+        for statement in statements:
+            if isinstance(statement, (Var, Function)):
+                self.global_names.add(statement.name.lexeme)
+
+        self.variable_reads = {}
+        self.pending_functions.append([])
+        for statement in statements:
+            self.resolve_stmt(statement)
+        self.resolve_functions(self.pending_functions.pop())
+        self.mark_materialized_reads()
+
+        for error in self.errors:
+            print(f"Resolution error: {error}")
+        return not self.had_error
+
+    def mark_materialized_reads(self):
+        """
+        Flags every read of a name that a `v = v + x;` statement extends. Matching by name is
+        conservative: it covers each binding with that name, in every scope and closure.
+        """
+        for name in self.built_names:
+            for expr in self.variable_reads.get(name, ()):
+                expr.materialize = True
+        self.variable_reads = None
+
+    def resolve_top_level(self, statement: Stmt) -> bool:
+        """
+        Resolves one top-level statement of a program that is still being parsed (streaming mode).
+        Names that are not local are assumed to be globals and checked when read at run time.
+        Prints any errors and returns True if there were none.
+        """
+        self.check_globals = False
+        self.errors = []
+        self.pending_functions.append([])
+        self.resolve_stmt(statement)
+        self.resolve_functions(self.pending_functions.pop())
+
+        for error in self.errors:
+            print(f"Resolution error: {error}")
+        return not self.had_error
+
+    def resolve_stmt(self, stmt: Stmt):
+        if isinstance(stmt, ExpressionStmt):
+            self.resolve_expr(stmt.expression)
+            # In streaming mode later statements are not known yet, so no reads could be flagged.
+            if self.variable_reads is not None:
+                appended = self.string_build_steps(stmt.expression)
+                if appended:
+                    stmt.expression.appended = appended
+                    self.built_names.add(stmt.expression.target_expr.name.lexeme)
+        elif isinstance(stmt, PrintStmt):
+            self.resolve_expr(stmt.expression)
+        elif isinstance(stmt, Var):
+            # The initializer is resolved first, so 'var a = a;' reads the outer 'a'.
+            if stmt.initializer:
+                self.resolve_expr(stmt.initializer)
+            stmt.slot = self.declare(stmt.name)
+        elif isinstance(stmt, Block):
+            if any(isinstance(statement, (Var, Function)) for statement in stmt.statements):
+                functions_declared = self.functions_declared
+                self.begin_scope()
+                for statement in stmt.statements:
+                    self.resolve_stmt(statement)
+                stmt.local_count = len(self.scopes[-1])
+                stmt.frame_size = self.end_scope()
+                # Inside a loop the block runs again and again in the same enclosing frame. Unless a
+                # function declared in it may have captured its frame, that frame can be used again.
+                stmt.reuses_frame = self.loop_depth > 0 and self.functions_declared == functions_declared
+                stmt.frame_slot = None
+                if stmt.reuses_frame and self.scopes:
+                    self.kept_frames[-1].append(stmt)  # The enclosing frame keeps it (see block_frame)
+            else:
+                # Nothing to put in a frame: the block runs in the enclosing scope.
+                for statement in stmt.statements:
+                    self.resolve_stmt(statement)
+                stmt.frame_size = stmt.local_count = 0
+                stmt.reuses_frame = False
+                stmt.frame_slot = None
+        elif isinstance(stmt, If):
+            self.resolve_expr(stmt.condition)
+            self.resolve_stmt(stmt.then_branch)
+            if stmt.else_branch:
+                self.resolve_stmt(stmt.else_branch)
+        elif isinstance(stmt, While):
+            self.resolve_expr(stmt.condition)
+            self.loop_depth += 1
+            self.resolve_stmt(stmt.body)
+            self.loop_depth -= 1
+        elif isinstance(stmt, Function):
+            self.functions_declared += 1
+            stmt.slot = self.declare(stmt.name)
+            defined_slots = [len(scope) if defined is None else defined
+                             for scope, defined in zip(self.scopes, self.defined_slots)]
+            self.pending_functions[-1].append((stmt, defined_slots))
+        elif isinstance(stmt, Return):
+            if self.function_depth == 0:
+                self.error(stmt.keyword, "Can't return from top-level code.")
+            if stmt.value:
+                self.resolve_expr(stmt.value)
+            # 'return f(x);' needs nothing from the current call once f starts, so f can replace it.
+            stmt.tail_call = isinstance(stmt.value, Call)
+
+    def resolve_functions(self, functions: list[tuple[Function, list]]):
+        """Resolves the bodies of functions declared in the innermost open scope."""
+        loop_depth = self.loop_depth
+        self.loop_depth = 0  # A call runs the body once, in a frame of its own
+        enclosing_defined_slots = self.defined_slots
+        for function, defined_slots in functions:
+            self.defined_slots = defined_slots
+            # Parameters and the body's top-level declarations share one frame,
+            # matching LoxFunction.call which runs the body directly in the parameter scope.
+            self.begin_scope()
+            self.function_depth += 1
+            for param in function.params:
+                self.declare(param)
+            for statement in function.body.statements:
+                self.resolve_stmt(statement)
+            function.frame_size = self.end_scope()
+            self.function_depth -= 1
+        self.defined_slots = enclosing_defined_slots
+        self.loop_depth = loop_depth
+
+    def resolve_expr(self, expr: Expr):
+        if isinstance(expr, Binary):
+            self.resolve_expr(expr.left)
+            self.resolve_expr(expr.right)
+        elif isinstance(expr, Unary):
+            self.resolve_expr(expr.right)
+        elif isinstance(expr, Literal):
+            pass
+        elif isinstance(expr, Grouping):
+            self.resolve_expr(expr.expression)
+        elif isinstance(expr, Variable):
+            self.resolve_local(expr)
+        elif isinstance(expr, Assign):
+            self.resolve_expr(expr.value)
+            self.resolve_expr(expr.target_expr)
+        elif isinstance(expr, InputExpr):
+            if expr.prompt:
+                self.resolve_expr(expr.prompt)
+        elif isinstance(expr, ListLiteral):
+            for element in expr.elements:
+                self.resolve_expr(element)
+        elif isinstance(expr, Index):
+            self.resolve_expr(expr.obj)
+            self.resolve_expr(expr.index_expr)
+        elif isinstance(expr, Call):
+            self.resolve_expr(expr.callee)
+            for argument in expr.arguments:
+                self.resolve_expr(argument)
+
+    @staticmethod
+    def string_build_steps(expr: Expr):
+        """
+        For an expression statement of the form `v = v + a + b;`, the way strings are built piece by
+        piece, returns the '+' nodes from (v + a) outwards; otherwise None. `v = v + 1;` is left
+        out: it is the counter idiom and never builds a string.
+        """
+        if not (isinstance(expr, Assign) and isinstance(expr.target_expr, Variable)):
+            return None
+        steps = []
+        operand = expr.value
+        while isinstance(operand, Binary) and operand.operator.type == TokenType.PLUS:
+            steps.append(operand)
+            operand = operand.left
+        if not (steps and isinstance(operand, Variable) and operand.name.lexeme == expr.target_expr.name.lexeme):
+            return None
+        if len(steps) == 1 and isinstance(steps[0].right, Literal) and isinstance(steps[0].right.value, (int, float)):
+            return None
+        return tuple(reversed(steps))
+
+    def resolve_local(self, expr: Variable):
+        """Finds the innermost scope declaring the variable and records its (depth, slot)."""
+        name = expr.name.lexeme
+        if self.variable_reads is not None:
+            self.variable_reads.setdefault(name, []).append(expr)
+        if not self.bind(expr, len(self.scopes) - 1):
+            self.error(expr.name, f"Undefined variable '{name}'.")
+
+    def bind(self, expr: Variable, innermost: int) -> bool:
+        """
+        Records the (depth, slot) of the variable in the first of the scopes from self.scopes[innermost]
+        outwards that declares it, and its fallback if that declaration may not have run yet.
+        Returns False if no scope declares it and it is not a known global either.
+        """
+        name = expr.name.lexeme
+        for index in range(innermost, -1, -1):
+            scope = self.scopes[index]
+            if name in scope:
+                expr.depth = len(self.scopes) - 1 - index
+                expr.slot = scope[name]
+                expr.fallback = None
+                defined = self.defined_slots[index]
+                if defined is not None and expr.slot >= defined:
+                    fallback = Variable(expr.name)
+                    if self.bind(fallback, index - 1):
+                        expr.fallback = fallback
+                return True
+
+        # Not a local: it has to be a built-in or declared somewhere at the top level.
+        expr.depth = None
+        expr.slot = None
+        expr.fallback = None
+        return not self.check_globals or name in self.global_names
+
+    def declare(self, name_token: Token):
+        """Declares a name in the innermost scope and returns its slot (None for globals)."""
+        name = name_token.lexeme
+        if not self.scopes:
+            if name in self.declared_globals:
+                self.error(name_token, f"Variable '{name}' already defined in this scope.")
+            self.declared_globals.add(name)
+            return None
+
+        scope = self.scopes[-1]
+        if name in scope:
+            self.error(name_token, f"Variable '{name}' already defined in this scope.")
+            return scope[name]
+        scope[name] = len(scope)
+        return scope[name]
+
+    def begin_scope(self):
+        self.scopes.append({})
+        self.kept_frames.append([])
+        self.defined_slots.append(None)
+        self.pending_functions.append([])
+
+    def end_scope(self) -> int:
+        """Closes the innermost scope and returns the number of slots its frame needs."""
+        # Nested function bodies are resolved while their declaring scope is still open.
+        self.resolve_functions(self.pending_functions.pop())
+        self.defined_slots.pop()
+        # The frames kept for blocks in this scope go after its locals.
+        local_count = len(self.scopes.pop())
+        kept_frames = self.kept_frames.pop()
+        for index, block in enumerate(kept_frames):
+            block.frame_slot = local_count + index
+        return local_count + len(kept_frames)
+
+    def error(self, token: Token, message: str):
+        if token.type == TokenType.EOF:
+            self.errors.append(f"[line {token.line}] Error at end: {message}")
+        else:
+            self.errors.append(f"[line {token.line}] Error at '{token.lexeme}': {message}")
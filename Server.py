@@ -0,0 +1,182 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import stat
+import sys
+import time
+
+from Lexer import FastLexer
+from Parser import Parser
+from Optimizer import Optimizer
+from Resolver import Resolver
+from Output import OutputWriter
+from Input import InputFeed, END_POLICIES
+from Budget import Budget
+from main import ENGINES
+from Client import DEFAULT_HOST
+
+
+# Protocol: the client sends one request as a line of JSON,
+#   {"source": "...", "input": "..." or null, "input_end": "error", "engine": "tree", "optimize": false}
+# (only "source" is required) and the server answers with lines of JSON: any number of
+# {"output": "..."} frames, one per line the program prints (or input() prompt), then one final
+#   {"status": "ok" or "error", "seconds": 0.0012}
+# frame. A request the server cannot accept gets {"status": "error", "message": "..."} at once.
+
+# Run once at startup on every engine, so that the code paths every request takes have
+# already been executed (and specialized by Python) before the first request forks off.
+WARM_UP_PROGRAM = """
+fun add(a, b) { return a + b; }
+var items = [1, 2.5, "three"];
+var i = 0;
+var text = "";
+while (i < 50) { text = text + add(i, 1); i = i + 1; }
+print len(text) + items[0];
+"""
+
+
+def send_frame(wfile, frame: dict):
+    wfile.write(json.dumps(frame).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+class ResponseStream:
+    """Stream whose writes are sent to the client as output frames."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str):
+        if text:
+            send_frame(self.wfile, {"output": text})
+
+    def flush(self):
+        pass  # Every frame is flushed as it is sent
+
+
+def run_source(source: str, engine: str = "tree", optimize: bool = False, output: OutputWriter = None,
+               input_feed: InputFeed = None, budget: Budget = None) -> bool:
+    """
+    Lexes, parses, resolves and runs a program given as text, the way run_file does for a file
+    (without its header and footer lines). Error messages go to sys.stdout, the program's
+    output to output. Returns True if the program ran to the end without any error.
+    """
+    try:
+        parser = Parser(FastLexer(source).scan_tokens())
+        statements = parser.parse()
+        if optimize:
+            statements = Optimizer().optimize(statements)
+        interpreter = ENGINES[engine](output, input_feed, budget)
+        if not Resolver(interpreter).resolve(statements):
+            return False
+        return interpreter.interpret(statements) and not parser.had_error
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return False
+
+
+def read_request(line: bytes) -> dict:
+    """Decodes and checks a request line. Raises ValueError for anything malformed."""
+    request = json.loads(line)
+    if not isinstance(request, dict) or not isinstance(request.get("source"), str):
+        raise ValueError("a request needs a 'source' string")
+    if request.setdefault("engine", "tree") not in ENGINES:
+        raise ValueError(f"unknown engine '{request['engine']}'")
+    if request.setdefault("input_end", "error") not in END_POLICIES:
+        raise ValueError(f"unknown end-of-input policy '{request['input_end']}'")
+    if request.setdefault("input", None) is not None and not isinstance(request["input"], str):
+        raise ValueError("'input' must be a string")
+    request["optimize"] = bool(request.get("optimize", False))
+    return request
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Runs one request in the process forked for it, on a fresh interpreter. The program's
+    output and error messages are sent back as they are produced.
+    """
+    limits = {}  # Budget arguments applied to every request (set by the server's command line)
+
+    def handle(self):
+        start = time.perf_counter()
+        try:
+            request = read_request(self.rfile.readline())
+        except ValueError as e:
+            send_frame(self.wfile, {"status": "error", "message": f"Bad request: {e}"})
+            return
+
+        stream = ResponseStream(self.wfile)
+        sys.stdout = stream  # This process only serves this request
+        input_text = request["input"]
+        # Unbuffered, so the client sees each line as soon as it is printed, not when the program ends.
+        output = OutputWriter(stream, buffer_size=0)
+        succeeded = run_source(request["source"], request["engine"], request["optimize"], output,
+                               InputFeed.from_text(input_text or "", request["input_end"]), Budget(**self.limits))
+        send_frame(self.wfile, {"status": "ok" if succeeded else "error", "seconds": time.perf_counter() - start})
+
+
+# Each connection is served by a process forked from the warm server, so requests start with
+# everything imported, run in parallel and cannot affect each other or the server. Once
+# max_children requests are running, the server waits for one of them to finish.
+class UnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+class TCPServer(socketserver.ForkingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def warm_up():
+    """Runs WARM_UP_PROGRAM on every engine, discarding its output."""
+    for engine in ENGINES:
+        run_source(WARM_UP_PROGRAM, engine, output=OutputWriter(io.StringIO()))
+
+
+def make_server(socket_path: str = None, host: str = DEFAULT_HOST, port: int = None,
+                max_concurrency: int = None) -> socketserver.BaseServer:
+    """A server on the Unix socket socket_path, or else on TCP host:port."""
+    if socket_path is not None:
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.remove(socket_path)  # Left behind by a server that did not shut down cleanly
+        server = UnixServer(socket_path, RequestHandler)
+    else:
+        server = TCPServer((host, port), RequestHandler)
+    server.max_children = max_concurrency or os.cpu_count() or 1
+    return server
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Serve MyPi programs from warm interpreters.")
+    address = arg_parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", default=None, metavar="PATH", help="Listen on this Unix socket")
+    address.add_argument("--port", type=int, default=None, help="Listen on this TCP port")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address for --port (default: {DEFAULT_HOST})")
+    arg_parser.add_argument("--max-concurrency", type=int, default=None, metavar="N",
+                            help="Requests run at the same time (default: one per CPU)")
+    arg_parser.add_argument("--max-steps", type=int, default=None, metavar="N",
+                            help="Stop a program after N loop iterations and function calls")
+    arg_parser.add_argument("--max-seconds", type=float, default=None, metavar="SECONDS",
+                            help="Stop a program once it has run this long")
+    arg_parser.add_argument("--max-depth", type=int, default=None, metavar="N",
+                            help="Stop a program when calls nest more than N deep")
+    arg_parser.add_argument("--max-elements", type=int, default=None, metavar="N",
+                            help="Stop a program once it has created N list elements and string characters")
+    args = arg_parser.parse_args()
+
+    RequestHandler.limits = {"max_steps": args.max_steps, "max_seconds": args.max_seconds,
+                             "max_depth": args.max_depth, "max_elements": args.max_elements}
+
+    warm_up()
+    server = make_server(args.socket, args.host, args.port, args.max_concurrency)
+    where = args.socket if args.socket is not None else f"{server.server_address[0]}:{server.server_address[1]}"
+    print(f"Serving MyPi on {where} (max concurrency: {server.max_children})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket is not None and os.path.exists(args.socket):
+            os.remove(args.socket)
@@ -1,5 +1,9 @@
 from enum import Enum
 
+# Integers are exact up to this magnitude; beyond it numbers become floats, keeping the
+# precision (and printed form) they had when every MiPi number was a float.
+MAX_EXACT_INT = 2 ** 53
+
 
 class TokenType(Enum):
     # Single-character tokens
@@ -46,6 +50,7 @@ class TokenType(Enum):
     WHILE = 'while'
     FUN = 'fun'
     INPUT = 'input'
+    RETURN = 'return'
 
     # Built-in functions that are part of the language keywords for special handling
     LIST_REMOVE_AT = 'list_remove_at'
@@ -55,6 +60,9 @@ class TokenType(Enum):
 
 
 class Token:
+    # Slots instead of a per-instance __dict__: tokens are the most numerous objects the front end creates.
+    __slots__ = ('type', 'lexeme', 'literal', 'line')
+
     def __init__(self, type: TokenType, lexeme: str, literal: object, line: int):
         self.type = type
         self.lexeme = lexeme
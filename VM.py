@@ -0,0 +1,803 @@
+from array import array
+
+from Nodes import (
+    Binary, Unary, Literal, Grouping, Variable, Assign, Var, PrintStmt, ExpressionStmt,
+    Block, If, While, InputExpr,
+    ListLiteral, Index, Call, Function, Return,
+    Expr, Stmt
+)
+from Token import TokenType, MAX_EXACT_INT
+from Values import ListValue, StringBuilder, extend_string
+from Budget import UNLIMITED
+from Interpreter import (
+    Interpreter, LoxCallable, LoxFunction, Frame, UNDEFINED, LIST_BUILTINS, as_index, block_frame,
+    read_with_fallback, assign_with_fallback
+)
+from Compiler import _line_of, _line_attr
+
+
+# --- Opcodes ---
+# Every instruction is one opcode byte plus one integer argument (unused by some opcodes).
+CONST = 0  # push constants[arg]
+POP = 1  # discard top of stack
+GET_LOCAL = 2  # push slot arg of the current frame
+GET_ENCLOSING = 3  # push slot arg of the enclosing frame
+GET_OUTER = 4  # push a local further out, constants[arg] is (depth, slot)
+GET_GLOBAL = 5  # push global named constants[arg]
+SET_LOCAL = 6  # assign top of stack (kept) to slot arg of the current frame
+SET_ENCLOSING = 7
+SET_OUTER = 8
+SET_GLOBAL = 9
+DEFINE_LOCAL = 10  # pop into slot arg of the current frame
+DEFINE_GLOBAL = 11  # pop into a new global named constants[arg]
+ADD = 12
+SUBTRACT = 13
+MULTIPLY = 14
+DIVIDE = 15
+GREATER = 16
+GREATER_EQUAL = 17
+LESS = 18
+LESS_EQUAL = 19
+EQUAL = 20
+NOT_EQUAL = 21
+AND = 22
+OR = 23
+NEGATE = 24
+NOT = 25
+JUMP = 26  # pc = arg
+JUMP_IF_FALSE = 27  # pop, pc = arg if falsey
+PRINT = 28
+INPUT = 29  # arg is 1 if a prompt is on the stack
+BUILD_LIST = 30  # pop arg elements into a new list
+INDEX = 31
+SET_INDEX = 32
+CALL = 33  # arg is the argument count; the callee sits below the arguments
+ENTER_BLOCK = 34  # push a new Frame with arg slots
+EXIT_BLOCK = 35
+FUNCTION = 36  # push a VMFunction for the declaration in constants[arg]
+RETURN = 37  # pop the return value and resume the caller (or leave the VM)
+FAIL = 38  # raise RuntimeError(constants[arg])
+CONST_LIST = 39  # push a new list holding the values in the tuple constants[arg]
+TAIL_CALL = 40  # like CALL followed by RETURN, but a MyPi callee replaces the current call
+MATERIALIZE = 41  # join a StringBuilder on top of the stack into a str
+BUILD_BEGIN = 42  # for `v = v + a;` with v's value on the stack: pc = arg unless it is a string, else push its length and a list for the pieces
+BUILD_PIECE = 43  # pop a value and append it, stringified, to the pieces
+BUILD_END = 44  # pop the pieces and length and extend the string with the pieces (see Interpreter.build_string)
+LOOP = 45  # pc = arg, the start of a while loop; one step of the budget
+ENTER_REUSED_BLOCK = 46  # enter the frame block_frame() gives the Block in constants[arg]
+GET_FALLBACK = 47  # push the Variable in constants[arg], which has a fallback (see read_with_fallback)
+SET_FALLBACK = 48  # assign top of stack (kept) to the Variable in constants[arg], which has a fallback
+
+OPCODE_NAMES = {value: name for name, value in list(globals().items())
+                if name.isupper() and isinstance(value, int)}
+
+BINARY_OPCODES = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUBTRACT,
+    TokenType.STAR: MULTIPLY,
+    TokenType.SLASH: DIVIDE,
+    TokenType.GREATER: GREATER,
+    TokenType.GREATER_EQUAL: GREATER_EQUAL,
+    TokenType.LESS: LESS,
+    TokenType.LESS_EQUAL: LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: EQUAL,
+    TokenType.BANG_EQUAL: NOT_EQUAL,
+    TokenType.AND: AND,
+    TokenType.OR: OR,
+}
+
+NUMBER_TYPES = (int, float)
+
+
+# A compiled unit of bytecode: the top-level program or one function body.
+class Chunk:
+    def __init__(self, name: str):
+        self.name = name
+        self.ops = bytearray()  # Opcode stream (converted to bytes once compiled)
+        self.args = array('i')  # Argument stream, same index as ops
+        self.constants = []  # Constant pool
+        self.messages = {}  # Runtime error message for the instruction at each pc that can fail
+        self._constant_index = {}
+
+    def emit(self, op: int, arg: int = 0, message: str = None) -> int:
+        """Appends an instruction and returns its pc."""
+        pc = len(self.ops)
+        self.ops.append(op)
+        self.args.append(arg)
+        if message is not None:
+            self.messages[pc] = message
+        return pc
+
+    def add_constant(self, value: object) -> int:
+        try:
+            # repr keeps 1, 1.0, True and -0.0 apart while still sharing equal constants
+            key = (type(value), repr(value))
+            hash(value)
+        except TypeError:
+            key = None
+        if key is not None and key in self._constant_index:
+            return self._constant_index[key]
+        self.constants.append(value)
+        if key is not None:
+            self._constant_index[key] = len(self.constants) - 1
+        return len(self.constants) - 1
+
+    def patch(self, pc: int, target: int):
+        self.args[pc] = target
+
+    def finish(self):
+        self.ops = bytes(self.ops)
+        self._constant_index = None
+
+    def disassemble(self) -> str:
+        lines = [f"== {self.name} =="]
+        for pc in range(len(self.ops)):
+            name = OPCODE_NAMES.get(self.ops[pc], '?')
+            lines.append(f"{pc:04d} {name:<14} {self.args[pc]}")
+        return "\n".join(lines)
+
+
+class BytecodeCompiler:
+    """Compiles the resolved AST into Chunks for the VM."""
+
+    def __init__(self):
+        self.chunk = None
+
+    def compile_program(self, statements: list[Stmt]) -> Chunk:
+        return self.compile_chunk("<script>", statements, returns_nil=False)
+
+    def compile_chunk(self, name: str, statements: list[Stmt], returns_nil: bool) -> Chunk:
+        enclosing_chunk = self.chunk
+        self.chunk = Chunk(name)
+        for statement in statements:
+            self.compile_stmt(statement)
+        if returns_nil:
+            # Functions implicitly return nil
+            self.chunk.emit(CONST, self.chunk.add_constant(None))
+        self.chunk.emit(RETURN)
+        chunk = self.chunk
+        chunk.finish()
+        self.chunk = enclosing_chunk
+        return chunk
+
+    # --- Statements ---
+
+    def compile_stmt(self, stmt: Stmt):
+        chunk = self.chunk
+        if isinstance(stmt, ExpressionStmt):
+            self.compile_expr(stmt.expression)
+            chunk.emit(POP)
+        elif isinstance(stmt, PrintStmt):
+            self.compile_expr(stmt.expression)
+            chunk.emit(PRINT)
+        elif isinstance(stmt, Var):
+            if stmt.initializer:
+                self.compile_expr(stmt.initializer)
+            else:
+                chunk.emit(CONST, chunk.add_constant(None))
+            self.emit_define(stmt.name, stmt.slot)
+        elif isinstance(stmt, Block):
+            if not stmt.frame_size:
+                # The block declares nothing, so it runs in the enclosing frame.
+                for statement in stmt.statements:
+                    self.compile_stmt(statement)
+            else:
+                if stmt.reuses_frame:
+                    chunk.emit(ENTER_REUSED_BLOCK, chunk.add_constant(stmt))
+                else:
+                    chunk.emit(ENTER_BLOCK, stmt.frame_size)
+                for statement in stmt.statements:
+                    self.compile_stmt(statement)
+                chunk.emit(EXIT_BLOCK)
+        elif isinstance(stmt, If):
+            self.compile_expr(stmt.condition)
+            jump_to_else = chunk.emit(JUMP_IF_FALSE)
+            self.compile_stmt(stmt.then_branch)
+            if stmt.else_branch:
+                jump_to_end = chunk.emit(JUMP)
+                chunk.patch(jump_to_else, len(chunk.ops))
+                self.compile_stmt(stmt.else_branch)
+                chunk.patch(jump_to_end, len(chunk.ops))
+            else:
+                chunk.patch(jump_to_else, len(chunk.ops))
+        elif isinstance(stmt, While):
+            loop_start = len(chunk.ops)
+            self.compile_expr(stmt.condition)
+            exit_jump = chunk.emit(JUMP_IF_FALSE)
+            self.compile_stmt(stmt.body)
+            chunk.emit(LOOP, loop_start)
+            chunk.patch(exit_jump, len(chunk.ops))
+        elif isinstance(stmt, Function):
+            stmt.chunk = self.compile_chunk(stmt.name.lexeme, stmt.body.statements, returns_nil=True)
+            chunk.emit(FUNCTION, chunk.add_constant(stmt))
+            self.emit_define(stmt.name, stmt.slot)
+        elif isinstance(stmt, Return):
+            if stmt.tail_call:
+                self.emit_call(stmt.value, TAIL_CALL)
+            else:
+                if stmt.value:
+                    self.compile_expr(stmt.value)
+                else:
+                    chunk.emit(CONST, chunk.add_constant(None))
+                chunk.emit(RETURN)
+
+    def emit_define(self, name_token, slot):
+        if slot is None:
+            self.chunk.emit(DEFINE_GLOBAL, self.chunk.add_constant(name_token.lexeme))
+        else:
+            self.chunk.emit(DEFINE_LOCAL, slot)
+
+    # --- Expressions ---
+
+    def compile_expr(self, expr: Expr):
+        chunk = self.chunk
+        if isinstance(expr, Binary):
+            self.compile_expr(expr.left)
+            self.compile_expr(expr.right)
+            operator = expr.operator
+            if operator.type == TokenType.PLUS:
+                message = f"Operands of '+' must be two numbers, two strings or two lists on line {operator.line}."
+            else:
+                message = f"Operands of '{operator.lexeme}' must be numbers on line {operator.line}."
+            pc = chunk.emit(BINARY_OPCODES[operator.type], 0, message)
+            if operator.type == TokenType.SLASH:
+                # Division reports zero divisors separately; keep both messages for the same pc.
+                chunk.messages[pc] = (message, f"Division by zero on line {operator.line}.")
+
+        elif isinstance(expr, Unary):
+            self.compile_expr(expr.right)
+            operator = expr.operator
+            if operator.type == TokenType.MINUS:
+                chunk.emit(NEGATE, 0, f"Operand of '{operator.lexeme}' must be a number on line {operator.line}.")
+            else:
+                chunk.emit(NOT)
+
+        elif isinstance(expr, Literal):
+            chunk.emit(CONST, chunk.add_constant(expr.value))
+
+        elif isinstance(expr, Grouping):
+            self.compile_expr(expr.expression)
+
+        elif isinstance(expr, Variable):
+            self.emit_variable_read(expr)
+            if expr.materialize:
+                chunk.emit(MATERIALIZE)
+
+        elif isinstance(expr, Assign):
+            if expr.appended:
+                self.emit_build_string(expr.appended)
+            else:
+                self.compile_expr(expr.value)
+            target = expr.target_expr
+            if isinstance(target, Variable):
+                message = f"Undefined variable '{target.name.lexeme}' on line {target.name.line}."
+                if target.depth is None:
+                    chunk.emit(SET_GLOBAL, chunk.add_constant(target.name.lexeme), message)
+                elif target.fallback is not None:
+                    chunk.emit(SET_FALLBACK, chunk.add_constant(target))
+                elif target.depth == 0:
+                    chunk.emit(SET_LOCAL, target.slot, message)
+                elif target.depth == 1:
+                    chunk.emit(SET_ENCLOSING, target.slot, message)
+                else:
+                    chunk.emit(SET_OUTER, chunk.add_constant((target.depth, target.slot)), message)
+            elif isinstance(target, Index):
+                self.compile_expr(target.obj)
+                self.compile_expr(target.index_expr)
+                index_line = _line_attr(target.index_expr)
+                chunk.emit(SET_INDEX, 0, (
+                    f"Cannot assign to non-list type via index on line {_line_of(target.obj)}.",
+                    f"List index must be an integer on line {index_line}.",
+                    f"List index out of bounds: {{}} on line {index_line}.",
+                ))
+            else:
+                chunk.emit(FAIL, chunk.add_constant(f"Invalid assignment target on line {_line_attr(target)}."))
+
+        elif isinstance(expr, InputExpr):
+            if expr.prompt:
+                self.compile_expr(expr.prompt)
+                chunk.emit(INPUT, 1, f"Input prompt must be a string on line {_line_attr(expr.prompt)}.")
+            else:
+                chunk.emit(INPUT, 0)
+
+        elif isinstance(expr, ListLiteral):
+            if expr.constant is not None:
+                chunk.emit(CONST_LIST, chunk.add_constant(expr.constant))
+            else:
+                for element in expr.elements:
+                    self.compile_expr(element)
+                chunk.emit(BUILD_LIST, len(expr.elements))
+
+        elif isinstance(expr, Index):
+            self.compile_expr(expr.obj)
+            self.compile_expr(expr.index_expr)
+            index_line = _line_attr(expr.index_expr)
+            chunk.emit(INDEX, 0, (
+                f"Only lists and strings can be indexed on line {_line_of(expr.obj)}.",
+                f"Index must be an integer on line {index_line}.",
+                f"Index out of bounds: {{}} on line {index_line}.",
+            ))
+
+        elif isinstance(expr, Call):
+            self.emit_call(expr, CALL)
+
+        else:
+            chunk.emit(FAIL, chunk.add_constant(f"Unknown expression type: {type(expr).__name__}"))
+
+    def emit_variable_read(self, expr: Variable):
+        """Pushes the value stored in a variable's slot (a StringBuilder is not joined)."""
+        chunk = self.chunk
+        message = f"Undefined variable '{expr.name.lexeme}' on line {expr.name.line}."
+        if expr.depth is None:
+            chunk.emit(GET_GLOBAL, chunk.add_constant(expr.name.lexeme), message)
+        elif expr.fallback is not None:
+            chunk.emit(GET_FALLBACK, chunk.add_constant(expr))
+        elif expr.depth == 0:
+            chunk.emit(GET_LOCAL, expr.slot, message)
+        elif expr.depth == 1:
+            chunk.emit(GET_ENCLOSING, expr.slot, message)
+        else:
+            chunk.emit(GET_OUTER, chunk.add_constant((expr.depth, expr.slot)), message)
+
+    def emit_build_string(self, appended: tuple):
+        """
+        Compiles the value of a `v = v + a + b;` statement: appending the pieces in place while v
+        holds a string, and plain '+' instructions (placed last, so they fall through) otherwise.
+        """
+        chunk = self.chunk
+        self.emit_variable_read(appended[0].left)
+        jump_to_add = chunk.emit(BUILD_BEGIN)
+        for step in appended:
+            self.compile_expr(step.right)
+            chunk.emit(BUILD_PIECE)
+        chunk.emit(BUILD_END)
+        jump_to_end = chunk.emit(JUMP)
+        chunk.patch(jump_to_add, len(chunk.ops))
+        for step in appended:
+            self.compile_expr(step.right)
+            chunk.emit(ADD, 0, f"Operands of '+' must be two numbers, two strings or two lists on line {step.operator.line}.")
+        chunk.patch(jump_to_end, len(chunk.ops))
+
+    def emit_call(self, expr: Call, op: int):
+        self.compile_expr(expr.callee)
+        for argument in expr.arguments:
+            self.compile_expr(argument)
+        line = _line_of(expr.callee)
+        self.chunk.emit(op, len(expr.arguments), (
+            f"Not a callable type on line {line}.",
+            f"Expected {{}} arguments but got {len(expr.arguments)} on line {line}.",
+        ))
+
+
+# A user-defined function whose body has been compiled to bytecode.
+class VMFunction(LoxFunction):
+    def call(self, interpreter, arguments: list) -> object:
+        environment = Frame(self.closure, self.declaration.frame_size)
+        environment.slots[:len(arguments)] = arguments
+        return interpreter.run(self.declaration.chunk, environment)
+
+
+class VM(Interpreter):
+    """
+    Stack-based virtual machine for the bytecode produced by BytecodeCompiler.
+    MyPi calls push a call record onto an explicit list instead of recursing in Python,
+    and operands live on a value stack rather than in nested evaluate() frames.
+    """
+
+    def interpret(self, statements: list[Stmt]) -> bool:
+        chunk = BytecodeCompiler().compile_program(statements)
+        try:
+            self.budget.start()
+            self.run(chunk, self.globals)
+        except RuntimeError as e:
+            self.output.write_line(f"Runtime error: {e}")
+            return False
+        finally:
+            self.output.flush()
+        return True
+
+    def run(self, chunk: Chunk, env) -> object:
+        """Runs a chunk until it returns to the caller of run()."""
+        ops, args, constants, messages = chunk.ops, chunk.args, chunk.constants, chunk.messages
+        globals_values = self.globals.values
+        define_global = self.globals.define
+        stringify = self.stringify
+        write_line = self.output.write_line
+        is_truthy = self._is_truthy
+        is_equal = self._is_equal
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        number_types = NUMBER_TYPES
+        max_exact_int = MAX_EXACT_INT
+        budget = self.budget
+        max_depth = budget.max_depth if budget.max_depth is not None else UNLIMITED
+        block_frames = self.block_frames
+        slots = env.slots if isinstance(env, Frame) else None  # Slots of the current frame
+        call_records = []  # (chunk, pc, env) of each suspended caller
+        pc = 0
+
+        while True:
+            op = ops[pc]
+            arg = args[pc]
+            pc += 1
+
+            if op == GET_LOCAL:
+                value = slots[arg]
+                if value is UNDEFINED:
+                    raise RuntimeError(messages[pc - 1])
+                push(value)
+
+            elif op == CONST:
+                push(constants[arg])
+
+            elif op == SET_LOCAL:
+                if slots[arg] is UNDEFINED:
+                    raise RuntimeError(messages[pc - 1])
+                slots[arg] = stack[-1]
+
+            elif op == POP:
+                pop()
+
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is False or (value is not True and not is_truthy(value)):
+                    pc = arg
+
+            elif op == JUMP:
+                pc = arg
+
+            elif op == LOOP:
+                pc = arg
+                budget.steps_left -= 1
+                if budget.steps_left < 0:
+                    budget.checkpoint()
+
+            elif op == GET_GLOBAL:
+                name = constants[arg]
+                if name not in globals_values:
+                    raise RuntimeError(messages[pc - 1])
+                push(globals_values[name])
+
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if isinstance(left, str) or isinstance(right, str):
+                    text = stack[-1] = stringify(left) + stringify(right)
+                    budget.elements_left -= len(text)
+                    if budget.elements_left < 0:
+                        budget.out_of_elements()
+                elif isinstance(left, number_types) and isinstance(right, number_types):
+                    result = left + right
+                    stack[-1] = result if -max_exact_int <= result <= max_exact_int else float(result)
+                elif isinstance(left, ListValue) and isinstance(right, ListValue):
+                    budget.allocate(len(right))
+                    stack[-1] = left.concat(right)
+                else:
+                    raise RuntimeError(messages[pc - 1])
+
+            elif op == BUILD_BEGIN:
+                value = stack[-1]
+                if type(value) is StringBuilder:
+                    push(value.length)
+                    push([])  # Pieces are appended once every one of them is evaluated
+                elif type(value) is str:
+                    push(0)
+                    push([])
+                else:
+                    pc = arg  # Not a string: plain additions
+
+            elif op == MATERIALIZE:
+                if type(stack[-1]) is StringBuilder:
+                    stack[-1] = stack[-1].value()
+
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1])
+                stack[-1] = left < right
+
+            elif op == GET_ENCLOSING:
+                value = env.enclosing.slots[arg]
+                if value is UNDEFINED:
+                    raise RuntimeError(messages[pc - 1])
+                push(value)
+
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = is_equal(stack[-1], right)
+
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not is_equal(stack[-1], right)
+
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1])
+                result = left - right
+                stack[-1] = result if -max_exact_int <= result <= max_exact_int else float(result)
+
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1])
+                result = left * right
+                stack[-1] = result if -max_exact_int <= result <= max_exact_int else float(result)
+
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1][0])
+                if right == 0:
+                    raise RuntimeError(messages[pc - 1][1])
+                stack[-1] = left / right
+
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1])
+                stack[-1] = left > right
+
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1])
+                stack[-1] = left >= right
+
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if not (isinstance(left, number_types) and isinstance(right, number_types)):
+                    raise RuntimeError(messages[pc - 1])
+                stack[-1] = left <= right
+
+            elif op == SET_GLOBAL:
+                name = constants[arg]
+                if name not in globals_values:
+                    raise RuntimeError(messages[pc - 1])
+                globals_values[name] = stack[-1]
+
+            elif op == SET_ENCLOSING:
+                enclosing_slots = env.enclosing.slots  # slots stays bound to the current frame
+                if enclosing_slots[arg] is UNDEFINED:
+                    raise RuntimeError(messages[pc - 1])
+                enclosing_slots[arg] = stack[-1]
+
+            elif op == INDEX:
+                index_val = pop()
+                obj = stack[-1]
+                not_indexable, not_integer, out_of_bounds = messages[pc - 1]
+                if isinstance(obj, ListValue):
+                    obj = obj.items
+                elif not isinstance(obj, str):
+                    raise RuntimeError(not_indexable)
+                if type(index_val) is not int:
+                    index_val = as_index(index_val)
+                    if index_val is None:
+                        raise RuntimeError(not_integer)
+                if not (0 <= index_val < len(obj)):
+                    raise RuntimeError(out_of_bounds.format(index_val))
+                stack[-1] = obj[index_val]
+
+            elif op == CALL:
+                callee = stack[-arg - 1]
+                if type(callee) is VMFunction and arg == len(callee.declaration.params):
+                    budget.steps_left -= 1
+                    if budget.steps_left < 0:
+                        budget.checkpoint()
+                    if len(call_records) >= max_depth:
+                        budget.too_deep()
+                    declaration = callee.declaration
+                    frame = Frame(callee.closure, declaration.frame_size)
+                    if arg:
+                        frame.slots[:arg] = stack[-arg:]
+                    del stack[-arg - 1:]
+                    # Suspend the caller and continue in the callee's chunk.
+                    call_records.append((chunk, pc, env))
+                    chunk = declaration.chunk
+                    ops, args, constants, messages = chunk.ops, chunk.args, chunk.constants, chunk.messages
+                    pc = 0
+                    env = frame
+                    slots = frame.slots
+                elif arg == 2 and type(callee) in LIST_BUILTINS:
+                    # list_append/list_remove_at: straight from the stack, no argument list
+                    second = pop()
+                    first = pop()
+                    stack[-1] = LIST_BUILTINS[type(callee)](self, first, second)
+                else:
+                    not_callable, wrong_arity = messages[pc - 1]
+                    arguments = stack[len(stack) - arg:]
+                    del stack[-arg - 1:]
+                    if not isinstance(callee, LoxCallable):
+                        raise RuntimeError(not_callable)
+                    if arg != callee.arity():
+                        raise RuntimeError(wrong_arity.format(callee.arity()))
+                    push(callee.call(self, arguments))
+
+            elif op == TAIL_CALL:
+                callee = stack[-arg - 1]
+                if type(callee) is VMFunction and arg == len(callee.declaration.params):
+                    budget.steps_left -= 1
+                    if budget.steps_left < 0:
+                        budget.checkpoint()
+                    declaration = callee.declaration
+                    frame = Frame(callee.closure, declaration.frame_size)
+                    if arg:
+                        frame.slots[:arg] = stack[-arg:]
+                    del stack[-arg - 1:]
+                    # No call record: the callee returns straight to our caller.
+                    chunk = declaration.chunk
+                    ops, args, constants, messages = chunk.ops, chunk.args, chunk.constants, chunk.messages
+                    pc = 0
+                    env = frame
+                    slots = frame.slots
+                    continue
+
+                not_callable, wrong_arity = messages[pc - 1]
+                arguments = stack[len(stack) - arg:]
+                del stack[-arg - 1:]
+                if not isinstance(callee, LoxCallable):
+                    raise RuntimeError(not_callable)
+                if arg != callee.arity():
+                    raise RuntimeError(wrong_arity.format(callee.arity()))
+                value = callee.call(self, arguments)
+                if not call_records:
+                    return value
+                chunk, pc, env = call_records.pop()
+                ops, args, constants, messages = chunk.ops, chunk.args, chunk.constants, chunk.messages
+                slots = env.slots if isinstance(env, Frame) else None
+                push(value)
+
+            elif op == RETURN:
+                value = pop() if stack else None
+                if not call_records:
+                    return value
+                chunk, pc, env = call_records.pop()
+                ops, args, constants, messages = chunk.ops, chunk.args, chunk.constants, chunk.messages
+                slots = env.slots if isinstance(env, Frame) else None
+                push(value)
+
+            elif op == ENTER_BLOCK:
+                env = Frame(env, arg)
+                slots = env.slots
+
+            elif op == ENTER_REUSED_BLOCK:
+                # block_frame(), inlined
+                block = constants[arg]
+                frame = slots[block.frame_slot] if block.frame_slot is not None else block_frames.get(block, UNDEFINED)
+                if frame is UNDEFINED:
+                    frame = block_frame(block, env, block_frames)
+                else:
+                    frame.slots[:block.local_count] = [UNDEFINED] * block.local_count
+                env = frame
+                slots = frame.slots
+
+            elif op == EXIT_BLOCK:
+                env = env.enclosing
+                slots = env.slots if isinstance(env, Frame) else None
+
+            elif op == DEFINE_LOCAL:
+                slots[arg] = pop()
+
+            elif op == DEFINE_GLOBAL:
+                define_global(constants[arg], pop())
+
+            elif op == PRINT:
+                write_line(stringify(pop()))
+
+            elif op == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+
+            elif op == NEGATE:
+                if not isinstance(stack[-1], number_types):
+                    raise RuntimeError(messages[pc - 1])
+                stack[-1] = -stack[-1]
+
+            elif op == AND:
+                # Both operands were evaluated, as in the tree-walker.
+                right = pop()
+                stack[-1] = stack[-1] and right
+
+            elif op == OR:
+                right = pop()
+                if not is_truthy(stack[-1]):
+                    stack[-1] = right
+
+            elif op == SET_INDEX:
+                index_val = pop()
+                list_obj = pop()
+                not_list, not_integer, out_of_bounds = messages[pc - 1]
+                if not isinstance(list_obj, ListValue):
+                    raise RuntimeError(not_list)
+                if type(index_val) is not int:
+                    index_val = as_index(index_val)
+                    if index_val is None:
+                        raise RuntimeError(not_integer)
+                if not (0 <= index_val < len(list_obj.items)):
+                    raise RuntimeError(out_of_bounds.format(index_val))
+                value = stack[-1]
+                items = list_obj.items
+                if type(list_obj) is ListValue and (type(items) is list or type(value) is int):
+                    items[index_val] = value  # Fits the storage as it is
+                else:
+                    list_obj.store(index_val, value)
+
+            elif op == BUILD_LIST:
+                if arg:
+                    elements = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    elements = []
+                budget.elements_left -= arg
+                if budget.elements_left < 0:
+                    budget.out_of_elements()
+                push(ListValue(elements))
+
+            elif op == CONST_LIST:
+                elements = constants[arg]
+                budget.elements_left -= len(elements)
+                if budget.elements_left < 0:
+                    budget.out_of_elements()
+                push(ListValue(elements))
+
+            elif op == BUILD_PIECE:
+                piece = stringify(pop())
+                stack[-1].append(piece)
+
+            elif op == BUILD_END:
+                text = "".join(pop())
+                length = pop()
+                budget.elements_left -= len(text)
+                if budget.elements_left < 0:
+                    budget.out_of_elements()
+                stack[-1] = extend_string(stack[-1], length, text)
+
+            elif op == FUNCTION:
+                push(VMFunction(constants[arg], env))
+
+            elif op == GET_OUTER:
+                depth, slot = constants[arg]
+                frame = env
+                for _ in range(depth):
+                    frame = frame.enclosing
+                value = frame.slots[slot]
+                if value is UNDEFINED:
+                    raise RuntimeError(messages[pc - 1])
+                push(value)
+
+            elif op == SET_OUTER:
+                depth, slot = constants[arg]
+                frame = env
+                for _ in range(depth):
+                    frame = frame.enclosing
+                if frame.slots[slot] is UNDEFINED:
+                    raise RuntimeError(messages[pc - 1])
+                frame.slots[slot] = stack[-1]
+
+            elif op == INPUT:
+                prompt_str = ""
+                if arg:
+                    prompt = pop()
+                    if not isinstance(prompt, str):
+                        raise RuntimeError(messages[pc - 1])
+                    prompt_str = prompt
+                push(self.read_input(prompt_str))
+
+            elif op == GET_FALLBACK:
+                push(read_with_fallback(env, constants[arg], self.globals))
+
+            elif op == SET_FALLBACK:
+                assign_with_fallback(env, constants[arg], self.globals, stack[-1])
+
+            elif op == FAIL:
+                raise RuntimeError(constants[arg])
+
+            else:
+                raise RuntimeError(f"Unknown opcode {op} at {pc - 1} in {chunk.name}.")
@@ -0,0 +1,244 @@
+from array import array
+
+
+def pack(values):
+    """
+    Picks the most compact storage for a list's elements: array('q') while every element is
+    an int, array('d') while every element is an int or a float, otherwise a plain Python list.
+    A list passed in is used as is (not copied) when it has to stay generic.
+    """
+    types = set(map(type, values))
+    try:
+        if types <= {int}:
+            return array('q', values)
+        if types <= {int, float}:
+            return array('d', values)
+    except OverflowError:
+        pass  # An int too large for the typed array
+    return values if type(values) is list else list(values)
+
+
+# Represents a MiPi list value.
+# Numeric lists keep their elements unboxed in a typed array, so a large numeric buffer costs
+# 8 bytes per element instead of a pointer plus a Python number object. The first store of a
+# value the array cannot hold converts the storage (int -> float array -> generic list), so the
+# representation is never visible to MiPi code: ints stored in a float array read back as equal
+# floats, which print, compare and index exactly like the ints did.
+class ListValue:
+    __slots__ = ('items',)
+
+    def __init__(self, values=()):
+        self.items = pack(values)  # array('q'), array('d') or list
+
+    @classmethod
+    def with_storage(cls, items) -> 'ListValue':
+        """Wraps existing storage (an array or list produced by another ListValue) without repacking it."""
+        result = cls.__new__(cls)
+        result.items = items
+        return result
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ListValue):
+            return NotImplemented
+        if type(self.items) is type(other.items):
+            return self.items == other.items
+        return len(self.items) == len(other.items) and list(self.items) == list(other.items)
+
+    __hash__ = None  # Mutable, like the Python list it replaces
+
+    def accept(self, value: object):
+        """Makes sure the storage can hold value, converting it to a wider kind if needed."""
+        items = self.items
+        if type(items) is list:
+            return items
+        value_type = type(value)
+        if value_type is int or (value_type is float and items.typecode == 'd'):
+            return items
+        if value_type is float:
+            items = self.items = array('d', items)
+        else:
+            items = self.items = items.tolist()  # Booleans, strings, lists, nil, functions
+        return items
+
+    def store(self, index: int, value: object):
+        items = self.items
+        if type(items) is not list and type(value) is not int:
+            items = self.accept(value)
+        items[index] = value
+
+    def append(self, value: object):
+        items = self.items
+        if type(items) is not list and type(value) is not int:
+            items = self.accept(value)
+        items.append(value)
+
+    def insert(self, index: int, value: object):
+        items = self.items
+        if type(items) is not list and type(value) is not int:
+            items = self.accept(value)
+        items.insert(index, value)
+
+    def pop(self, index: int) -> object:
+        return self.items.pop(index)
+
+    def index_of(self, value: object, is_equal) -> int:
+        """
+        Position of the first element for which is_equal(element, value) holds, or -1. Candidates
+        are found with the storage's native search (Python ==, which every MiPi-equal pair
+        satisfies) and then confirmed, since Python also considers e.g. true == 1.
+        """
+        items = self.items
+        start = 0
+        while True:
+            try:
+                position = items.index(value, start)
+            except (ValueError, TypeError):
+                return -1
+            if is_equal(items[position], value):
+                return position
+            start = position + 1
+
+    def concat(self, other: 'ListValue') -> 'ListValue':
+        """
+        Returns a new list with the elements of self followed by those of other. When both
+        storages are of the same kind, the result takes over self's storage and extends it in
+        place, and self becomes a PrefixView of it, so `acc = acc + [x]` costs O(len([x])).
+        """
+        left, right = self.items, other.items
+        if other is not self and type(left) is type(right) and (type(left) is list or left.typecode == right.typecode):
+            length = len(left)
+            left.extend(right)
+            self.__class__ = PrefixView
+            _storage.__set__(self, (left, length))
+            return SharedList.with_storage(left)
+        return ListValue.with_storage(pack(list(left) + list(right)))
+
+    def extend(self, other: 'ListValue'):
+        """Appends the elements of other in place."""
+        left, right = self.items, other.items
+        if type(left) is list:
+            left.extend(right)
+        elif type(right) is not list and left.typecode == right.typecode:
+            left.extend(right)
+        elif type(right) is not list and left.typecode == 'd':
+            left.fromlist(right.tolist())  # Ints into a float array
+        else:
+            self.items = pack(list(left) + list(right))
+
+    def fill(self, value: object):
+        """Replaces every element with value."""
+        self.items = pack([value] * len(self.items))
+
+    def sort(self):
+        items = self.items
+        if type(items) is list:
+            items.sort()
+        else:
+            self.items = array(items.typecode, sorted(items))
+
+    def reverse(self):
+        self.items.reverse()
+
+
+_storage = ListValue.items  # The slot itself, which the subclasses below hide behind their own logic
+
+
+# Represents a list whose storage was taken over by the result of `self + other` (see
+# ListValue.concat). Its elements are still the first `length` elements of that storage,
+# which nothing changes while the view exists: its owner is a SharedList. The first access
+# to the elements copies them, and the value is a plain ListValue again.
+class PrefixView(ListValue):
+    __slots__ = ()
+
+    @property
+    def items(self):
+        storage, length = _storage.__get__(self)
+        items = storage[:length]
+        self.__class__ = ListValue
+        _storage.__set__(self, items)
+        return items
+
+    @items.setter
+    def items(self, items):
+        self.__class__ = ListValue
+        _storage.__set__(self, items)
+
+
+# Represents the result of a concatenation, whose storage may still hold the elements of
+# PrefixViews. Appending leaves those elements alone, so append, extend and further
+# concatenations work in place; any other mutation copies the storage first.
+class SharedList(ListValue):
+    __slots__ = ()
+
+    def own(self):
+        """Takes a private copy of the storage and turns into a plain ListValue."""
+        self.items = self.items[:]
+        self.__class__ = ListValue
+
+    def store(self, index: int, value: object):
+        self.own()
+        self.store(index, value)
+
+    def insert(self, index: int, value: object):
+        self.own()
+        self.insert(index, value)
+
+    def pop(self, index: int) -> object:
+        self.own()
+        return self.pop(index)
+
+    def sort(self):
+        self.own()
+        self.sort()
+
+    def reverse(self):
+        self.own()
+        self.reverse()
+
+
+# Represents a string being built by repeated `s = s + x;` statements (see Resolver).
+# The pieces are only joined when the variable is read, so building a string of n
+# pieces costs O(total length) instead of copying the whole prefix for every piece.
+# A StringBuilder never leaves the variable slot that holds it: every read of such a
+# variable materializes it, so the rest of the interpreter only ever sees a str.
+class StringBuilder:
+    __slots__ = ('parts', 'length')
+
+    def __init__(self, text: str):
+        self.parts = [text]
+        self.length = len(text)  # Characters so far; only ever grows
+
+    def append(self, text: str):
+        self.parts.append(text)
+        self.length += len(text)
+
+    def value(self) -> str:
+        parts = self.parts
+        if len(parts) > 1:
+            text = "".join(parts)
+            parts.clear()
+            parts.append(text)  # Later reads reuse the joined string
+        return parts[0]
+
+
+def extend_string(left, length: int, text: str) -> StringBuilder:
+    """
+    The value of `s = s + x` for a left operand that is a str or StringBuilder, with text the
+    stringified right operand and length the builder's length before the right operand was
+    evaluated. If evaluating it extended the same builder (a call doing `s = s + y`), the
+    result starts again from the old prefix, exactly as if strings had been copied.
+    """
+    if type(left) is StringBuilder:
+        if left.length == length:
+            left.append(text)
+            return left
+        left = left.value()[:length]
+    builder = StringBuilder(left)
+    builder.append(text)
+    return builder
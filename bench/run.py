@@ -0,0 +1,185 @@
+"""
+Benchmark runner for the MiPi workloads in bench/workloads/.
+
+For every workload it reports lexing, parsing and execution time separately (the best
+of --repeat runs) and the peak traced memory of one extra run under tracemalloc.
+Results are written as JSON to bench/results/<engine>.json and compared against
+bench/baseline-<engine>.json; the run fails with exit status 1 on a regression, and with
+exit status 2 when there is no baseline to compare against, so a gate is never silently
+unarmed. Baselines depend on the machine, so they are not committed: save one with
+--save-baseline on the machine that runs the gate. --report only prints the results.
+
+Usage:
+    python bench/run.py [--engine tree|closure|vm] [--optimize] [--repeat N]
+                        [--tolerance 0.25] [--memory-tolerance 0.10] [--save-baseline | --report]
+                        [workload ...]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))  # The interpreter modules live in the repository root
+
+from Lexer import FastLexer
+from Parser import Parser
+from Optimizer import Optimizer
+from Resolver import Resolver
+from main import ENGINES
+
+WORKLOAD_DIR = os.path.join(BENCH_DIR, "workloads")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Differences below these floors are treated as noise, whatever the relative change.
+TIME_FLOOR_MS = 1.0
+MEMORY_FLOOR_KIB = 16.0
+
+
+def run_once(source: str, engine: str, optimize: bool) -> tuple:
+    """Runs a program through every stage. Returns (lex, parse, execute) times in seconds."""
+    start = time.perf_counter()
+    tokens = FastLexer(source).scan_tokens()
+    lexed = time.perf_counter()
+    statements = Parser(tokens).parse()
+    parsed = time.perf_counter()
+
+    # Optimization and resolution are part of getting the program ready to run.
+    if optimize:
+        statements = Optimizer().optimize(statements)
+    interpreter = ENGINES[engine]()
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep the program's output out of the report
+        if Resolver(interpreter).resolve(statements):
+            interpreter.interpret(statements)
+    executed = time.perf_counter()
+    return lexed - start, parsed - lexed, executed - parsed
+
+
+def measure(path: str, engine: str, optimize: bool, repeat: int) -> dict:
+    with open(path, 'r') as file:
+        source = file.read()
+
+    best = [float('inf')] * 3
+    for _ in range(repeat):
+        best = [min(old, new) for old, new in zip(best, run_once(source, engine, optimize))]
+
+    tracemalloc.start()
+    run_once(source, engine, optimize)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "lex_ms": round(best[0] * 1000, 3),
+        "parse_ms": round(best[1] * 1000, 3),
+        "execute_ms": round(best[2] * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float) -> list[str]:
+    """Returns a description of every metric that got worse than the baseline allows."""
+    regressions = []
+    for name, metrics in results["workloads"].items():
+        expected = baseline["workloads"].get(name)
+        if expected is None:
+            continue  # New workload: nothing to compare against yet
+        for metric, value in metrics.items():
+            if metric not in expected:
+                continue
+            if metric == "peak_kib":
+                allowed, floor = memory_tolerance, MEMORY_FLOOR_KIB
+            else:
+                allowed, floor = tolerance, TIME_FLOOR_MS
+            old = expected[metric]
+            if value > old * (1 + allowed) and value - old > floor:
+                regressions.append(f"{name}: {metric} {old} -> {value} (+{(value / old - 1) * 100 if old else 100:.0f}%)")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    print(f"{'workload':<24}{'lex ms':>10}{'parse ms':>10}{'exec ms':>11}{'peak KiB':>11}{'exec vs base':>14}")
+    for name, metrics in results["workloads"].items():
+        change = ""
+        expected = baseline["workloads"].get(name) if baseline else None
+        if expected and expected.get("execute_ms"):
+            change = f"{(metrics['execute_ms'] / expected['execute_ms'] - 1) * 100:+.1f}%"
+        print(f"{name:<24}{metrics['lex_ms']:>10.2f}{metrics['parse_ms']:>10.2f}"
+              f"{metrics['execute_ms']:>11.1f}{metrics['peak_kib']:>11.1f}{change:>14}")
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Run the MiPi benchmark suite.")
+    arg_parser.add_argument("workloads", nargs="*",
+                            help="Workload names or paths (default: every file in bench/workloads)")
+    arg_parser.add_argument("--engine", choices=sorted(ENGINES), default="tree",
+                            help="Execution engine (default: tree)")
+    arg_parser.add_argument("--optimize", action="store_true", help="Run the optimizer before execution")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per workload; the best is kept")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative slowdown before a time counts as a regression")
+    arg_parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                            help="Allowed relative growth of peak memory")
+    arg_parser.add_argument("--save-baseline", action="store_true",
+                            help="Store these results as the new baseline instead of comparing")
+    arg_parser.add_argument("--report", action="store_true",
+                            help="Print the results (and the changes from any baseline) without failing on them")
+    args = arg_parser.parse_args()
+    if args.save_baseline and args.report:
+        arg_parser.error("--save-baseline and --report cannot be combined")
+
+    paths = []
+    for workload in args.workloads or sorted(glob.glob(os.path.join(WORKLOAD_DIR, "*.txt"))):
+        if not os.path.exists(workload):
+            workload = os.path.join(WORKLOAD_DIR, workload if workload.endswith(".txt") else workload + ".txt")
+        paths.append(workload)
+
+    suffix = args.engine + ("-optimized" if args.optimize else "")
+    results = {
+        "engine": args.engine,
+        "optimize": args.optimize,
+        "python": platform.python_version(),
+        "workloads": {},
+    }
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        results["workloads"][name] = measure(path, args.engine, args.optimize, args.repeat)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, f"{suffix}.json"), 'w') as file:
+        json.dump(results, file, indent=2)
+
+    baseline_path = os.path.join(BENCH_DIR, f"baseline-{suffix}.json")
+    if args.save_baseline:
+        with open(baseline_path, 'w') as file:
+            json.dump(results, file, indent=2)
+        print_table(results, None)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path, 'r') as file:
+            baseline = json.load(file)
+    print_table(results, baseline)
+
+    if baseline is None:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+        return 0 if args.report else 2
+
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 0 if args.report else 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,233 @@
+import argparse
+import glob
+import mmap
+import os
 import sys
-from Lexer import Lexer
-from Parser import Parser
+from Lexer import Lexer, FastLexer, StreamingLexer
+from Parser import Parser, StreamParser
+from Optimizer import Optimizer
+from Cache import ParseCache
+from Profiler import ProfilingInterpreter
+from Resolver import Resolver
 from Interpreter import Interpreter
+from Compiler import CompiledInterpreter
+from VM import VM
+from Output import OutputWriter, DEFAULT_BUFFER_SIZE
+from Input import InputFeed, END_POLICIES
+from Batch import expand_paths, run_batch
+from Budget import Budget
 
 
-def run_file(file_path: str):
+# Lexers selectable with --lexer. Both produce the same tokens and line numbers.
+LEXERS = {
+    "fast": FastLexer,  # One compiled master regex per token
+    "classic": Lexer,  # Reference character-by-character scanner
+}
+
+# Execution engines selectable with --engine. All of them share the same semantics.
+ENGINES = {
+    "tree": Interpreter,  # Reference tree-walking interpreter
+    "closure": CompiledInterpreter,  # Compiles each AST node once into a specialized closure
+    "vm": VM,  # Compiles to bytecode and runs it on a stack-based virtual machine
+}
+
+
+def run_file(file_path: str, engine: str = "tree", optimize: bool = False, lexer: str = "fast",
+             stream: bool = False, cache: ParseCache = None, profile_output: str = None,
+             output: OutputWriter = None, input_feed: InputFeed = None, budget: Budget = None) -> bool:
     """
     Reads a source code file, tokenizes it, parses it, and then interprets the statements.
     Processes the entire file content as a single program.
+    With a ParseCache, lexing and parsing are skipped when the file has not changed.
+    With profile_output, the program runs on the profiling tree-walker, a report is printed
+    and collapsed stacks for flamegraph tools are written to that path.
+    The program's output goes through the given OutputWriter (default: buffered stdout), and
+    input() reads from input_feed when one is given, and a budget limits what the run may use.
+    Returns True if the program ran to the end without any error being reported.
     """
+    if stream:
+        return stream_file(file_path, engine, optimize, output, input_feed, budget)
+
+    succeeded = False
+
     try:
         with open(file_path, 'r') as file:
             source_code = file.read()  # Read the entire content of the file
 
         print(f"--- Interpreting file: '{file_path}' ---")
 
-        # 1. Lexing: Convert the entire source code into a list of tokens.
-        lexer = Lexer(source_code)  # Pass the *entire* source_code string
-        tokens = lexer.scan_tokens()
-        # print("Tokens:", tokens) # Uncomment for debugging tokens
+        statements = cache.load(file_path, source_code) if cache else None
+        parsed = True
+        if statements is None:
+            # 1. Lexing: Convert the entire source code into a list of tokens.
+            tokens = LEXERS[lexer](source_code).scan_tokens()  # Pass the *entire* source_code string
+            # print("Tokens:", tokens) # Uncomment for debugging tokens
+
+            # 2. Parsing: Convert the list of tokens into a list of Abstract Syntax Tree (AST) statements.
+            parser = Parser(tokens)
+            statements = parser.parse()  # Get all statements from the file
+            # print("AST:", statements) # Uncomment for debugging AST structure
+
+            parsed = not parser.had_error
+            # Programs with parsing errors are not cached, so the errors are reported on every run.
+            if cache and parsed:
+                cache.store(file_path, source_code, statements)
 
-        # 2. Parsing: Convert the list of tokens into a list of Abstract Syntax Tree (AST) statements.
-        parser = Parser(tokens)
-        statements = parser.parse()  # Get all statements from the file
-        # print("AST:", statements) # Uncomment for debugging AST structure
+        # Optional: fold constant expressions and prune constant branches.
+        if optimize:
+            statements = Optimizer().optimize(statements)
 
-        # 3. Interpretation: Execute the AST statements.
-        interpreter = Interpreter()
-        interpreter.interpret(statements)  # Interpret all statements
+        # 3. Resolution: Work out each local variable's (depth, slot) ahead of time.
+        #    Undefined variables and redefinitions are reported here, before anything runs.
+        interpreter = ProfilingInterpreter(output, input_feed, budget) if profile_output else ENGINES[engine](output, input_feed, budget)
+        resolver = Resolver(interpreter)
+        if resolver.resolve(statements):
+            # 4. Interpretation: Execute the AST statements.
+            succeeded = interpreter.interpret(statements) and parsed  # Interpret all statements
 
         print("-" * 40)  # Readability
 
+        if profile_output:
+            print(interpreter.profiler.report(source_code.splitlines()))
+            interpreter.profiler.write_collapsed(profile_output)
+            print(f"Collapsed stacks written to '{profile_output}'.")
+
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+        succeeded = False
+    return succeeded
+
+
+def stream_file(file_path: str, engine: str = "tree", optimize: bool = False, output: OutputWriter = None,
+                input_feed: InputFeed = None, budget: Budget = None) -> bool:
+    """
+    Streaming variant of run_file. The file is memory-mapped, tokens are produced on demand
+    and each top-level statement is resolved and run as soon as it has been parsed, so memory
+    use is bounded by the largest top-level declaration rather than by the file size.
+    Errors are reported as they are reached, interleaved with the program's output.
+    """
+    succeeded = False
+    try:
+        with open(file_path, 'rb') as file:
+            print(f"--- Interpreting file: '{file_path}' ---")
+
+            if os.fstat(file.fileno()).st_size == 0:
+                buffer = b""  # Empty files cannot be mapped
+            else:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            interpreter = ENGINES[engine](output, input_feed, budget)
+            resolver = Resolver(interpreter)
+            optimizer = Optimizer() if optimize else None
+            parser = StreamParser(StreamingLexer(buffer).iter_tokens())
+            succeeded = True
+            for statement in parser.statements():
+                statements = [statement]
+                if optimizer:
+                    statements = optimizer.optimize(statements)
+                if not statements:
+                    continue  # Pruned by the optimizer
+                # Stop at the first resolution or runtime error, like run_file.
+                if not resolver.resolve_top_level(statements[0]) or not interpreter.interpret(statements):
+                    succeeded = False
+                    break
+            succeeded = succeeded and not parser.had_error
+
+        print("-" * 40)  # Readability
+
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        succeeded = False
+    return succeeded
 
 
 # Main execution block
 if __name__ == "__main__":
-    # Check if a file path argument is provided when running the script.
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <source_file_path>")
-        sys.exit(1)  # Exit with an error code
-
-    # Get the file path from the command-line arguments.
-    source_file = sys.argv[1]
-    run_file(source_file)  # Run the interpreter with the provided file
+    arg_parser = argparse.ArgumentParser(description="Run a MyPi program, or a batch of them.")
+    arg_parser.add_argument("source_file_path", nargs="+",
+                            help="Path to the MyPi source file; several files, directories or glob patterns run a batch")
+    arg_parser.add_argument("--engine", choices=sorted(ENGINES), default="tree",
+                            help="Execution engine (default: tree)")
+    arg_parser.add_argument("--optimize", action="store_true",
+                            help="Fold constant expressions and prune constant branches before running")
+    arg_parser.add_argument("--lexer", choices=sorted(LEXERS), default="fast",
+                            help="Lexer implementation (default: fast)")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="Memory-map the file and run each top-level statement as soon as it is parsed")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Always lex and parse the file instead of using the parsed-program cache")
+    arg_parser.add_argument("--clear-cache", action="store_true",
+                            help="Delete the cached programs in the cache directory before running")
+    arg_parser.add_argument("--cache-stats", action="store_true",
+                            help="Report cache hits and misses on stderr")
+    arg_parser.add_argument("--cache-dir", default=None,
+                            help="Directory for cached programs (default: $XDG_CACHE_HOME/mipi or ~/.cache/mipi)")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="Time every line and function (on the tree engine) and print a report")
+    arg_parser.add_argument("--profile-output", default=None,
+                            help="Where --profile writes collapsed stacks (default: <source file>.folded)")
+    arg_parser.add_argument("--unbuffered", action="store_true",
+                            help="Write each line the program prints immediately, for interactive use")
+    arg_parser.add_argument("--input", default=None, metavar="FILE",
+                            help="Read the lines for input() from FILE ('-': all of stdin, read up front)")
+    arg_parser.add_argument("--input-end", choices=END_POLICIES, default="error",
+                            help="What input() does once --input is exhausted (default: error)")
+    arg_parser.add_argument("--jobs", type=int, default=None, metavar="N",
+                            help="Run a batch on N worker processes (default: one per CPU)")
+    arg_parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS",
+                            help="Stop any script of a batch that runs longer than this")
+    arg_parser.add_argument("--max-steps", type=int, default=None, metavar="N",
+                            help="Stop the program after N loop iterations and function calls")
+    arg_parser.add_argument("--max-seconds", type=float, default=None, metavar="SECONDS",
+                            help="Stop the program once it has run this long")
+    arg_parser.add_argument("--max-depth", type=int, default=None, metavar="N",
+                            help="Stop the program when calls nest more than N deep")
+    arg_parser.add_argument("--max-elements", type=int, default=None, metavar="N",
+                            help="Stop the program once it has created N list elements and string characters")
+    args = arg_parser.parse_args()
+
+    patterns = args.source_file_path
+    batch = (len(patterns) > 1 or args.jobs is not None or args.timeout is not None
+             or os.path.isdir(patterns[0]) or glob.has_magic(patterns[0]))
+    if batch and args.profile:
+        arg_parser.error("--profile runs a single file")
+    if args.jobs is not None and args.jobs < 1:
+        arg_parser.error("--jobs must be at least 1")
+
+    input_text = None
+    if args.input is not None:
+        try:
+            if args.input == "-":
+                input_text = sys.stdin.read()
+            else:
+                with open(args.input, 'r') as file:
+                    input_text = file.read()
+        except OSError as e:
+            arg_parser.error(f"cannot read --input file: {e}")
+
+    paths = expand_paths(patterns) if batch else patterns
+    budget = Budget(args.max_steps, args.max_seconds, args.max_depth, args.max_elements)
+
+    cache = ParseCache(args.cache_dir, report=args.cache_stats)
+    if args.clear_cache:
+        cache.clear()
+    if args.no_cache:
+        cache = None
+
+    if batch:
+        options = {"engine": args.engine, "optimize": args.optimize, "lexer": args.lexer,
+                   "stream": args.stream, "cache": cache, "budget": budget}
+        if not run_batch(paths, args.jobs, args.timeout, options, input_text or "", args.input_end):
+            sys.exit(1)
+    else:
+        profile_output = None
+        if args.profile:
+            profile_output = args.profile_output or paths[0] + ".folded"
+        output = OutputWriter(buffer_size=0 if args.unbuffered else DEFAULT_BUFFER_SIZE)
+        input_feed = InputFeed.from_text(input_text, args.input_end) if input_text is not None else None
+        run_file(paths[0], args.engine, args.optimize, args.lexer, args.stream, cache, profile_output,
+                 output, input_feed, budget)  # Run the interpreter with the provided file
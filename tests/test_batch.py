@@ -0,0 +1,101 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Batch import expand_paths, run_batch, run_script, OK, TIMEOUT, CRASHED
+import main
+
+OPTIONS = {"engine": "tree", "cache": None}
+run_file = main.run_file
+
+
+def crash_on_crash_txt(path: str, *args, **kwargs) -> bool:
+    """run_file, except that a worker running a file named crash.txt dies."""
+    if os.path.basename(path) == "crash.txt":
+        os._exit(3)
+    return run_file(path, *args, **kwargs)
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name: str, source: str) -> str:
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(source)
+        return path
+
+    def run_batch(self, paths: list[str], **arguments) -> tuple:
+        """(succeeded, what the batch printed)."""
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            succeeded = run_batch(paths, options=OPTIONS, **arguments)
+        return succeeded, printed.getvalue()
+
+    def test_expand_paths(self):
+        b = self.write("b.txt", "")
+        a = self.write("a.txt", "")
+        self.write(".hidden.txt", "")
+        nested = self.write("sub/c.txt", "")
+        missing = os.path.join(self.directory, "missing.txt")
+        self.assertEqual(expand_paths([self.directory]), [a, b])
+        self.assertEqual(expand_paths([os.path.join(self.directory, "*", "*.txt"), missing]), [nested, missing])
+
+    def test_statuses_and_order(self):
+        paths = [self.write("1.txt", "print 1;"), self.write("2.txt", "print 1 / 0;"),
+                 self.write("3.txt", "print 3;"), os.path.join(self.directory, "missing.txt")]
+        succeeded, printed = self.run_batch(paths, jobs=2)
+        self.assertFalse(succeeded)
+        self.assertLess(printed.index("\n1\n"), printed.index("Division by zero"))
+        self.assertLess(printed.index("Division by zero"), printed.index("\n3\n"))
+        self.assertIn(f"Error: File '{paths[3]}' not found.", printed)
+        self.assertIn("2 ok, 2 error", printed)
+
+    def test_all_succeeded(self):
+        succeeded, printed = self.run_batch([self.write("1.txt", "print 1;")])
+        self.assertTrue(succeeded)
+        self.assertIn("1 ok ---", printed)
+
+    def test_timeout(self):
+        status, output, seconds = run_script(self.write("loop.txt", "while (true) {}"), OPTIONS, "", "error", 0.2)
+        self.assertEqual(status, TIMEOUT)
+        self.assertIn("Timed out after 0.2s.", output)
+        self.assertLess(seconds, 5)
+
+    def test_timeout_in_batch(self):
+        paths = [self.write("loop.txt", "print \"start\"; while (true) {}"), self.write("ok.txt", "print 2;")]
+        succeeded, printed = self.run_batch(paths, jobs=2, timeout=0.2)
+        self.assertFalse(succeeded)
+        self.assertIn("Timed out after 0.2s.", printed)
+        self.assertRegex(printed, rf"{TIMEOUT} +\d+\.\d+s  {paths[0]}")
+        self.assertRegex(printed, rf"{OK} +\d+\.\d+s  {paths[1]}")
+
+    def test_input_for_every_script(self):
+        paths = [self.write(f"{index}.txt", 'print input("? ");') for index in range(2)]
+        succeeded, printed = self.run_batch(paths, input_text="same\n")
+        self.assertTrue(succeeded)
+        self.assertEqual(printed.count("? same\n"), 2)
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork", "workers must inherit the patched run_file")
+    def test_crash(self):
+        paths = [self.write("1.txt", "print 1;"), self.write("crash.txt", "print 2;")]
+        with mock.patch.object(main, "run_file", crash_on_crash_txt):
+            succeeded, printed = self.run_batch(paths, jobs=1)
+        self.assertFalse(succeeded)
+        self.assertIn(f"Worker process died while running '{paths[1]}'.", printed)
+        self.assertRegex(printed, rf"{CRASHED} +\d+\.\d+s  {paths[1]}")
+        self.assertIn("1 ok, 1 crash", printed)
+
+
+if __name__ == "__main__":
+    unittest.main()
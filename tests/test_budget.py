@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Run through main.py in a separate process, as in test_engines.py: the limits are command-line flags.
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = ("tree", "closure", "vm")
+
+RECURSION = "fun f(n) { return 1 + f(n + 1); }\nprint f(0);\n"
+NESTED_RECURSION = "fun f(n) { if (n >= 0) { while (true) { { return 1 + f(n + 1); } } } return 0; }\nprint f(0);\n"
+ENDLESS_LOOP = "var i = 0;\nwhile (true) { i = i + 1; }\n"
+GROWING_LIST = "var l = [];\nwhile (true) { list_append(l, 1); }\n"
+
+
+def run_program(source: str, engine: str, *flags: str) -> str:
+    """What main.py prints for a program run with the given flags."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.txt")
+        with open(path, "w") as file:
+            file.write(source)
+        return subprocess.run([sys.executable, os.path.join(REPO_DIR, "main.py"), "--no-cache",
+                               f"--engine={engine}", *flags, path], capture_output=True, text=True).stdout
+
+
+class BudgetTest(unittest.TestCase):
+    def check_limit(self, source: str, flag: str, message: str):
+        for engine in ENGINES:
+            with self.subTest(engine=engine, flag=flag):
+                self.assertIn(f"Runtime error: {message}", run_program(source, engine, flag))
+
+    def test_depth_limit(self):
+        # Python's own recursion limit used to stop the tree engine at about 200 calls, the closure engine at 300.
+        for depth in (10, 200, 300, 5000):
+            self.check_limit(RECURSION, f"--max-depth={depth}", f"Call depth limit of {depth} exceeded.")
+
+    def test_depth_limit_with_nested_statements(self):
+        self.check_limit(NESTED_RECURSION, "--max-depth=2000", "Call depth limit of 2000 exceeded.")
+
+    def test_program_within_depth_limit(self):
+        source = "fun down(n) { if (n == 0) return 0; return 1 + down(n - 1); }\nprint down(3000);\n"
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                output = run_program(source, engine, "--max-depth=3001")
+                self.assertIn("3000\n", output)
+                self.assertNotIn("error", output)
+
+    def test_step_limit(self):
+        self.check_limit(ENDLESS_LOOP, "--max-steps=10000", "Step limit of 10000 exceeded.")
+
+    def test_time_limit(self):
+        self.check_limit(ENDLESS_LOOP, "--max-seconds=0.2", "Time limit of 0.2s exceeded.")
+
+    def test_allocation_limit(self):
+        self.check_limit(GROWING_LIST, "--max-elements=1000", "Allocation limit of 1000 elements exceeded.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from main import ENGINES
+
+# (program, what it prints), the same on every engine.
+CASES = [
+    ('print len([1, 2, 3]); print len(""); print len("héllo");', "3\n0\n5\n"),
+    ('var l = [1, 2, 3, 4]; print slice(l, 1, 3); print slice(l, 0, 0); print slice("hello", 1, 4);',
+     "[2, 3]\n[]\nell\n"),
+    ("var l = [1, 2, 3]; var s = slice(l, 0, 2); s[0] = 9; print l; print s;", "[1, 2, 3]\n[9, 2]\n"),
+    ('var l = [1]; extend(l, [2.5, "x"]); print l; extend(l, l); print len(l);', "[1, 2.5, x]\n6\n"),
+    ('var l = [1, 3]; insert(l, 1, 2); insert(l, 3, "end"); insert(l, 0, nil); print l;',
+     "[nil, 1, 2, 3, end]\n"),
+    ('var l = [1, true, "a", 1]; print index_of(l, true); print index_of(l, 1); print index_of(l, 2);',
+     "1\n0\n-1\n"),
+    ('print index_of("banana", "na"); print contains("banana", "nab"); print contains([[1]], [1]);',
+     "2\nfalse\ntrue\n"),
+    ('var n = [3, 1.5, 2]; sort(n); print n; var s = ["b", "c", "a"]; sort(s); reverse(s); print s;',
+     "[1.5, 2, 3]\n[c, b, a]\n"),
+    ("print sum([]); print sum([1, 2, 3.5]); print min([3, -1, 2]); print max([\"a\", \"c\", \"b\"]);",
+     "0\n6.5\n-1\nc\n"),
+    ("var l = [1, 2, 3]; fill(l, 0); print l; fill(l, \"x\"); print l;", "[0, 0, 0]\n[x, x, x]\n"),
+    ("var l = [1, 2, 3]; list_remove_at(l, 1); list_append(l, 4); print l;", "[1, 3, 4]\n"),
+    ("var f = len; print f([1, 2]);", "2\n"),
+]
+
+# (program, runtime error message)
+ERRORS = [
+    ("len(5);", "First argument to 'len' must be a list or a string."),
+    ("slice([1, 2], 1, 3);", "Slice bounds out of range: 1 to 3 for size 2."),
+    ("slice([1, 2], 1.5, 2);", "Second argument to 'slice' must be an integer index."),
+    ("extend([1], 2);", "Second argument to 'extend' must be a list."),
+    ("insert([1], 3, 0);", "Index out of bounds: 3 for list of size 1."),
+    ('index_of("abc", 1);', "Second argument to 'index_of' must be a string when searching a string."),
+    ('sort([1, "a"]);', "List passed to 'sort' must contain only numbers or only strings."),
+    ('sum([1, "a"]);', "List passed to 'sum' must contain only numbers."),
+    ("min([]);", "List passed to 'min' must not be empty."),
+    ("reverse(\"abc\");", "First argument to 'reverse' must be a list."),
+    ("list_remove_at([1], 1);", "Index out of bounds: 1 for list of size 1."),
+    ("list_append(1, 2);", "First argument to 'list_append' must be a list."),
+    ("fill([1]);", "Expected 2 arguments but got 1"),
+]
+
+
+def run(source: str, engine: str) -> str:
+    output = io.StringIO()
+    interpreter = ENGINES[engine](output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+class ListBuiltinsTest(unittest.TestCase):
+    def test_results(self):
+        for source, expected in CASES:
+            for engine in ENGINES:
+                with self.subTest(source=source, engine=engine):
+                    self.assertEqual(run(source, engine), expected)
+
+    def test_errors(self):
+        for source, message in ERRORS:
+            for engine in ENGINES:
+                with self.subTest(source=source, engine=engine):
+                    self.assertIn(f"Runtime error: {message}", run(source, engine))
+
+    def test_large_lists(self):
+        source = ("var l = []; var i = 0; while (i < 20000) { list_append(l, 20000 - i); i = i + 1; }\n"
+                  "sort(l); print slice(l, 0, 3); print len(l); print sum(l); print index_of(l, 19999);\n")
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), "[1, 2, 3]\n20000\n200010000\n19998\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
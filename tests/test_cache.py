@@ -0,0 +1,111 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Cache
+from Cache import ParseCache, encode, decode
+from Lexer import FastLexer
+from Parser import Parser
+import main
+
+SOURCE = """fun add(a, b) { return a + b; }
+var l = [1, 2.5, "three", nil, true];
+if (add(1, 2) > 2) print l; else print "no";
+var i = 0;
+while (i < 2) { l[i] = input("> "); i = i + 1; }
+"""
+
+
+def parse(source: str) -> list:
+    return Parser(FastLexer(source).scan_tokens()).parse()
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache = ParseCache(os.path.join(self.directory, "cache"))
+        self.path = os.path.join(self.directory, "program.txt")
+
+    def test_encoding_round_trip(self):
+        statements = parse(SOURCE)
+        self.assertEqual(encode(decode(encode(statements))), encode(statements))
+
+    def test_hit_after_store(self):
+        self.assertIsNone(self.cache.load(self.path, SOURCE))
+        self.cache.store(self.path, SOURCE, parse(SOURCE))
+        statements = self.cache.load(self.path, SOURCE)
+        self.assertEqual(encode(statements), encode(parse(SOURCE)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_changed_source_misses(self):
+        self.cache.store(self.path, SOURCE, parse(SOURCE))
+        self.assertIsNone(self.cache.load(self.path, SOURCE + "print 1;"))
+
+    def test_changed_front_end_misses(self):
+        self.cache.store(self.path, SOURCE, parse(SOURCE))
+        version = Cache.interpreter_version()
+        Cache._version = b"another front end"
+        try:
+            self.assertIsNone(self.cache.load(self.path, SOURCE))
+        finally:
+            Cache._version = version
+
+    def test_corrupt_entry_misses(self):
+        self.cache.store(self.path, SOURCE, parse(SOURCE))
+        entry = self.cache.path_for(self.path)
+        with open(entry, "rb") as file:
+            data = file.read()
+        with open(entry, "wb") as file:
+            file.write(data[:len(data) // 2])
+        self.assertIsNone(self.cache.load(self.path, SOURCE))
+
+    def test_same_name_in_other_folder(self):
+        other_path = os.path.join(self.directory, "other", "program.txt")
+        self.assertNotEqual(self.cache.path_for(other_path), self.cache.path_for(self.path))
+        self.cache.store(self.path, SOURCE, parse(SOURCE))
+        self.cache.store(other_path, "print 1;", parse("print 1;"))
+        self.assertIsNotNone(self.cache.load(self.path, SOURCE))
+
+    def test_clear(self):
+        self.cache.store(self.path, SOURCE, parse(SOURCE))
+        self.cache.store(self.path + "2", SOURCE, parse(SOURCE))
+        self.assertEqual(self.cache.clear(), 2)
+        self.assertIsNone(self.cache.load(self.path, SOURCE))
+
+    def test_default_directory(self):
+        with unittest.mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self.directory}):
+            self.assertEqual(ParseCache().cache_dir, os.path.join(self.directory, "mipi"))
+
+    def test_programs_with_parsing_errors_not_stored(self):
+        with open(self.path, "w") as file:
+            file.write("print 1;\nvar = 2;\n")
+        for _ in range(2):
+            with contextlib.redirect_stdout(io.StringIO()) as printed:
+                main.run_file(self.path, cache=self.cache)
+            self.assertIn("Parsing error:", printed.getvalue())
+        self.assertEqual(self.cache.hits, 0)
+        self.assertFalse(os.path.exists(self.cache.path_for(self.path)))
+
+    def test_cached_program_runs_the_same(self):
+        with open(self.path, "w") as file:
+            file.write("fun f(n) { if (n < 2) return n; return f(n - 1) + f(n - 2); }\nprint f(10);\n")
+        outputs = []
+        for _ in range(2):
+            with contextlib.redirect_stdout(io.StringIO()) as printed:
+                main.run_file(self.path, cache=self.cache)
+            outputs.append(printed.getvalue())
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(outputs[1], outputs[0])
+        self.assertIn("55\n", outputs[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Nodes
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+from Compiler import Compiler, CompiledInterpreter
+
+
+def run(source: str, engine=Interpreter) -> str:
+    """What a program prints, errors included, on the given engine."""
+    output = io.StringIO()
+    interpreter = engine(output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+# Between them, these programs use every kind of node.
+PROGRAMS = [
+    'print 1 + 2 * 3 - 4 / 8; print -(2 + 3); print !true; print "a" + "b"; print 7 == 7.0; print 1 != 2;',
+    "print 3 < 4; print 3 <= 3; print 5 > 6; print 5 >= 6; print nil; print true and false or true;",
+    "var a = 1; { var b = a + 1; a = b * 10; } print a;",
+    "var i = 0; while (i < 3) { if (i == 1) print \"one\"; else print i; i = i + 1; }",
+    "fun add(x, y) { return x + y; } print add(2, 3);",
+    "fun counter() { var n = 0; fun next() { n = n + 1; return n; } return next; }\n"
+    "var c = counter(); c(); print c();",
+    "var l = [1, 2, [3, 4]]; l[0] = 9; print l; print l[2][1]; print len(l);",
+    "fun fact(n) { if (n <= 1) return 1; return n * fact(n - 1); } print fact(10);",
+]
+
+# Each stops with a runtime error, whose message must be the tree-walker's.
+FAILING_PROGRAMS = [
+    'print 1 - "a";',
+    "print -\"a\";",
+    "print 1 / 0;",
+    "var l = [1]; print l[5];",
+    "var x = 3; x();",
+    "fun f(a) { return a; } f(1, 2);",
+    'print "a" < "b";',
+]
+
+
+class CompilerTest(unittest.TestCase):
+    def test_every_node_type_has_a_compiler(self):
+        compiler = Compiler(Interpreter())
+        for name in dir(Nodes):
+            node_type = getattr(Nodes, name)
+            if isinstance(node_type, type) and node_type not in (Nodes.Stmt, Nodes.Expr):
+                with self.subTest(node=name):
+                    if issubclass(node_type, Nodes.Stmt):
+                        self.assertIn(node_type, compiler.stmt_compilers)
+                    elif issubclass(node_type, Nodes.Expr):
+                        self.assertIn(node_type, compiler.expr_compilers)
+
+    def test_programs_match_tree_walker(self):
+        for source in PROGRAMS:
+            with self.subTest(source=source):
+                expected = run(source)
+                self.assertNotIn("error", expected)
+                self.assertEqual(run(source, CompiledInterpreter), expected)
+
+    def test_runtime_errors_match_tree_walker(self):
+        for source in FAILING_PROGRAMS:
+            with self.subTest(source=source):
+                expected = run(source)
+                self.assertIn("Runtime error:", expected)
+                self.assertEqual(run(source, CompiledInterpreter), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Programs are run through main.py in a separate process, so each engine starts from a fresh
+# interpreter and its output is exactly what a user sees.
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = ("tree", "closure", "vm")
+
+
+def run_programs(source: str) -> dict:
+    """What main.py prints for a program (header, output, errors and footer), by engine."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.txt")
+        with open(path, "w") as file:
+            file.write(source)
+        return {engine: subprocess.run([sys.executable, os.path.join(REPO_DIR, "main.py"), "--no-cache",
+                                        f"--engine={engine}", path], capture_output=True, text=True).stdout
+                for engine in ENGINES}
+
+
+class EngineAgreementTest(unittest.TestCase):
+    """Programs whose output once differed between the engines."""
+
+    def check_engines(self, source: str, expected_output: str):
+        outputs = run_programs(source)
+        self.assertIn(expected_output, outputs["tree"])
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(outputs[engine], outputs["tree"])
+
+    def test_assignment_to_enclosing_frame_keeps_current_frame(self):
+        # The vm used to switch to the enclosing frame's slots after 'a = 2;', so 'print b;' read a.
+        source = ("fun f() { var a = 1; var i = 0; while (i < 2) { var b = 10; a = 2; print b; i = i + 1; } print a; }\n"
+                  "f();\n")
+        self.check_engines(source, "10\n10\n2\n")
+
+    def test_local_function_reads_name_declared_after_it(self):
+        # Until the block's own 'x' is declared, show() reads the global one, as a lookup by name did.
+        source = 'var x = "global"; { fun show() { print x; } show(); var x = "local"; show(); }\n'
+        self.check_engines(source, "global\nlocal\n")
+
+    def test_local_function_assigns_name_declared_after_it(self):
+        source = ('var y = "global";\n'
+                  'fun f() { fun set(v) { y = v; } set("first"); var y = "local"; set("second"); print y; }\n'
+                  'f();\n'
+                  'print y;\n')
+        self.check_engines(source, "second\nfirst\n")
+
+    def test_nested_blocks_reusing_frames(self):
+        source = ("var i = 0;\n"
+                  "while (i < 2) {\n"
+                  "  var a = i; var j = 0;\n"
+                  "  while (j < 2) { var b = a * 10 + j; { var c = b + 100; print c; } j = j + 1; }\n"
+                  "  print a; i = i + 1;\n"
+                  "}\n")
+        self.check_engines(source, "100\n101\n0\n110\n111\n1\n")
+
+    def test_recursion_inside_block_reusing_frame(self):
+        # Each call has its own frame for the loop body, so 'here' survives the recursive call.
+        source = ("fun count(n) {\n"
+                  "  var i = 0; var total = 0;\n"
+                  "  while (i < 2) {\n"
+                  "    var here = n * 10 + i;\n"
+                  "    if (n > 0) total = total + count(n - 1);\n"
+                  "    print here; total = total + here; i = i + 1;\n"
+                  "  }\n"
+                  "  return total;\n"
+                  "}\n"
+                  "print count(2);\n")
+        self.check_engines(source, "0\n1\n10\n0\n1\n11\n20\n0\n1\n10\n0\n1\n11\n21\n87\n")
+
+    def test_loop_inside_function(self):
+        source = ("fun squares(n) { var result = []; var i = 0;\n"
+                  "  while (i < n) { var square = i * i; list_append(result, square); i = i + 1; }\n"
+                  "  return result; }\n"
+                  "fun find(items, wanted) { var i = 0;\n"
+                  "  while (i < len(items)) { var item = items[i]; if (item == wanted) return i; i = i + 1; }\n"
+                  "  return -1; }\n"
+                  "print squares(3); print squares(4); print find([5, 6, 7], 7); print find([5, 6, 7], 9);\n")
+        self.check_engines(source, "[0, 1, 4]\n[0, 1, 4, 9]\n2\n-1\n")
+
+    def test_call_site_checks_new_callee_arity(self):
+        source = ("fun one(a) { return a; }\n"
+                  "fun two(a, b) { return a + b; }\n"
+                  "var f = one; var i = 0;\n"
+                  "while (i < 3) { if (i == 2) f = two; print f(i); i = i + 1; }\n")
+        self.check_engines(source, "0\n1\nRuntime error: Expected 2 arguments but got 1 on line 4.\n")
+
+    def test_call_site_checks_new_callee_type(self):
+        source = ("fun one(a) { return a; }\n"
+                  "var f = one; var i = 0;\n"
+                  "while (i < 3) { if (i == 2) f = \"one\"; print f(i); i = i + 1; }\n")
+        self.check_engines(source, "0\n1\nRuntime error: Not a callable type on line 3.\n")
+
+    def test_tail_call_site_checks_new_callee(self):
+        source = ("fun one(a) { return a; }\n"
+                  "fun two(a, b) { return a + b; }\n"
+                  "fun apply(h) { return h(5); }\n"
+                  "print apply(one); print apply(two);\n")
+        self.check_engines(source, "5\nRuntime error: Expected 2 arguments but got 1 on line 3.\n")
+
+    def test_reassigned_list_builtin_name(self):
+        # Calls naming list_append skip the generic call path only while it holds the built-in.
+        source = ('fun mine(a, b) { print "mine " + b; return 0; }\n'
+                  "list_append = mine; var l = []; list_append(l, 2); print l;\n"
+                  "list_append = 5; list_append(l, 3);\n")
+        self.check_engines(source, "mine 2\n[]\nRuntime error: Not a callable type on line 3.\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Incremental import IncrementalParser
+from Cache import encode
+
+
+PROGRAM = """fun area(w, h) {
+  var a = w * h;
+  return a;
+}
+var x = 1;
+if (x > 0) print "pos";
+print area(2, 3);
+fun twice(n) {
+  return n * 2;
+}
+print twice(x);
+"""
+
+# Edits applied one after the other, each as (text to replace, its replacement), first occurrence.
+EDITS = [
+    ("w * h;", "w * h + 1;"),  # Inside a function body
+    ('print "pos";', 'print "pos"; else print "neg";'),  # An 'else' for the if statement before the edit
+    ("var x = 1;", "\n\nvar x = 1;"),  # New lines: everything after moves down
+    ("\n\nvar x = 1;", "var x = 1;"),  # ... and back up
+    ("{\n  return n * 2;\n}", "{ return n * 2; }"),  # Newlines deleted inside a declaration
+    ("print area(2, 3);", "{\nprint area(2, 3);"),  # An unclosed '{': a parsing error
+    ("print twice(x);", "print twice(x);\n}"),  # Closed again
+    ("var a", "var b = 0;\n  var a"),  # Inside a function body, after a version with errors
+]
+
+
+class IncrementalParserTest(unittest.TestCase):
+    def test_edits_match_full_parse(self):
+        # Each edit goes through IncrementalParser.update(); the statements, with their line
+        # numbers, must be what parse_all() makes of the same source.
+        parser = IncrementalParser()
+        with contextlib.redirect_stdout(io.StringIO()):  # Parsing errors are expected
+            parser.parse_all(PROGRAM)
+            for old, new in EDITS:
+                with self.subTest(old=old, new=new):
+                    source = parser.source
+                    start = source.index(old)
+                    statements = parser.update(source[:start] + new + source[start + len(old):],
+                                               start, start + len(old))
+                    expected = IncrementalParser().parse_all(parser.source)
+                    self.assertEqual(encode(statements), encode(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
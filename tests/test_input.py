@@ -0,0 +1,83 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from Input import InputFeed
+from Output import OutputWriter
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from main import ENGINES
+
+PROGRAM = 'var a = input("a? "); var b = input("b? "); var c = input(); print a; print b; print c;'
+
+
+def run(source: str, engine: str, input_feed: InputFeed) -> str:
+    output = io.StringIO()
+    interpreter = ENGINES[engine](output, input_feed)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+class InputFeedTest(unittest.TestCase):
+    def test_lines(self):
+        feed = InputFeed.from_text("one\r\ntwo\n\nfour")
+        output = OutputWriter(io.StringIO())
+        self.assertEqual([feed.read_line("", output) for _ in range(4)], ["one", "two", "", "four"])
+        self.assertEqual(feed.position, 4)
+
+    def test_end_policies(self):
+        output = OutputWriter(io.StringIO())
+        self.assertIsNone(InputFeed([], "nil").read_line("", output))
+        self.assertEqual(InputFeed([], "empty").read_line("", output), "")
+        with self.assertRaises(EOFError):
+            InputFeed([], "error").read_line("", output)
+        with self.assertRaises(ValueError):
+            InputFeed([], "wait")
+
+    def test_prompts_written_to_output(self):
+        stream = io.StringIO()
+        output = OutputWriter(stream)
+        InputFeed(["x"]).read_line("name? ", output)
+        output.flush()
+        self.assertEqual(stream.getvalue(), "name? ")
+
+    def test_programs(self):
+        cases = [
+            ("error", "a? b? 1\n2\n3\n", "1\n2\n3\n"),
+            ("error", "a? b? Runtime error: No more input for input() to read.\n", "1\n2"),
+            ("nil", "a? b? 1\nnil\nnil\n", "1"),
+            ("empty", "a? b? 1\n\n\n", "1"),
+        ]
+        for policy, expected, text in cases:
+            for engine in ENGINES:
+                with self.subTest(policy=policy, text=text, engine=engine):
+                    self.assertEqual(run(PROGRAM, engine, InputFeed.from_text(text, policy)), expected)
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "program.txt")
+            with open(path, "w") as file:
+                file.write(PROGRAM)
+            input_path = os.path.join(directory, "input.txt")
+            with open(input_path, "w") as file:
+                file.write("from file\n")
+            main = os.path.join(REPO_DIR, "main.py")
+            from_stdin = subprocess.run([sys.executable, main, "--no-cache", "--input=-", "--input-end=empty", path],
+                                        input="x\ny\n", capture_output=True, text=True).stdout
+            from_file = subprocess.run([sys.executable, main, "--no-cache", f"--input={input_path}",
+                                        "--input-end=nil", path], capture_output=True, text=True).stdout
+        self.assertIn("a? b? x\ny\n\n", from_stdin)
+        self.assertIn("a? b? from file\nnil\nnil\n", from_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
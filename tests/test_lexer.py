@@ -0,0 +1,84 @@
+import glob
+import os
+import sys
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from Lexer import Lexer, FastLexer
+
+# Inputs around the edges of the master regex: the fast lexer hands some of them to scan_token().
+SOURCES = [
+    "",
+    "var x = 1; print x;",
+    'print "tab\\there\\nnew \\"quoted\\" back\\\\slash \\r \\0";',
+    'print "two\nlines"; print x;',
+    "a==b!=c<=d>=e<f>g=!h;",
+    "print 1/2; // comment\nprint 3; // at the end",
+    "print 12.5 + 3 + 1.25;",
+    "print 9007199254740993; print 9007199254740992;",
+    "var café = 1; print café;",
+    "var x٣ = 2; print ٣;",
+    "var _under_score1 = list_append; list_remove_at(l, 0);",
+    "print 1;\r\nprint 2;\r\n",
+    "\x0b\x0c\x1c x   y   z",
+]
+
+# Each must fail with the same message.
+BAD_SOURCES = [
+    'print "unterminated;',
+    'print "bad \\q escape";',
+    "print 1 @ 2;",
+    "print 3. + 1;",
+    "var x = 1;\nvar y = 2 # 3;",
+    'print "ok";\nprint "never\nclosed;',
+]
+
+
+def tokens(lexer_type, source: str) -> list:
+    return [(token.type, token.lexeme, token.literal, token.line) for token in lexer_type(source).scan_tokens()]
+
+
+def error(lexer_type, source: str) -> str:
+    try:
+        lexer_type(source).scan_tokens()
+    except RuntimeError as e:
+        return str(e)
+    return None
+
+
+class FastLexerTest(unittest.TestCase):
+    def test_same_tokens_as_lexer(self):
+        for source in SOURCES:
+            with self.subTest(source=source):
+                self.assertEqual(tokens(FastLexer, source), tokens(Lexer, source))
+
+    def test_same_tokens_for_programs_in_repo(self):
+        paths = [path for folder in ("Examples", "Errors", "Stages_Pass", "bench/workloads")
+                 for path in glob.glob(os.path.join(REPO_DIR, folder, "*")) if os.path.isfile(path)]
+        self.assertTrue(paths)
+        for path in paths:
+            with open(path) as file:
+                source = file.read()
+            with self.subTest(path=os.path.relpath(path, REPO_DIR)):
+                self.assertEqual(error(FastLexer, source), error(Lexer, source))
+                if error(Lexer, source) is None:
+                    self.assertEqual(tokens(FastLexer, source), tokens(Lexer, source))
+
+    def test_same_errors_as_lexer(self):
+        for source in BAD_SOURCES:
+            with self.subTest(source=source):
+                expected = error(Lexer, source)
+                self.assertIsNotNone(expected)
+                self.assertEqual(error(FastLexer, source), expected)
+
+    def test_long_string_with_escapes(self):
+        # Escapes are decoded in one pass, not by repeated concatenation.
+        source = 'print "' + "ab\\n" * 100000 + '";'
+        token = FastLexer(source).scan_tokens()[1]
+        self.assertEqual(token.literal, "ab\n" * 100000)
+
+
+if __name__ == "__main__":
+    unittest.main()
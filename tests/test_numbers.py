@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Token import MAX_EXACT_INT
+from Lexer import FastLexer, Lexer
+from Parser import Parser
+from Optimizer import Optimizer
+from Resolver import Resolver
+from Interpreter import Interpreter
+from main import ENGINES
+
+# Integers are exact up to 2**53 and become floats past it, so every result is the one
+# that all-float arithmetic (the representation before integers were native) gives.
+EXPRESSIONS = [
+    "9007199254740991 + 1",
+    "9007199254740992 + 1",
+    "9007199254740992 + 2",
+    "9007199254740993",
+    "-9007199254740992 - 3",
+    "94906267 * 94906267",
+    "3 * 3000000000000000 + 1",
+    "9007199254740992 + 1 - 1",
+    "7 / 2",
+    "4 / 2 + 9007199254740991",
+    "-(9007199254740992 + 1) * 2",
+]
+
+
+def run(source: str, engine: str, optimize: bool = False) -> str:
+    output = io.StringIO()
+    interpreter = ENGINES[engine](output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if optimize:
+        statements = Optimizer().optimize(statements)
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+def float_result(expression: str) -> str:
+    """What the expression prints when every number is a float."""
+    tokens = FastLexer(expression).scan_tokens()
+    python_expression = " ".join(f"float({token.lexeme})" if token.literal is not None else token.lexeme
+                                 for token in tokens[:-1])
+    return Interpreter().stringify(eval(python_expression))
+
+
+def value_of(expression: str) -> object:
+    interpreter = Interpreter()
+    statements = Parser(FastLexer(f"{expression};").scan_tokens()).parse()
+    return interpreter.evaluate(statements[0].expression)
+
+
+class NumberTest(unittest.TestCase):
+    def test_literals(self):
+        for lexer_type in (Lexer, FastLexer):
+            with self.subTest(lexer=lexer_type.__name__):
+                below, at, above, fraction = (token.literal for token in lexer_type(
+                    "9007199254740991 9007199254740992 9007199254740993 2.0").scan_tokens()[:-1])
+                self.assertIs(type(below), int)
+                self.assertIs(type(at), int)
+                self.assertEqual((type(above), above), (float, float(MAX_EXACT_INT)))
+                self.assertIs(type(fraction), float)
+
+    def test_types_of_results(self):
+        self.assertIs(type(value_of("9007199254740991 + 1")), int)
+        self.assertIs(type(value_of("9007199254740992 + 1")), float)
+        self.assertIs(type(value_of("-9007199254740992 - 1")), float)
+        self.assertIs(type(value_of("4 / 2")), float)
+        self.assertIs(type(value_of("2.5 * 2")), float)
+
+    def test_results_match_float_arithmetic(self):
+        for expression in EXPRESSIONS:
+            expected = float_result(expression) + "\n"
+            for engine in ENGINES:
+                for optimize in (False, True):
+                    with self.subTest(expression=expression, engine=engine, optimize=optimize):
+                        self.assertEqual(run(f"print {expression};", engine, optimize), expected)
+
+    def test_accumulating_across_the_boundary(self):
+        source = ("var x = 9007199254740990; var i = 0;\n"
+                  "while (i < 4) { x = x + 1; print x; i = i + 1; }\n"
+                  "print x == 9007199254740992.0; print x - 9007199254740990;\n")
+        expected = "9007199254740991\n9007199254740992\n9007199254740992\n9007199254740992\ntrue\n2\n"
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), expected)
+
+    def test_integers_and_floats_interchangeable(self):
+        source = "var l = [10, 20, 30]; print l[4 / 2]; print 2 == 2.0; print 1 < 1.5; print [1.0] + [2];\n"
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), "30\ntrue\ntrue\n[1, 2]\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
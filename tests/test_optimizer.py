@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Nodes import Binary, Block, Grouping, Literal, PrintStmt, Variable, While
+from Lexer import FastLexer
+from Parser import Parser
+from Optimizer import Optimizer
+from Resolver import Resolver
+from Interpreter import Interpreter
+
+
+def parse(source: str) -> list:
+    return Parser(FastLexer(source).scan_tokens()).parse()
+
+
+def optimize(source: str) -> list:
+    return Optimizer().optimize(parse(source))
+
+
+def run(statements: list) -> str:
+    output = io.StringIO()
+    interpreter = Interpreter(output)
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+class FoldingTest(unittest.TestCase):
+    def folded(self, expression: str) -> object:
+        statement, = optimize(f"print {expression};")
+        self.assertIsInstance(statement.expression, Literal)
+        return statement.expression.value
+
+    def test_arithmetic(self):
+        self.assertEqual(self.folded("1 + 2 * 3 - 4"), 3)
+        self.assertEqual(self.folded("-(2 + 3)"), -5)
+        self.assertEqual(self.folded("7 / 2"), 3.5)
+
+    def test_comparison_and_logic(self):
+        self.assertIs(self.folded("1 < 2"), True)
+        self.assertIs(self.folded("!(1 == 1)"), False)
+
+    def test_strings(self):
+        self.assertEqual(self.folded('"a" + "b" + 1'), "ab1")
+
+    def test_runtime_errors_left_in_place(self):
+        for expression in ("1 / 0", '-"a"', '1 - "a"'):
+            with self.subTest(expression=expression):
+                statement, = optimize(f"print {expression};")
+                self.assertNotIsInstance(statement.expression, Literal)
+                self.assertIn("Runtime error:", run([statement]))
+
+    def test_nested_groupings_flattened(self):
+        statement, = optimize("var x = 1; print ((((x))));")[1:]
+        self.assertIsInstance(statement.expression, Grouping)
+        self.assertIsInstance(statement.expression.expression, Variable)
+
+    def test_concatenation_reassociated(self):
+        statement, = optimize('var x = 1; print x + "a" + 1;')[1:]
+        self.assertIsInstance(statement.expression, Binary)
+        self.assertEqual(statement.expression.right.value, "a1")
+
+    def test_constant_list_literal(self):
+        statement, = optimize("print [1, 2 + 3, \"x\"];")
+        self.assertEqual(statement.expression.constant, (1, 5, "x"))
+
+
+class PruningTest(unittest.TestCase):
+    def test_constant_if(self):
+        self.assertEqual(optimize("if (false) print 1;"), [])
+        statement, = optimize("if (1 < 2) print 1; else print 2;")
+        self.assertIsInstance(statement, PrintStmt)
+        self.assertEqual(statement.expression.value, 1)
+        statement, = optimize("if (nil) print 1; else print 2;")
+        self.assertEqual(statement.expression.value, 2)
+
+    def test_constant_while(self):
+        self.assertEqual(optimize("while (false) print 1;"), [])
+
+    def test_pruned_body_stays_a_statement(self):
+        statement, = optimize("var i = 0; while (i < 1) if (false) print 1;")[1:]
+        self.assertIsInstance(statement, While)
+        self.assertIsInstance(statement.body, Block)
+        self.assertEqual(statement.body.statements, [])
+
+    def test_output_unchanged(self):
+        source = ('var x = 2; fun f(n) { if (true) return n * (3 + 4); return 0; }\n'
+                  'print f(x) + 1; print x + "a" + 1 + 2; if (false) print "no"; else print "yes";\n'
+                  'var i = 0; while (i < 2 * 2) { print [i, 1 + 1]; i = i + 1; }\n')
+        self.assertEqual(run(optimize(source)), run(parse(source)))
+
+
+if __name__ == "__main__":
+    unittest.main()
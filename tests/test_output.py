@@ -0,0 +1,105 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Output import OutputWriter
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from main import ENGINES
+
+
+class RecordingStream:
+    """A stream that remembers each write() and flush() call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def write(self, text: str):
+        self.calls.append(("write", text))
+
+    def flush(self):
+        self.calls.append(("flush",))
+
+    def text(self) -> str:
+        return "".join(call[1] for call in self.calls if call[0] == "write")
+
+
+def run(source: str, engine: str, output: OutputWriter):
+    interpreter = ENGINES[engine](output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+
+
+class OutputWriterTest(unittest.TestCase):
+    def test_buffered_until_full(self):
+        stream = RecordingStream()
+        writer = OutputWriter(stream, buffer_size=10)
+        writer.write_line("abc")
+        writer.write("de")
+        self.assertEqual(stream.calls, [])
+        writer.write_line("fghij")  # 3 + 1 + 2 + 5 + 1 characters pending
+        self.assertEqual(stream.calls, [("write", "abc\ndefghij\n"), ("flush",)])
+
+    def test_flush(self):
+        stream = RecordingStream()
+        writer = OutputWriter(stream)
+        writer.write_line("a")
+        writer.write_line("b")
+        writer.flush()
+        writer.flush()
+        self.assertEqual(stream.calls, [("write", "a\nb\n"), ("flush",), ("flush",)])
+
+    def test_unbuffered(self):
+        stream = RecordingStream()
+        writer = OutputWriter(stream, buffer_size=0)
+        writer.write_line("a")
+        self.assertEqual(stream.calls, [("write", "a\n"), ("flush",)])
+        writer.write("prompt> ")
+        self.assertEqual(stream.text(), "a\nprompt> ")
+
+    def test_stream_without_flush(self):
+        class WriteOnly:
+            text = ""
+
+            def write(self, text: str):
+                self.text += text
+
+        stream = WriteOnly()
+        OutputWriter(stream, buffer_size=0).write_line("x")
+        self.assertEqual(stream.text, "x\n")
+
+    def test_stdout_looked_up_at_flush(self):
+        writer = OutputWriter()
+        writer.write_line("redirected")
+        with contextlib.redirect_stdout(io.StringIO()) as captured:
+            writer.flush()
+        self.assertEqual(captured.getvalue(), "redirected\n")
+
+    def test_run_ends_with_everything_written(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                stream = RecordingStream()
+                run("print 1; print 2; print 1 / 0; print 3;", engine, OutputWriter(stream))
+                self.assertEqual(stream.text(), "1\n2\nRuntime error: Division by zero on line 1.\n")
+                self.assertEqual(stream.calls[-1], ("flush",))
+
+    def test_output_written_before_terminal_input(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                stream = RecordingStream()
+                seen = []
+                with mock.patch("builtins.input", lambda prompt: seen.append(stream.text()) or "typed"):
+                    run('print "before"; var x = input("> "); print x;', engine, OutputWriter(stream))
+                self.assertEqual(seen, ["before\n"])
+                self.assertEqual(stream.text(), "before\ntyped\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Nodes import Assign, Binary, Call, Grouping, Index, InputExpr, ListLiteral, Literal, Unary, Variable
+from Lexer import FastLexer
+from Parser import Parser
+
+# Expressions and their trees, written as s-expressions.
+PRECEDENCE = [
+    ("1 + 2 * 3", "(+ 1 (* 2 3))"),
+    ("1 - 2 - 3", "(- (- 1 2) 3)"),
+    ("1 / 2 * 3", "(* (/ 1 2) 3)"),
+    ("(1 + 2) * 3", "(* (group (+ 1 2)) 3)"),
+    ("a or b and c or d", "(or (or a (and b c)) d)"),
+    ("a == b < c + d", "(== a (< b (+ c d)))"),
+    ("a != b == c", "(== (!= a b) c)"),
+    ("a >= b > c <= d", "(<= (> (>= a b) c) d)"),
+    ("-a * -b", "(* (- a) (- b))"),
+    ("!!a == !b", "(== (! (! a)) (! b))"),
+    ("-f(1)[2]", "(- (index (call f 1) 2))"),
+    ("f(a, b + 1)(c)", "(call (call f a (+ b 1)) c)"),
+    ("a = b = c + 1", "(= a (= b (+ c 1)))"),
+    ("l[i] = x or y", "(= (index l i) (or x y))"),
+    ('[1, "a" + b, [nil]]', "[1 (+ 'a' b) [None]]"),
+    ('input("? ") + 1', "(+ (input '? ') 1)"),
+    ("list_append(l, -1)", "(call list_append l (- 1))"),
+]
+
+# Malformed statements and the error the recursive-descent parser reported for them.
+ERRORS = [
+    ("print (1 + 2;", "[line 1] Error at ';': Expect ')' after expression."),
+    ("print 1 +;", "[line 1] Error at ';': Expect expression."),
+    ("1 = 2;", "[line 1] Error at '=': Invalid assignment target."),
+    ("a + b = 3;", "[line 1] Error at '=': Invalid assignment target."),
+    ("print [1, 2;", "[line 1] Error at ';': Expect ']' after list literal."),
+    ("print a[1;", "[line 1] Error at ';': Expect ']' after index."),
+    ("f(1, 2;", "[line 1] Error at ';': Expect ')' after arguments."),
+    ("var = 1;", "[line 1] Error at '=': Expect variable name."),
+    ("var x = 1", "[line 1] Error at end: Expect ';' after variable declaration."),
+    ("print;", "[line 1] Error at ';': Expect expression."),
+    ("if (true print 1;", "[line 1] Error at 'print': Expect ')' after if condition."),
+    ("while true) print 1;", "[line 1] Error at 'true': Expect '(' after 'while'."),
+    ("fun (a) {}", "[line 1] Error at '(': Expect function name."),
+    ("fun f(a, ) {}", "[line 1] Error at ')': Expect parameter name."),
+    ("{ print 1;", "[line 1] Error at end: Expect '}' after block."),
+    ("print input(1, 2);", "[line 1] Error at ',': Expect ')' after input prompt."),
+    ("print input 1;", "[line 1] Error at '1': Expect '(' after 'input'."),
+    ("print 1 print 2;", "[line 1] Error at 'print': Expect ';' after value."),
+    ("x = = 2;", "[line 1] Error at '=': Expect expression."),
+    ("print - - ;", "[line 1] Error at ';': Expect expression."),
+    ("print 1;\nprint )", "[line 2] Error at ')': Expect expression."),
+]
+
+
+def tree(expr) -> str:
+    if isinstance(expr, Binary):
+        return f"({expr.operator.lexeme} {tree(expr.left)} {tree(expr.right)})"
+    if isinstance(expr, Unary):
+        return f"({expr.operator.lexeme} {tree(expr.right)})"
+    if isinstance(expr, Grouping):
+        return f"(group {tree(expr.expression)})"
+    if isinstance(expr, Literal):
+        return repr(expr.value)
+    if isinstance(expr, Variable):
+        return expr.name.lexeme
+    if isinstance(expr, Assign):
+        return f"(= {tree(expr.target_expr)} {tree(expr.value)})"
+    if isinstance(expr, Call):
+        return f"(call {' '.join(tree(part) for part in [expr.callee, *expr.arguments])})"
+    if isinstance(expr, Index):
+        return f"(index {tree(expr.obj)} {tree(expr.index_expr)})"
+    if isinstance(expr, ListLiteral):
+        return f"[{' '.join(tree(element) for element in expr.elements)}]"
+    if isinstance(expr, InputExpr):
+        return f"(input {tree(expr.prompt)})"
+    raise TypeError(type(expr).__name__)
+
+
+def parse(source: str) -> tuple:
+    """(statements, what the parser reported)."""
+    parser = Parser(FastLexer(source).scan_tokens())
+    with contextlib.redirect_stdout(io.StringIO()) as printed:
+        statements = parser.parse()
+    return statements, printed.getvalue()
+
+
+class ParserTest(unittest.TestCase):
+    def test_precedence_and_associativity(self):
+        for source, expected in PRECEDENCE:
+            with self.subTest(source=source):
+                statements, errors = parse(source + ";")
+                self.assertEqual(errors, "")
+                self.assertEqual(tree(statements[0].expression), expected)
+
+    def test_error_messages(self):
+        for source, message in ERRORS:
+            with self.subTest(source=source):
+                _, errors = parse(source)
+                self.assertEqual(errors.splitlines()[0], f"Parsing error: {message}")
+
+    def test_recovers_after_error(self):
+        statements, errors = parse("print 1 +;\nvar x = 2;\nprint x;")
+        self.assertEqual(errors.count("Parsing error:"), 1)
+        self.assertEqual(len(statements), 2)
+
+    def test_long_expressions(self):
+        # Neither long operator chains nor long assignment chains recurse once per operand.
+        count = 20000
+        statements, errors = parse("print " + " + ".join(["1"] * count) + ";")
+        self.assertEqual(errors, "")
+        statements, errors = parse("a" + " = a" * count + " = 1;")
+        self.assertEqual(errors, "")
+        self.assertIsInstance(statements[0].expression, Assign)
+        statements, errors = parse("print " + "-" * count + "1;")
+        self.assertEqual(errors, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
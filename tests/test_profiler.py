@@ -0,0 +1,117 @@
+import io
+import os
+import re
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Profiler
+from Profiler import Timings, ProfilingInterpreter, MAIN
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+
+SOURCE = """fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+fun loop(n, total) {
+  if (n == 0) return total;
+  return loop(n - 1, total + n);
+}
+print fib(10);
+print loop(50, 0);
+"""
+
+
+def run(source: str, engine) -> tuple:
+    """The interpreter after running the program, and what the program printed."""
+    output = io.StringIO()
+    interpreter = engine(output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return interpreter, output.getvalue()
+
+
+class FakeClock:
+    """perf_counter() returning 0, 1, 2, ... seconds."""
+
+    def __init__(self):
+        self.now = -1.0
+
+    def __call__(self) -> float:
+        self.now += 1.0
+        return self.now
+
+
+class TimingsTest(unittest.TestCase):
+    def test_nested_entries(self):
+        timings = Timings()
+        with mock.patch.object(Profiler, "perf_counter", FakeClock()):
+            timings.enter("outer")  # 0
+            timings.enter("inner")  # 1
+            timings.exit()  # 2
+            timings.exit()  # 3
+        self.assertEqual(timings.stats["inner"], [1, 1.0, 1.0])
+        self.assertEqual(timings.stats["outer"], [1, 3.0, 2.0])
+
+    def test_recursion_counted_once_in_inclusive_time(self):
+        timings = Timings()
+        with mock.patch.object(Profiler, "perf_counter", FakeClock()):
+            timings.enter("f")  # 0
+            timings.enter("f")  # 1
+            timings.exit()  # 2
+            timings.exit()  # 3
+        self.assertEqual(timings.stats["f"], [2, 3.0, 3.0])
+
+
+class ProfilingInterpreterTest(unittest.TestCase):
+    def test_output_unchanged(self):
+        self.assertEqual(run(SOURCE, ProfilingInterpreter)[1], run(SOURCE, Interpreter)[1])
+
+    def test_function_calls_counted(self):
+        interpreter, _ = run(SOURCE, ProfilingInterpreter)
+        stats = interpreter.profiler.functions.stats
+        self.assertEqual(stats[MAIN][0], 1)
+        self.assertEqual(stats["fib:1"][0], 177)
+        # Each tail call is timed as a call of its own.
+        self.assertEqual(stats["loop:5"][0], 51)
+
+    def test_line_calls_counted(self):
+        interpreter, _ = run(SOURCE, ProfilingInterpreter)
+        stats = interpreter.profiler.lines.stats
+        self.assertEqual(stats[2][0], 177 + 89)  # The if statement, and the return inside it for n < 2
+        self.assertEqual(stats[3][0], 177 - 89)
+        self.assertEqual(stats[9][0], 1)
+
+    def test_report(self):
+        interpreter, _ = run(SOURCE, ProfilingInterpreter)
+        report = interpreter.profiler.report(SOURCE.splitlines())
+        self.assertIn("--- Profile: functions (by exclusive time) ---", report)
+        self.assertRegex(report, r"\nfib:1 +177 ")
+        self.assertRegex(report, r"\n +2 +266 .*  if \(n < 2\) return n;")
+
+    def test_collapsed_stacks(self):
+        interpreter, _ = run(SOURCE, ProfilingInterpreter)
+        stacks = interpreter.profiler.collapsed
+        self.assertIn(MAIN, stacks)
+        self.assertIn(";".join([MAIN] + ["fib:1"] * 9), stacks)
+        self.assertNotIn(";".join([MAIN] + ["loop:5"] * 2), stacks)  # Tail calls do not nest
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.folded")
+            interpreter.profiler.write_collapsed(path)
+            with open(path) as file:
+                lines = file.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            self.assertRegex(line, r"^<main>(;\w+:\d+)* \d+$")
+        self.assertEqual(lines, sorted(lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
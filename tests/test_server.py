@@ -0,0 +1,133 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from Client import connect, run_remote
+
+# About a second on the tree engine, a few tenths on the faster ones.
+SLOW_PROGRAM = 'print "first"; var i = 0; while (i < 300000) { i = i + 1; } print "last";'
+
+
+class ServerTest(unittest.TestCase):
+    """Requests to a Server.py process listening on a temporary Unix socket."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls.directory.name, "mipi.sock")
+        cls.server = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "Server.py"), "--socket", cls.socket_path,
+                                       "--max-concurrency", "4", "--max-steps", "1000000"],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 30
+        while not os.path.exists(cls.socket_path):
+            if cls.server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("Server.py did not start")
+            time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+        cls.directory.cleanup()
+
+    def request(self, request) -> list:
+        """The frames the server answers with, each as (seconds since the request, frame)."""
+        line = request if isinstance(request, bytes) else json.dumps(request).encode("utf-8")
+        with connect(self.socket_path) as connection:
+            start = time.monotonic()
+            connection.sendall(line + b"\n")
+            with connection.makefile("rb") as lines:
+                return [(time.monotonic() - start, json.loads(frame)) for frame in lines]
+
+    def test_output_streamed_while_running(self):
+        frames = self.request({"source": SLOW_PROGRAM})
+        outputs = [(arrival, frame["output"]) for arrival, frame in frames if "output" in frame]
+        self.assertEqual([text for _, text in outputs], ["first\n", "last\n"])
+        first_arrival, last_arrival = outputs[0][0], outputs[1][0]
+        self.assertGreater(last_arrival - first_arrival, 0.05)
+        self.assertEqual(frames[-1][1]["status"], "ok")
+
+    def output_and_status(self, request) -> tuple:
+        frames = [frame for _, frame in self.request(request)]
+        for frame in frames[:-1]:
+            self.assertEqual(list(frame), ["output"])
+        return "".join(frame["output"] for frame in frames[:-1]), frames[-1]
+
+    def test_every_engine(self):
+        for engine in ("tree", "closure", "vm"):
+            for optimize in (False, True):
+                with self.subTest(engine=engine, optimize=optimize):
+                    output, status = self.output_and_status({"source": "fun f(n) { return n * 2; } print f(21);",
+                                                             "engine": engine, "optimize": optimize})
+                    self.assertEqual(output, "42\n")
+                    self.assertEqual(status["status"], "ok")
+                    self.assertIsInstance(status["seconds"], float)
+
+    def test_errors(self):
+        cases = [
+            ("print 1; print 1 / 0;", "1\nRuntime error: Division by zero on line 1.\n"),
+            ("print x;", "Resolution error: "),
+            ("print (1;", "Parsing error: "),
+            ("print 1 @ 2;", "An unexpected error occurred: Unexpected character '@' on line 1"),
+        ]
+        for source, expected in cases:
+            with self.subTest(source=source):
+                output, status = self.output_and_status({"source": source})
+                self.assertTrue(output.startswith(expected), output)
+                self.assertEqual(status["status"], "error")
+
+    def test_input(self):
+        request = {"source": 'print input("? "); print input("? ");', "input": "one\n", "input_end": "nil"}
+        output, status = self.output_and_status(request)
+        self.assertEqual(output, "? one\n? nil\n")
+        output, status = self.output_and_status({"source": 'print input("? ");'})
+        self.assertEqual(output, "? Runtime error: No more input for input() to read.\n")
+        self.assertEqual(status["status"], "error")
+
+    def test_limits_apply_to_every_request(self):
+        output, status = self.output_and_status({"source": "while (true) {}"})
+        self.assertEqual(output, "Runtime error: Step limit of 1000000 exceeded.\n")
+        self.assertEqual(status["status"], "error")
+
+    def test_bad_requests(self):
+        for request in (b"not json", b"[1]", json.dumps({"source": 1}).encode(),
+                        json.dumps({"source": "", "engine": "jit"}).encode(),
+                        json.dumps({"source": "", "input_end": "block"}).encode(),
+                        json.dumps({"source": "", "input": 5}).encode()):
+            with self.subTest(request=request):
+                frames = [frame for _, frame in self.request(request)]
+                self.assertEqual(len(frames), 1)
+                self.assertEqual(frames[0]["status"], "error")
+                self.assertTrue(frames[0]["message"].startswith("Bad request: "))
+
+    def test_requests_do_not_share_state(self):
+        self.output_and_status({"source": "var shared = 1;"})
+        output, _ = self.output_and_status({"source": "print shared;"})
+        self.assertIn("Resolution error: ", output)
+
+    def test_client(self):
+        received = []
+
+        class Collected:
+            def write(self, text: str):
+                received.append(text)
+
+            def flush(self):
+                pass
+
+        with connect(self.socket_path) as connection:
+            status = run_remote({"source": 'print "a"; print "b";'}, connection, Collected())
+        self.assertEqual(received, ["a\n", "b\n"])
+        self.assertEqual(status["status"], "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
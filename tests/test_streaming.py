@@ -0,0 +1,133 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import Lexer, StreamingLexer
+from Parser import Parser, StreamParser
+from Cache import encode
+import main
+
+SOURCES = [
+    b"",
+    b"var x = 1; print x;",
+    b'print "tab\\there\\nnew \\"quoted\\"";',
+    b'var x = 1; print "two\nlines"; print x; // comment',
+    b'print "crlf\r\nstring";\r\nprint 2;\r\n',
+    b"print 1;\rprint 2; // bare carriage returns\rprint 3;",
+    "var café = 1; print café; print \"naïve\";".encode("utf-8"),
+    "var x٣ = 2;\nprint x٣;".encode("utf-8"),
+]
+
+BAD_SOURCES = [
+    b'print 1;\nprint "unterminated;',
+    b'print "bad \\q escape";',
+    b"print 1;\n\nprint 1 @ 2;",
+]
+
+PROGRAM = b"""fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+var i = 0;
+while (i < 5) { print fib(i); i = i + 1; }
+var l = [1, 2]; list_append(l, "three"); print l;
+"""
+
+
+def text_mode(source: bytes) -> str:
+    """The source as main.py reads it in text mode."""
+    return io.TextIOWrapper(io.BytesIO(source), encoding="utf-8").read()
+
+
+def tokens(lexer) -> list:
+    return [(token.type, token.lexeme, token.literal, token.line) for token in lexer.scan_tokens()]
+
+
+def error(lexer) -> str:
+    try:
+        lexer.scan_tokens()
+    except RuntimeError as e:
+        return str(e)
+    return None
+
+
+class StreamingLexerTest(unittest.TestCase):
+    def test_same_tokens_as_lexer_on_text(self):
+        for source in SOURCES:
+            with self.subTest(source=source):
+                self.assertEqual(tokens(StreamingLexer(source)), tokens(Lexer(text_mode(source))))
+
+    def test_same_errors_as_lexer(self):
+        for source in BAD_SOURCES:
+            with self.subTest(source=source):
+                expected = error(Lexer(text_mode(source)))
+                self.assertIsNotNone(expected)
+                self.assertEqual(error(StreamingLexer(source)), expected)
+
+    def test_tokens_produced_on_demand(self):
+        # The error at the end is not reached until the tokens before it have been consumed.
+        token_iterator = StreamingLexer(b"print 1;\nprint @;").iter_tokens()
+        self.assertEqual(next(token_iterator).lexeme, "print")
+        self.assertEqual(next(token_iterator).literal, 1)
+
+
+class StreamParserTest(unittest.TestCase):
+    def test_same_statements_as_parser(self):
+        expected = Parser(Lexer(text_mode(PROGRAM)).scan_tokens()).parse()
+        statements = StreamParser(StreamingLexer(PROGRAM).iter_tokens()).parse()
+        self.assertEqual(encode(statements), encode(expected))
+
+    def test_statement_yielded_before_rest_is_lexed(self):
+        consumed = []
+
+        def recorded(token_iterator):
+            for token in token_iterator:
+                consumed.append(token)
+                yield token
+
+        statements = StreamParser(recorded(StreamingLexer(PROGRAM).iter_tokens())).statements()
+        next(statements)
+        all_tokens = StreamingLexer(PROGRAM).scan_tokens()
+        self.assertLess(len(consumed), len(all_tokens) // 2)
+
+    def test_parsing_errors_reported_and_skipped(self):
+        source = b"print 1;\nvar = 2;\nprint 3;"
+        parser = StreamParser(StreamingLexer(source).iter_tokens())
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            statements = parser.parse()
+        self.assertTrue(parser.had_error)
+        self.assertEqual(len(statements), 2)
+        self.assertIn("Parsing error:", printed.getvalue())
+
+
+class StreamFileTest(unittest.TestCase):
+    def run_file(self, path: str, **options) -> str:
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            main.run_file(path, **options)
+        return printed.getvalue()
+
+    def test_same_output_as_run_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for index, source in enumerate([PROGRAM, *SOURCES]):
+                path = os.path.join(directory, f"program{index}.txt")
+                with open(path, "wb") as file:
+                    file.write(source)
+                for engine in main.ENGINES:
+                    with self.subTest(source=source, engine=engine):
+                        expected = self.run_file(path, engine=engine)
+                        self.assertEqual(self.run_file(path, engine=engine, stream=True), expected)
+
+    def test_statements_run_before_later_errors(self):
+        # Unlike run_file, the statements before a lexing error have already run.
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "program.txt")
+            with open(path, "wb") as file:
+                file.write(BAD_SOURCES[2])
+            printed = self.run_file(path, stream=True)
+        self.assertIn("1\nAn unexpected error occurred: Unexpected character '@' on line 3", printed)
+
+
+if __name__ == "__main__":
+    unittest.main()
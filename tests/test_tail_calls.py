@@ -0,0 +1,71 @@
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from main import ENGINES
+
+DEPTH = 20000  # Far beyond Python's recursion limit
+
+
+def run(source: str, engine: str) -> str:
+    output = io.StringIO()
+    interpreter = ENGINES[engine](output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+class TailCallTest(unittest.TestCase):
+    def check(self, source: str, expected: str):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), expected)
+
+    def test_self_recursion(self):
+        source = f"fun count(n, total) {{ if (n == 0) return total; return count(n - 1, total + 1); }}\nprint count({DEPTH}, 0);\n"
+        self.check(source, f"{DEPTH}\n")
+
+    def test_mutual_recursion(self):
+        source = ("fun even(n) { if (n == 0) return true; return odd(n - 1); }\n"
+                  "fun odd(n) { if (n == 0) return false; return even(n - 1); }\n"
+                  f"print even({DEPTH}); print odd({DEPTH + 1});\n")
+        self.check(source, "true\ntrue\n")
+
+    def test_tail_call_inside_loop_and_block(self):
+        source = ("fun down(n) { while (true) { var next = n - 1; if (next < 0) return \"done\"; { return down(next); } } }\n"
+                  f"print down({DEPTH});\n")
+        self.check(source, "done\n")
+
+    def test_tail_call_to_closure(self):
+        source = ("fun make(limit) { fun step(n) { if (n == limit) return n; return step(n + 1); } return step; }\n"
+                  f"var step = make({DEPTH}); print step(0);\n")
+        self.check(source, f"{DEPTH}\n")
+
+    def test_tail_call_to_builtin(self):
+        source = "fun size(l) { return len(l); } fun add(l) { return list_append(l, 1); }\nvar l = [1, 2]; add(l); print size(l);\n"
+        self.check(source, "3\n")
+
+    def test_call_in_expression_is_not_a_tail_call(self):
+        source = "fun sum(n) { if (n == 0) return 0; return n + sum(n - 1); }\nprint sum(100);\n"
+        self.check(source, "5050\n")
+
+    def test_arguments_evaluated_before_frame_is_left(self):
+        # The caller's locals are read for the arguments before its frame goes away.
+        source = ("fun f(n, acc) { var doubled = acc * 2; if (n == 0) return acc; return f(n - 1, doubled + n); }\n"
+                  "print f(3, 1);\n")
+        self.check(source, "25\n")
+
+    def test_errors_in_tail_called_function(self):
+        source = "fun bad(n) { if (n == 0) return 1 / 0; return bad(n - 1); }\nprint bad(1000);\n"
+        self.check(source, "Runtime error: Division by zero on line 1.\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
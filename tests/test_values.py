@@ -0,0 +1,186 @@
+import io
+import os
+import sys
+import unittest
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Values import ListValue, PrefixView, SharedList, StringBuilder, extend_string, pack
+from Lexer import FastLexer
+from Parser import Parser
+from Resolver import Resolver
+from main import ENGINES
+
+
+def run(source: str, engine: str) -> str:
+    output = io.StringIO()
+    interpreter = ENGINES[engine](output)
+    statements = Parser(FastLexer(source).scan_tokens()).parse()
+    if Resolver(interpreter).resolve(statements):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+
+def storage(list_value: ListValue) -> str:
+    """'q', 'd' or 'list'."""
+    items = list_value.items
+    return "list" if type(items) is list else items.typecode
+
+
+class TypedStorageTest(unittest.TestCase):
+    def test_pack(self):
+        self.assertEqual(pack([1, 2, 3]), array('q', [1, 2, 3]))
+        self.assertEqual(pack([1, 2.5]), array('d', [1.0, 2.5]))
+        self.assertEqual(pack([]), array('q'))
+        for values in ([1, "a"], [1, True], [None], [1, 2 ** 70]):
+            with self.subTest(values=values):
+                self.assertEqual(pack(values), values)
+
+    def test_store_widens_storage(self):
+        values = ListValue([1, 2, 3])
+        values.store(0, 1.5)
+        self.assertEqual((storage(values), list(values)), ('d', [1.5, 2.0, 3.0]))
+        values.store(1, 7)
+        self.assertEqual(storage(values), 'd')
+        values.store(2, "x")
+        self.assertEqual((storage(values), list(values)), ("list", [1.5, 7.0, "x"]))
+
+    def test_booleans_fall_back_to_list(self):
+        for mutate in (lambda values: values.append(True), lambda values: values.insert(0, False),
+                       lambda values: values.store(0, True)):
+            values = ListValue([1, 2])
+            mutate(values)
+            self.assertEqual(storage(values), "list")
+            self.assertTrue(any(type(value) is bool for value in values))
+
+    def test_extend_and_fill(self):
+        values = ListValue([1, 2.5])
+        values.extend(ListValue([3, 4]))
+        self.assertEqual((storage(values), list(values)), ('d', [1.0, 2.5, 3.0, 4.0]))
+        values.extend(ListValue(["a"]))
+        self.assertEqual(storage(values), "list")
+        values = ListValue([1, 2])
+        values.fill(None)
+        self.assertEqual((storage(values), list(values)), ("list", [None, None]))
+
+    def test_equality_across_storage(self):
+        self.assertEqual(ListValue([1, 2]), ListValue([1.0, 2.0]))
+        self.assertEqual(ListValue([1, 2]), ListValue.with_storage([1, 2]))
+        self.assertNotEqual(ListValue([1, 2]), ListValue([1, 2, 3]))
+
+    def test_programs_see_no_difference(self):
+        source = ("var l = [1, 2, 3]; l[0] = 1.5; print l;\n"
+                  "l[1] = \"x\"; print l;\n"
+                  "var n = [1, 2]; list_append(n, true); print n; print n[2] == true;\n"
+                  "var f = [1.0, 2.5]; print f; print f[0] == 1; print [4, 5][1.0];\n")
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine),
+                                 "[1.5, 2, 3]\n[1.5, x, 3]\n[1, 2, true]\ntrue\n[1, 2.5]\ntrue\n5\n")
+
+
+class ConcatenationTest(unittest.TestCase):
+    def test_concat_shares_storage(self):
+        left = ListValue([1, 2])
+        result = left.concat(ListValue([3]))
+        self.assertIs(type(left), PrefixView)
+        self.assertIs(type(result), SharedList)
+        result.append(4)
+        self.assertEqual((list(left), list(result)), ([1, 2], [1, 2, 3, 4]))
+
+    def test_mutating_result_copies(self):
+        left = ListValue([1, 2])
+        result = left.concat(ListValue([3]))
+        result.store(0, 9)
+        self.assertIs(type(result), ListValue)
+        self.assertEqual((list(left), list(result)), ([1, 2], [9, 2, 3]))
+
+    def test_mutating_prefix_copies(self):
+        left = ListValue(["a", "b"])
+        result = left.concat(ListValue(["c"]))
+        left.append("x")
+        self.assertIs(type(left), ListValue)
+        self.assertEqual((list(left), list(result)), (["a", "b", "x"], ["a", "b", "c"]))
+
+    def test_programs(self):
+        source = ("var a = [1, 2]; var b = a + [3]; a[0] = 9; print a; print b;\n"
+                  "b[1] = 7; print a; print b;\n"
+                  "var c = a + [4]; var d = a + [5]; list_append(c, 6); print c; print d; print a;\n"
+                  "var x = [1]; var y = x; x = x + [2]; print y; list_append(y, 5); print x; print y;\n"
+                  "var s = [\"s\"]; var t = s + s; print t; print s + [1.5] + [true];\n")
+        expected = ("[9, 2]\n[1, 2, 3]\n[9, 2]\n[1, 7, 3]\n"
+                    "[9, 2, 4, 6]\n[9, 2, 5]\n[9, 2]\n"
+                    "[1]\n[1, 2]\n[1, 5]\n"
+                    "[s, s]\n[s, 1.5, true]\n")
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), expected)
+
+    def test_accumulating(self):
+        source = ("var acc = []; var snapshot = acc; var i = 0;\n"
+                  "while (i < 20000) { acc = acc + [i]; if (i == 2) snapshot = acc; i = i + 1; }\n"
+                  "print len(acc); print snapshot; print acc[19999];\n")
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), "20000\n[0, 1, 2]\n19999\n")
+
+
+class StringBuilderTest(unittest.TestCase):
+    def check(self, source: str, expected: str):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                self.assertEqual(run(source, engine), expected)
+
+    def test_extend_string(self):
+        builder = extend_string("ab", 0, "c")
+        self.assertIsInstance(builder, StringBuilder)
+        self.assertIs(extend_string(builder, 3, "d"), builder)
+        self.assertEqual(builder.value(), "abcd")
+        self.assertEqual(builder.parts, ["abcd"])  # Joined once, reused by later reads
+
+    def test_extend_string_after_builder_grew(self):
+        # The builder grew while the right operand was evaluated: start again from the old prefix.
+        builder = extend_string("a", 0, "b")
+        builder.append("x")
+        result = extend_string(builder, 2, "c")
+        self.assertIsNot(result, builder)
+        self.assertEqual((result.value(), builder.value()), ("abc", "abx"))
+
+    def test_loop(self):
+        source = ('var s = ""; var i = 0; while (i < 20000) { s = s + "ab"; i = i + 1; }\n'
+                  "print len(s); print slice(s, 0, 5);\n")
+        self.check(source, "40000\nababa\n")
+
+    def test_reads_while_building(self):
+        source = ('var s = "x"; var copies = []; var i = 0;\n'
+                  "while (i < 3) { s = s + i; list_append(copies, s); i = i + 1; }\n"
+                  's = s + "!"; print copies; print s;\n')
+        self.check(source, "[x0, x01, x012]\nx012!\n")
+
+    def test_right_operand_reassigns_variable(self):
+        source = ('var s = "a";\n'
+                  'fun g() { s = s + "b"; return "c"; }\n'
+                  "s = s + g(); print s;\n"
+                  "s = s + g(); print s;\n"
+                  'fun h() { s = "new"; return "!"; }\n'
+                  "s = s + h(); print s;\n")
+        self.check(source, "ac\nacc\nacc!\n")
+
+    def test_local_variable_captured_by_closure(self):
+        source = ("fun make() {\n"
+                  '  var s = "";\n'
+                  '  fun add(x) { s = s + x; return s; }\n'
+                  '  var i = 0; while (i < 3) { s = s + "-"; add(i); i = i + 1; }\n'
+                  "  return add(\"end\");\n"
+                  "}\n"
+                  "print make();\n")
+        self.check(source, "-0-1-2end\n")
+
+    def test_non_string_left_operand(self):
+        source = 'var s = 1; s = s + 2; print s; s = s + "x"; s = s + 3; print s; s = s + [1]; print s;\n'
+        self.check(source, "3\n3x3\n3x3[1]\n")
+
+
+if __name__ == "__main__":
+    unittest.main()